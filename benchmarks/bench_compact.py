@@ -0,0 +1,41 @@
+"""
+Payload size, parse and validation time of large entries,
+nested compared to the compact residue columns of ?format=compact
+$ python -m benchmarks.bench_compact [--repeat 3]
+"""
+import argparse
+import json
+from benchmarks.common import timed, report
+from funpdbe_deposition.compact import compact_chains
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.serializers import EntrySerializer
+
+SIZES = (1000, 10000)
+
+
+def validate(body, compact):
+    serializer = EntrySerializer(data=json.loads(body), context={"compact": compact})
+    assert serializer.is_valid(), serializer.errors
+    return serializer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for size in SIZES:
+        data = MockData.generate(residues=size, site_data=2)
+        compact = dict(data, chains=compact_chains(data["chains"]))
+        for name, payload, is_compact in (("nested", data, False), ("compact", compact, True)):
+            body = json.dumps(payload, separators=(",", ":"))
+            parse = min(timed(json.loads, body)[0] for _ in range(args.repeat))
+            validation = min(timed(validate, body, is_compact)[0] for _ in range(args.repeat))
+            rows.append((size, name, "%.0f" % (len(body) / 1e3), "%.1f" % (parse * 1000),
+                         "%.1f" % (validation * 1000)))
+    report("Entry deposition payloads", ("residues", "format", "kB", "parse ms", "parse + validate ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
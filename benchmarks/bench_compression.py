@@ -0,0 +1,52 @@
+"""
+Bytes and CPU time per response for large entries: rendering with
+JSONRenderer and CompactJSONRenderer, then compressing with gzip or brotli
+$ python -m benchmarks.bench_compression [--repeat 5]
+"""
+import argparse
+import time
+from benchmarks.common import report
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from funpdbe_deposition.middleware import brotli
+from funpdbe_deposition.middleware import brotli_string
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.renderers import orjson
+from funpdbe_deposition.renderers import CompactJSONRenderer
+
+SIZES = (1000, 10000, 50000)
+
+
+def cpu(function, argument, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = function(argument)
+    return (time.process_time() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for size in SIZES:
+        data = MockData.generate(residues=size, site_data=2)
+        rendered = {}
+        for name, renderer in (("JSONRenderer", JSONRenderer()), ("CompactJSONRenderer", CompactJSONRenderer())):
+            elapsed, rendered[name] = cpu(renderer.render, data, args.repeat)
+            rows.append((size, name, "%.1f" % elapsed, "%.0f" % (len(rendered[name]) / 1e3)))
+        content = rendered["CompactJSONRenderer"]
+        encodings = [("gzip", compress_string)]
+        if brotli is not None:
+            encodings.append(("br", brotli_string))
+        for name, compress in encodings:
+            elapsed, compressed = cpu(compress, content, args.repeat)
+            rows.append((size, "+ " + name, "%.1f" % elapsed, "%.0f" % (len(compressed) / 1e3)))
+    report("Per response (orjson %s, brotli %s)" % ("installed" if orjson else "missing",
+                                                  "installed" if brotli else "missing"),
+           ("residues", "step", "CPU ms", "kB"), rows)
+
+
+if __name__ == "__main__":
+    main()
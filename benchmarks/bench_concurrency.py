@@ -0,0 +1,119 @@
+"""
+Read throughput of SQLite while entries are written concurrently,
+with the default journal compared to the tuning of sqlite.py
+Runs against throw-away SQLite files, not the in-memory test database
+$ python -m benchmarks.bench_concurrency [--seconds 10] [--readers 4] [--writers 4] [--residues 200]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+from benchmarks.common import benchmark_database, depositor, percentile, report
+from django.db import connection
+from django.test import Client
+from funpdbe_deposition import sqlite
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+READ_ENTRIES = 50
+MODES = (
+    ("default", (), None, False),
+    ("WAL + pragmas + write queue", sqlite.SQLITE_PRAGMAS, sqlite.JOURNAL_MODE, True)
+)
+
+
+def logged_in():
+    client = Client()
+    client.login(username="bench", password="bench")
+    return client
+
+
+def reader(stop, latencies, errors):
+    client = Client()
+    number = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = client.get(URL + "1a%02d/" % (number % READ_ENTRIES))
+            assert response.status_code == 200, response.status_code
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as error:
+            errors.append(error)
+        number += 1
+    connection.close()
+
+
+def writer(index, residues, stop, writes, errors):
+    client = logged_in()
+    number = 0
+    while not stop.is_set():
+        pdb_id = "%dw%02d" % (index + 1, number % 100)
+        body = json.dumps(MockData.generate(pdb_id, residues=residues))
+        try:
+            response = client.post(URL, body, content_type="application/json")
+            assert response.status_code == 201, response.content
+            response = client.delete(URL + pdb_id + "/")
+            assert response.status_code == 301, response.status_code
+            writes.append(number)
+        except Exception as error:
+            errors.append(error)
+        number += 1
+    connection.close()
+
+
+def run(seconds, readers, writers, residues):
+    client = logged_in()
+    for number in range(READ_ENTRIES):
+        response = client.post(URL, json.dumps(MockData.generate("1a%02d" % number)), content_type="application/json")
+        assert response.status_code == 201, response.content
+    stop = threading.Event()
+    latencies, read_errors, writes, write_errors = [], [], [], []
+    threads = [threading.Thread(target=reader, args=(stop, latencies, read_errors)) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(index, residues, stop, writes, write_errors))
+                for index in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, read_errors, writes, write_errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--residues", type=int, default=200, help="Residues of every written entry")
+    args = parser.parse_args()
+
+    if connection.vendor != "sqlite":
+        print("This benchmark is for SQLite only")
+        return
+    rows = []
+    for name, pragmas, journal_mode, queue in MODES:
+        directory = tempfile.mkdtemp()
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+        try:
+            with mock.patch.object(sqlite, "SQLITE_PRAGMAS", pragmas), \
+                    mock.patch.object(sqlite, "JOURNAL_MODE", journal_mode), mock.patch.object(sqlite, "WRITE_QUEUE", queue):
+                with benchmark_database():
+                    depositor()
+                    latencies, read_errors, writes, write_errors = run(args.seconds, args.readers, args.writers,
+                                                                        args.residues)
+        finally:
+            shutil.rmtree(directory)
+        rows.append((name, "%.0f" % (len(latencies) / args.seconds), "%.1f" % percentile(latencies, 0.5),
+                     "%.1f" % percentile(latencies, 0.99), len(read_errors), len(writes), len(write_errors)))
+    report("SQLite reads while writing (%d readers, %d writers of %d residues, %.0f seconds)" %
+           (args.readers, args.writers, args.residues, args.seconds),
+           ("mode", "reads/s", "read p50 ms", "read p99 ms", "read errors", "writes", "write errors"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Compare DELETE time of Django's deletion collector and the set-based delete
+$ python -m benchmarks.bench_delete
+"""
+from benchmarks.common import benchmark_database, depositor, timed, report
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.bulk import delete_entries
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.serializers import EntrySerializer
+
+SIZES = (100, 1000, 10000, 50000)
+SITE_DATA = 2
+
+
+def deposit(owner, residues):
+    serializer = EntrySerializer(data=MockData.generate(residues=residues, site_data=SITE_DATA))
+    assert serializer.is_valid(), serializer.errors
+    writer = BulkEntryWriter()
+    writer.add(serializer.validated_data, owner=owner)
+    return writer.save()[0]
+
+
+def main():
+    rows = []
+    with benchmark_database():
+        owner = depositor()
+        for size in SIZES:
+            entry = deposit(owner, size)
+            collector, _ = timed(entry.delete)
+            deposit(owner, size)
+            set_based, _ = timed(delete_entries, Entry.objects.filter(pdb_id="2abc"))
+            rows.append((size, "%.3f" % collector, "%.3f" % set_based))
+    report("Delete time (seconds, %d site data per residue)" % SITE_DATA,
+           ("residues", "collector", "set-based"), rows)
+
+
+if __name__ == "__main__":
+    main()
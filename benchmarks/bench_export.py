@@ -0,0 +1,63 @@
+"""
+Time and size of exporting every residue score of a resource, as the
+nested entry JSON compared to the flat CSV and .npz tables
+$ python -m benchmarks.bench_export [--entries 200] [--residues 250]
+"""
+import argparse
+from benchmarks.common import benchmark_database, depositor, timed, report
+from benchmarks.bench_urls import pdb_ids
+from django.test import Client
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.export import numpy
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.rendering import store_rendered
+from funpdbe_deposition.serializers import EntrySerializer
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+
+
+def load(owner, entries, residues):
+    template = EntrySerializer(data=MockData.generate(chains=2, residues=residues, site_data=2))
+    assert template.is_valid(), template.errors
+    writer = BulkEntryWriter()
+    for _, pdb_id in zip(range(entries), pdb_ids()):
+        writer.add(dict(template.validated_data, pdb_id=pdb_id), owner=owner)
+    writer.save()
+
+
+def fetch(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--residues", type=int, default=250)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        load(depositor(), args.entries, args.residues)
+        client = Client()
+        exports = [("nested JSON, rendered", URL + "?stream=true"),
+                   ("nested JSON, stored", URL + "?stream=true"),
+                   ("CSV", URL + "scores/")]
+        if numpy is not None:
+            exports.append(("npz", URL + "scores/?output=npz"))
+        for name, url in exports:
+            if name == "nested JSON, stored":
+                store_rendered(Entry.objects.all())
+            elapsed, content = timed(fetch, client, url)
+            rows.append((name, "%.2f" % elapsed, "%.1f" % (len(content) / 1e6)))
+        count = SiteData.objects.count()
+    report("Export of %d site data rows" % count, ("format", "seconds", "MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
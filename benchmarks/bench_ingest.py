@@ -0,0 +1,64 @@
+"""
+Peak Python memory and time of depositing one large entry,
+parsing the whole body compared to streaming it
+$ python -m benchmarks.bench_ingest [--chains 50] [--residues 2000]
+"""
+import argparse
+import io
+import json
+import tracemalloc
+from benchmarks.common import benchmark_database, depositor, timed, report
+from django.db import transaction
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.ingest import StreamingDeposition
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.serializers import EntrySerializer
+
+
+def parsed(owner, body):
+    serializer = EntrySerializer(data=json.loads(body.decode("utf-8")))
+    assert serializer.is_valid(), serializer.errors
+    writer = BulkEntryWriter()
+    writer.add(serializer.validated_data, owner=owner)
+    return writer.save()
+
+
+def streamed(owner, body):
+    result, status_code = StreamingDeposition(owner, "cath-funsites").deposit(io.BytesIO(body))
+    assert status_code == 201, result
+    return result
+
+
+def measure(function, owner, body):
+    tracemalloc.start()
+    with transaction.atomic():
+        elapsed, _ = timed(function, owner, body)
+        transaction.set_rollback(True)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chains", type=int, default=50)
+    parser.add_argument("--residues", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        owner = depositor()
+        data = MockData.generate("1abc", chains=args.chains, residues=args.residues, site_data=2)
+        body = json.dumps(data).encode("utf-8")
+        del data
+        for name, function in (("JSONParser", parsed), ("streaming", streamed)):
+            elapsed, peak = measure(function, owner, body)
+            assert not Entry.objects.exists()
+            rows.append((name, "%.1f" % (elapsed), "%.0f" % (peak / 1e6)))
+    report("One entry of %d chains of %d residues, %.0f MB body" % (args.chains, args.residues, len(body) / 1e6),
+           ("path", "seconds", "peak MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Write time of large entries on PostgreSQL, with INSERT statements
+compared to COPY, run with the database settings of funpdbe/database.py
+$ FUNPDBE_DB_ENGINE=postgresql python -m benchmarks.bench_pgcopy
+"""
+from unittest import mock
+from benchmarks.common import benchmark_database, depositor, timed, report
+from django.db import connection
+from funpdbe_deposition import pgcopy
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.serializers import EntrySerializer
+
+SIZES = (1000, 10000, 50000)
+SITE_DATA = 2
+
+
+def write(owner, validated_data):
+    writer = BulkEntryWriter()
+    writer.add(validated_data, owner=owner)
+    elapsed, _ = timed(writer.save)
+    Entry.objects.all().delete()
+    return elapsed
+
+
+def main():
+    if connection.vendor != "postgresql":
+        print("COPY needs PostgreSQL, set FUNPDBE_DB_ENGINE=postgresql")
+        return
+    rows = []
+    with benchmark_database():
+        owner = depositor()
+        for size in SIZES:
+            serializer = EntrySerializer(data=MockData.generate(chains=2, residues=size // 2, site_data=SITE_DATA))
+            assert serializer.is_valid(), serializer.errors
+            with mock.patch.object(pgcopy, "USE_COPY", False):
+                insert = write(owner, serializer.validated_data)
+            copy = write(owner, serializer.validated_data)
+            rows.append((size, "%.3f" % insert, "%.3f" % copy, "%.1fx" % (insert / copy)))
+    report("Entry write time on PostgreSQL (seconds, %d site data per residue)" % SITE_DATA,
+           ("residues", "INSERT", "COPY", "speed-up"), rows)
+
+
+if __name__ == "__main__":
+    main()
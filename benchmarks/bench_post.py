@@ -0,0 +1,79 @@
+"""
+Compare POST latency of the per-row insert path and the bulk write engine
+$ python -m benchmarks.bench_post
+"""
+import json
+from unittest import mock
+from benchmarks.common import benchmark_database, depositor, timed, report
+from django.test import Client
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Chain
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import Site
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.models import EvidenceCodeOntology
+from funpdbe_deposition.serializers import EntrySerializer
+
+SIZES = (100, 1000, 10000)
+SITE_DATA = 2
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+
+
+def create_per_row(validated_data):
+    """
+    The original insert path of EntrySerializer, saving one row at a time
+    :param validated_data: Dict, validated data of EntrySerializer, with the owner
+    :return: Entry
+    """
+    data = dict(validated_data)
+    chains_data = data.pop("chains", None) or []
+    sites_data = data.pop("sites", None) or []
+    ecos_data = data.pop("evidence_code_ontology", None) or []
+    entry = Entry.objects.create(**data)
+    for site_data in sites_data:
+        Site.objects.create(entry_ref=entry, **site_data)
+    for eco_data in ecos_data:
+        EvidenceCodeOntology.objects.create(entry_ref=entry, **eco_data)
+    for chain_data in chains_data:
+        chain_data = dict(chain_data)
+        residues_data = chain_data.pop("residues", None) or []
+        chain = Chain.objects.create(entry_ref=entry, **chain_data)
+        for residue_data in residues_data:
+            residue_data = dict(residue_data)
+            site_details = residue_data.pop("site_data", None) or []
+            residue = Residue.objects.create(chain_ref=chain, **residue_data)
+            for site_detail in site_details:
+                SiteData.objects.create(residue_ref=residue, **site_detail)
+    return entry
+
+
+def create_per_row_method(serializer, validated_data):
+    return create_per_row(validated_data)
+
+
+def post(client, body):
+    elapsed, response = timed(client.post, URL, body, content_type="application/json")
+    assert response.status_code == 201, response.content
+    Entry.objects.all().delete()
+    return elapsed
+
+
+def main():
+    rows = []
+    with benchmark_database():
+        depositor()
+        client = Client()
+        client.login(username="bench", password="bench")
+        for size in SIZES:
+            body = json.dumps(MockData.generate(residues=size, site_data=SITE_DATA))
+            with mock.patch.object(EntrySerializer, "create", create_per_row_method):
+                per_row = post(client, body)
+            bulk = post(client, body)
+            rows.append((size, "%.3f" % per_row, "%.3f" % bulk, "%.1fx" % (per_row / bulk)))
+    report("POST latency (seconds, %d site data per residue)" % SITE_DATA,
+           ("residues", "per-row", "bulk", "speed-up"), rows)
+
+
+if __name__ == "__main__":
+    main()
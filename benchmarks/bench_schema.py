@@ -0,0 +1,54 @@
+"""
+Validation time of the chains of one large entry: the nested serializers,
+the compiled schema, and the compiled schema in a pool of processes
+$ python -m benchmarks.bench_schema [--chains 8] [--residues 10000] [--workers 4]
+"""
+import argparse
+from benchmarks.common import timed, report
+from rest_framework import serializers
+from funpdbe_deposition import schema
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.serializers import ChainSerializer
+
+
+def drf(chains):
+    serializer = serializers.ListSerializer(child=ChainSerializer(), data=chains)
+    assert serializer.is_valid(), serializer.errors
+    return serializer.validated_data
+
+
+def compiled(chains):
+    return schema.validate_group(ChainSerializer, chains)
+
+
+def pooled(chains):
+    return schema.validate_chains(ChainSerializer, chains)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chains", type=int, default=8)
+    parser.add_argument("--residues", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    chains = MockData.generate(chains=args.chains, residues=args.residues, site_data=2)["chains"]
+    schema.VALIDATION_WORKERS = args.workers
+    schema.PARALLEL_RESIDUES = 1
+    # Start the processes before timing
+    pooled(chains[:2])
+    rows = []
+    expected = None
+    for name, function in (("serializers", drf), ("compiled", compiled),
+                           ("compiled, %d processes" % args.workers, pooled)):
+        elapsed, validated = timed(function, chains)
+        expected = expected or validated
+        assert validated == expected
+        rows.append((name, "%.2f" % elapsed))
+    schema.shutdown_pool()
+    report("Validation of %d chains of %d residues (seconds)" % (args.chains, args.residues),
+           ("validator", "time"), rows)
+
+
+if __name__ == "__main__":
+    main()
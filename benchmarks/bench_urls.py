@@ -0,0 +1,83 @@
+"""
+Latency of every URL pattern of funpdbe_deposition/urls.py
+against a synthetic archive
+$ python -m benchmarks.bench_urls [--entries 100000] [--requests 200]
+"""
+import argparse
+import itertools
+import json
+import random
+import string
+from benchmarks.common import benchmark_database, depositor, timed, percentile, report
+from django.test import Client
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import RESOURCES
+from funpdbe_deposition.rendering import RENDER_VERSION
+from funpdbe_deposition.rendering import document_hash
+
+BATCH_SIZE = 5000
+
+
+def pdb_ids():
+    for digit, letter, third, fourth in itertools.product(string.digits[1:], string.ascii_lowercase,
+                                                         string.ascii_lowercase + string.digits,
+                                                         string.ascii_lowercase + string.digits):
+        yield digit + letter + third + fourth
+
+
+def load_archive(owner, count):
+    """
+    Every PDB id gets an entry from every resource, with a small stored document
+    """
+    resources = [resource for resource, _ in RESOURCES]
+    entries = []
+    loaded = []
+    for pdb_id in pdb_ids():
+        for resource in resources:
+            document = json.dumps({"pdb_id": pdb_id, "data_resource": resource}).encode("utf-8")
+            entries.append(Entry(owner=owner, pdb_id=pdb_id, data_resource=resource,
+                                 rendered_json=document, rendered_version=RENDER_VERSION,
+                                 rendered_hash=document_hash(document)))
+            if len(entries) == BATCH_SIZE:
+                Entry.objects.bulk_create(entries)
+                entries = []
+        loaded.append(pdb_id)
+        if len(loaded) * len(resources) >= count:
+            break
+    Entry.objects.bulk_create(entries)
+    return loaded, resources
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        elapsed, (loaded, resources) = timed(load_archive, depositor(), args.entries)
+        print("Loaded %d entries in %.1f seconds\n" % (Entry.objects.count(), elapsed))
+        client = Client()
+        patterns = (
+            ("entries/?page_size=100", lambda: "/funpdbe_deposition/entries/?page_size=100"),
+            ("entries/resource/<resource>/?page_size=100",
+             lambda: "/funpdbe_deposition/entries/resource/%s/?page_size=100" % random.choice(resources)),
+            ("entries/resource/<resource>/<pdb_id>/",
+             lambda: "/funpdbe_deposition/entries/resource/%s/%s/" % (random.choice(resources),
+                                                                       random.choice(loaded))),
+            ("entries/pdb/<pdb_id>/", lambda: "/funpdbe_deposition/entries/pdb/%s/" % random.choice(loaded))
+        )
+        for name, url in patterns:
+            latencies = []
+            for _ in range(args.requests):
+                elapsed, response = timed(client.get, url())
+                assert response.status_code == 200, response.content
+                latencies.append(elapsed * 1000)
+            rows.append((name, "%.2f" % percentile(latencies, 0.5), "%.2f" % percentile(latencies, 0.99)))
+    report("GET latency (milliseconds, %d requests per pattern)" % args.requests,
+           ("pattern", "p50", "p99"), rows)
+
+
+if __name__ == "__main__":
+    main()
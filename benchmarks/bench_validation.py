@@ -0,0 +1,57 @@
+"""
+Per-request validation overhead
+$ python -m benchmarks.bench_validation
+"""
+import re
+import timeit
+from benchmarks.common import benchmark_database, report
+from funpdbe_deposition.models import RESOURCES
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.validation import resource_valid
+from funpdbe_deposition.validation import pdb_id_valid
+from funpdbe_deposition.validation import classification_valid
+
+NUMBER = 200000
+LEGACY_PDB_PATTERN = "^[0-9][A-Za-z][A-Za-z0-9]{2}$"
+
+
+def legacy_resource_valid(resource):
+    for RESOURCE in RESOURCES:
+        if resource in RESOURCE:
+            return True
+    return False
+
+
+def legacy_pdb_id_valid(pdb_id):
+    if pdb_id and re.match(LEGACY_PDB_PATTERN, pdb_id):
+        return True
+    return False
+
+
+def per_call(function, *args, **kwargs):
+    number = kwargs.get("number", NUMBER)
+    return timeit.timeit(lambda: function(*args), number=number) / number * 1e9
+
+
+def main():
+    rows = []
+    for name, legacy, current, value in (
+            ("resource_valid (last)", legacy_resource_valid, resource_valid, "dynamine"),
+            ("resource_valid (invalid)", legacy_resource_valid, resource_valid, "invalid"),
+            ("pdb_id_valid", legacy_pdb_id_valid, pdb_id_valid, "1abc")):
+        rows.append((name, "%.0f" % per_call(legacy, value), "%.0f" % per_call(current, value)))
+    rows.append(("classification_valid", "-", "%.0f" % per_call(classification_valid, "high")))
+    report("Validation helpers (nanoseconds per call)", ("check", "legacy", "current"), rows)
+
+    rows = []
+    with benchmark_database():
+        for residues in (1, 100, 1000):
+            data = MockData.generate(residues=residues)
+            elapsed = per_call(lambda: EntrySerializer(data=data).is_valid(), number=20)
+            rows.append((residues, "%.2f" % (elapsed / 1e6)))
+    report("EntrySerializer validation (milliseconds per entry)", ("residues", "time"), rows)
+
+
+if __name__ == "__main__":
+    main()
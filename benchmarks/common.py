@@ -0,0 +1,66 @@
+"""
+Shared helpers for the benchmarks
+
+Every benchmark runs against a throw-away test database, created the same
+way as by "manage.py test", so it never touches db.sqlite3
+Run a benchmark from the repository root, e.g.
+$ python -m benchmarks.bench_post
+"""
+import os
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "funpdbe.settings")
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.test.utils import teardown_test_environment
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+
+
+@contextmanager
+def benchmark_database():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def depositor(resource="cath-funsites", username="bench"):
+    group, _ = Group.objects.get_or_create(name=resource)
+    user, created = User.objects.get_or_create(username=username)
+    if created:
+        user.set_password(username)
+        user.save()
+    group.user_set.add(user)
+    return user
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(title, header, rows):
+    print(title)
+    widths = [max(len(str(row[column])) for row in [header] + rows) for column in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
+    print()
@@ -0,0 +1,42 @@
+"""
+Cache settings read from the environment
+
+    FUNPDBE_CACHE_BACKEND    locmem (default), memcached or database
+    FUNPDBE_CACHE_LOCATION   memcached server(s), comma separated, or the
+                             table of the database cache
+
+The local memory cache is private to every worker process, so entries
+invalidated by one worker stay stale in the others: the permission and
+aggregated caches are then disabled, see funpdbe_deposition/caching.py
+memcached needs pymemcache, the database cache needs its table first:
+$ python manage.py createcachetable
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "database": "django.core.cache.backends.db.DatabaseCache"
+}
+LOCATIONS = {
+    "locmem": "",
+    "memcached": "127.0.0.1:11211",
+    "database": "funpdbe_cache"
+}
+
+
+def cache_settings(environ):
+    """
+    :param environ: Dict-like, i.e. os.environ
+    :return: Dict, settings of the default cache
+    """
+    backend = environ.get("FUNPDBE_CACHE_BACKEND", "locmem")
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured("FUNPDBE_CACHE_BACKEND must be one of %s" % ", ".join(sorted(BACKENDS)))
+    location = environ.get("FUNPDBE_CACHE_LOCATION", LOCATIONS[backend])
+    if backend == "memcached":
+        location = location.split(",")
+    return {
+        "BACKEND": BACKENDS[backend],
+        "LOCATION": location
+    }
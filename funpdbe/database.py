@@ -0,0 +1,64 @@
+"""
+Database settings read from the environment
+
+    FUNPDBE_DB_ENGINE        sqlite3 (default) or postgresql
+    FUNPDBE_DB_NAME          database name, or path of the SQLite file
+    FUNPDBE_DB_USER          PostgreSQL user
+    FUNPDBE_DB_PASSWORD      PostgreSQL password
+    FUNPDBE_DB_HOST          PostgreSQL host, or directory of its socket
+    FUNPDBE_DB_PORT          PostgreSQL port
+    FUNPDBE_DB_CONN_MAX_AGE  seconds a connection is reused for, 0 to close
+                             it after every request, "none" to never close it
+
+PostgreSQL needs psycopg2, i.e. psycopg2-binary of requirements.txt.
+Persistent connections (CONN_MAX_AGE) are kept by every worker process,
+Django 3.2 has no connection pool; to share fewer connections between many
+workers, point FUNPDBE_DB_HOST and FUNPDBE_DB_PORT to a pooler like PgBouncer
+"""
+import os
+from django.core.exceptions import ImproperlyConfigured
+
+ENGINES = {
+    "sqlite3": "funpdbe_deposition.backends.sqlite3",
+    "postgresql": "django.db.backends.postgresql"
+}
+# Seconds a connection is reused for, by default
+CONN_MAX_AGE = {
+    "sqlite3": 0,
+    "postgresql": 60
+}
+
+
+def conn_max_age(value):
+    if value.lower() == "none":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured("FUNPDBE_DB_CONN_MAX_AGE must be a number of seconds or none")
+
+
+def database_settings(environ, base_dir):
+    """
+    :param environ: Dict-like, i.e. os.environ
+    :param base_dir: String, directory of the default SQLite file
+    :return: Dict, settings of the default database
+    """
+    engine = environ.get("FUNPDBE_DB_ENGINE", "sqlite3")
+    if engine not in ENGINES:
+        raise ImproperlyConfigured("FUNPDBE_DB_ENGINE must be one of %s" % ", ".join(sorted(ENGINES)))
+    database = {
+        "ENGINE": ENGINES[engine],
+        "CONN_MAX_AGE": conn_max_age(environ.get("FUNPDBE_DB_CONN_MAX_AGE", str(CONN_MAX_AGE[engine])))
+    }
+    if engine == "sqlite3":
+        database["NAME"] = environ.get("FUNPDBE_DB_NAME", os.path.join(base_dir, "db.sqlite3"))
+    else:
+        database.update({
+            "NAME": environ.get("FUNPDBE_DB_NAME", "funpdbe"),
+            "USER": environ.get("FUNPDBE_DB_USER", ""),
+            "PASSWORD": environ.get("FUNPDBE_DB_PASSWORD", ""),
+            "HOST": environ.get("FUNPDBE_DB_HOST", ""),
+            "PORT": environ.get("FUNPDBE_DB_PORT", "")
+        })
+    return database
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/1.11/ref/settings/
 """
 
 import os
+from funpdbe.caches import cache_settings
+from funpdbe.database import database_settings
 
 # from funpdbe.config import MASTER
 
@@ -44,11 +46,13 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_swagger',
     'corsheaders',
-    'funpdbe_deposition'
+    'funpdbe_deposition.apps.FunpdbeDepositionConfig'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # gzip or brotli, before any middleware which reads or changes the response body
+    'funpdbe_deposition.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +64,13 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'funpdbe.urls'
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'funpdbe_deposition.renderers.CompactJSONRenderer',
+        'funpdbe_deposition.renderers.CompactFormatRenderer'
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else [])
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -81,12 +92,18 @@ WSGI_APPLICATION = 'funpdbe.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
+# SQLite at db.sqlite3 unless configured otherwise, see funpdbe/database.py
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    'default': database_settings(os.environ, BASE_DIR)
+}
+
+
+# Cache
+# Local memory unless configured otherwise, see funpdbe/caches.py
+
+CACHES = {
+    'default': cache_settings(os.environ)
 }
 
 
@@ -0,0 +1,105 @@
+import json
+from collections import OrderedDict
+from django.core.cache import cache
+from django.db import transaction
+from funpdbe_deposition.caching import cache_ttl
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Residue
+
+# 0 disables the cache, which is the default unless the cache is shared by the workers
+AGGREGATE_TTL = cache_ttl("FUNPDBE_AGGREGATE_TTL", 3600)
+
+# Residue with its site data, chain and entry, in the order the rows are pivoted
+RESIDUE_LOOKUPS = (
+    "chain_ref__entry_ref__data_resource",
+    "chain_ref__chain_label",
+    "pdb_res_label",
+    "aa_type",
+    "site_data__pk",
+    "site_data__site_id_ref",
+    "site_data__raw_score",
+    "site_data__confidence_score",
+    "site_data__confidence_classification"
+)
+
+
+def cache_key(pdb_id):
+    return "funpdbe_deposition:aggregated:%s" % pdb_id
+
+
+def pivot(rows):
+    """
+    Merge the residues of every resource into one residue list per chain,
+    with the site data of each residue grouped by resource
+    Chains and residues are ordered as they were first deposited,
+    chains without residues are left out
+    :param rows: Iterable of tuples, in the order of RESIDUE_LOOKUPS
+    :return: Tuple of the sorted resource names and the list of chains
+    """
+    resources = set()
+    chains = OrderedDict()
+    for resource, chain_label, pdb_res_label, aa_type, site_pk, site_id_ref, raw_score, confidence_score, \
+            confidence_classification in rows:
+        resources.add(resource)
+        residues = chains.setdefault(chain_label, OrderedDict())
+        residue = residues.get(pdb_res_label)
+        if residue is None:
+            residue = residues[pdb_res_label] = {"pdb_res_label": pdb_res_label, "aa_type": aa_type,
+                                                 "site_data": {}}
+        site_data = residue["site_data"].setdefault(resource, [])
+        # Residues without site data still show up through the outer join
+        if site_pk is not None:
+            site_data.append({"site_id_ref": site_id_ref, "raw_score": raw_score,
+                              "confidence_score": confidence_score,
+                              "confidence_classification": confidence_classification})
+    chains = [{"chain_label": chain_label, "residues": list(residues.values())}
+              for chain_label, residues in chains.items()]
+    return sorted(resources), chains
+
+
+def build_aggregated(pdb_id):
+    """
+    Build the aggregated document of a PDB id with a single query
+    :param pdb_id: String, lower case PDB id
+    :return: Bytes, JSON document, or None if there are no entries
+    """
+    rows = Residue.objects.filter(chain_ref__entry_ref__pdb_id=pdb_id).order_by("pk", "site_data__pk")
+    resources, chains = pivot(rows.values_list(*RESIDUE_LOOKUPS))
+    if not chains:
+        # Entries without chains still count
+        resources = sorted(Entry.objects.filter(pdb_id=pdb_id).values_list("data_resource", flat=True))
+        if not resources:
+            return None
+    document = {"pdb_id": pdb_id, "resources": resources, "chains": chains}
+    return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+
+def aggregated(pdb_id):
+    """
+    The aggregated document of a PDB id, cached for FUNPDBE_AGGREGATE_TTL
+    seconds or until an entry of the PDB id is written or deleted
+    :param pdb_id: String, lower case PDB id
+    :return: Bytes, JSON document, or None if there are no entries
+    """
+    if not AGGREGATE_TTL:
+        return build_aggregated(pdb_id)
+    document = cache.get(cache_key(pdb_id))
+    if document is None:
+        document = build_aggregated(pdb_id)
+        if document is not None:
+            cache.set(cache_key(pdb_id), document, AGGREGATE_TTL)
+    return document
+
+
+def invalidate(pdb_ids):
+    """
+    Forget the cached aggregated documents of the PDB ids, right away
+    and again once the current transaction commits, as a reader may cache
+    the old data in between
+    :param pdb_ids: Iterable of PDB ids
+    :return: None
+    """
+    keys = [cache_key(pdb_id) for pdb_id in set(pdb_ids)]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -6,3 +6,7 @@ from django.apps import AppConfig
 
 class FunpdbeDepositionConfig(AppConfig):
     name = 'funpdbe_deposition'
+
+    def ready(self):
+        # Connect the signal receivers
+        from funpdbe_deposition import signals
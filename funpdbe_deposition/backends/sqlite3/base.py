@@ -0,0 +1,26 @@
+"""
+SQLite backend selected by funpdbe/database.py, which lets sqlite.py start
+the write transactions of atomic_write with BEGIN IMMEDIATE
+"""
+from django.db.backends.sqlite3 import base
+from funpdbe_deposition import sqlite
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Set by sqlite.immediate_transaction for the transactions it starts
+    begin_immediate = False
+
+    def get_new_connection(self, conn_params):
+        self.journal_mode_applied = False
+        return super(DatabaseWrapper, self).get_new_connection(conn_params)
+
+    def _start_transaction_under_autocommit(self):
+        if not self.begin_immediate:
+            return super(DatabaseWrapper, self)._start_transaction_under_autocommit()
+        with self.cursor() as cursor:
+            if sqlite.JOURNAL_MODE and not self.journal_mode_applied:
+                # Stored in the database file, so only set once it is written
+                # Readers of other connections may keep it from changing, until the next try
+                cursor.execute("PRAGMA journal_mode = %s" % sqlite.JOURNAL_MODE)
+                self.journal_mode_applied = cursor.fetchone()[0] == sqlite.JOURNAL_MODE
+            cursor.execute("BEGIN IMMEDIATE")
@@ -0,0 +1,419 @@
+from django.conf import settings
+from django.db.models import Max
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Chain
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import Site
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.models import EvidenceCodeOntology
+from funpdbe_deposition.aggregate import invalidate
+from funpdbe_deposition.changes import record
+from funpdbe_deposition.pgcopy import copy_supported
+from funpdbe_deposition.pgcopy import copy_insert
+from funpdbe_deposition.sqlite import atomic_write
+
+BATCH_SIZE = getattr(settings, "FUNPDBE_BULK_BATCH_SIZE", 500)
+TREE_FIELDS = ("chains", "sites", "evidence_code_ontology")
+# Cleared in the transaction which changes an entry, so its old document is
+# never served, even before store_rendered writes the new one, or if it fails
+NO_DOCUMENT = {"rendered_json": None, "rendered_version": None, "rendered_hash": None}
+
+
+def bulk_insert(model, objects, batch_size, parent=None):
+    """
+    Insert the objects with bulk_create and make sure they have primary keys
+
+    Many residues or site data are loaded with COPY on PostgreSQL, see pgcopy.py
+    Not every backend returns the primary keys of bulk inserted rows, so
+    when they are missing, the rows inserted after the previous highest
+    primary key are read back in insertion order, keeping only the ones
+    that belong to the parents of the objects
+    :param model: Model class
+    :param objects: List of unsaved model instances
+    :param batch_size: Integer, number of rows per INSERT statement
+    :param parent: String, name of the foreign key to the parent, if the
+    primary keys of the objects are needed
+    :return: List of saved model instances
+    """
+    if not objects:
+        return objects
+    if copy_supported(model, objects):
+        return copy_insert(model, objects)
+    if parent:
+        last_pk = model.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+    model.objects.bulk_create(objects, batch_size=batch_size)
+    if parent and objects[0].pk is None:
+        attname = model._meta.get_field(parent).attname
+        parent_pks = set(getattr(obj, attname) for obj in objects)
+        created = model.objects.filter(pk__gt=last_pk, **{attname + "__gte": min(parent_pks),
+                                                          attname + "__lte": max(parent_pks)})
+        pks = [pk for pk, parent_pk in created.order_by("pk").values_list("pk", attname) if parent_pk in parent_pks]
+        if len(pks) != len(objects):
+            raise RuntimeError("Could not read back primary keys of %s rows" % model.__name__)
+        for obj, pk in zip(objects, pks):
+            obj.pk = pk
+    return objects
+
+
+class BulkEntryWriter(object):
+    """
+    Writes the complete tree of one or more entries
+
+    The Chain, Residue, SiteData, Site and EvidenceCodeOntology rows are
+    built in memory and each level is saved with batched bulk_create calls
+    inside a single transaction, so the number of queries depends on the
+    number of levels and batches, not on the number of residues
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or BATCH_SIZE
+        self.pending = []
+        # Entries created by this writer, whose children may still be
+        # added by later saves, without logging them as updated
+        self.created_pks = set()
+        # Site primary keys by entry primary key and site id,
+        # to link the site data to their Site when they are inserted
+        self.site_pks = {}
+        # Existing chains, by entry primary key and chain label, which get
+        # the residues of the added chains with their label instead of a new row
+        self.reused_chains = {}
+
+    def add(self, validated_data, **kwargs):
+        """
+        Queue a new entry for writing
+        :param validated_data: Dict, validated data of EntrySerializer
+        :param kwargs: Additional Entry fields, i.e. owner
+        :return: None
+        """
+        data = dict(validated_data)
+        data.update(kwargs)
+        self.pending.append((None, data))
+
+    def add_children(self, entry, validated_data):
+        """
+        Queue chains, sites and evidence codes of an existing entry for writing
+        :param entry: Entry
+        :param validated_data: Dict, with any of the keys in TREE_FIELDS
+        :return: None
+        """
+        self.pending.append((entry, dict(validated_data)))
+
+    def reuse_chains(self, chains):
+        """
+        Write the added chains with the label of one of these chains under
+        the existing row, so they keep their place among the chains of the entry
+        Their residues must be deleted first, see delete_residues
+        :param chains: Iterable of Chain, in order
+        :return: None
+        """
+        for chain in chains:
+            self.reused_chains.setdefault((chain.entry_ref_id, chain.chain_label), []).append(chain)
+
+    def save(self):
+        """
+        Write every queued entry
+        :return: List of Entry instances, in the order they were added
+        """
+        with atomic_write():
+            entries = self.create_entries()
+            self.create_children(entries)
+            self.clear_documents(entries)
+            invalidate(entry.pdb_id for entry in entries)
+            self.record_changes(entries)
+        self.pending = []
+        return entries
+
+    def clear_documents(self, entries):
+        changed = [entry.pk for entry, (existing, _) in zip(entries, self.pending)
+                   if existing is not None and entry.pk not in self.created_pks]
+        if changed:
+            Entry.objects.filter(pk__in=changed).update(**NO_DOCUMENT)
+
+    def record_changes(self, entries):
+        created = []
+        updated = []
+        for entry, (existing, _) in zip(entries, self.pending):
+            if existing is None:
+                created.append((entry.pk, entry.pdb_id, entry.data_resource))
+                self.created_pks.add(entry.pk)
+            elif entry.pk not in self.created_pks:
+                updated.append((entry.pk, entry.pdb_id, entry.data_resource))
+        record("created", created, self.batch_size)
+        record("updated", updated, self.batch_size)
+
+    def create_entries(self):
+        new_entries = []
+        entries = []
+        for entry, data in self.pending:
+            if entry is None:
+                fields = dict((key, value) for key, value in data.items() if key not in TREE_FIELDS)
+                entry = Entry(**fields)
+                new_entries.append(entry)
+            entries.append(entry)
+        if len(new_entries) == 1:
+            new_entries[0].save()
+        elif new_entries:
+            last_pk = Entry.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+            Entry.objects.bulk_create(new_entries, batch_size=self.batch_size)
+            if new_entries[0].pk is None:
+                self.read_back_entry_pks(new_entries, last_pk)
+        return entries
+
+    def read_back_entry_pks(self, entries, last_pk):
+        # PDB id and resource name are unique together
+        created = Entry.objects.filter(pk__gt=last_pk).values_list("pk", "pdb_id", "data_resource")
+        pks = dict(((pdb_id, data_resource), pk) for pk, pdb_id, data_resource in created)
+        for entry in entries:
+            entry.pk = pks[(entry.pdb_id, entry.data_resource)]
+
+    def create_children(self, entries):
+        sites = []
+        ecos = []
+        chains = []
+        for entry, (_, data) in zip(entries, self.pending):
+            for site_data in data.get("sites") or []:
+                sites.append(Site(entry_ref=entry, **site_data))
+            for eco_data in data.get("evidence_code_ontology") or []:
+                ecos.append(EvidenceCodeOntology(entry_ref=entry, **eco_data))
+            for chain_data in data.get("chains") or []:
+                chains.append((entry, chain_data))
+
+        bulk_insert(Site, sites, self.batch_size, parent="entry_ref")
+        bulk_insert(EvidenceCodeOntology, ecos, self.batch_size)
+        self.add_site_pks(entries, sites, chains)
+        residues = self.create_chains(chains)
+        site_data = self.create_residues(residues)
+        self.create_site_data(site_data)
+
+    def add_site_pks(self, entries, sites, chains):
+        for entry, (existing, _) in zip(entries, self.pending):
+            if existing is None:
+                self.site_pks[entry.pk] = {}
+        for site in sites:
+            if site.entry_ref_id in self.site_pks:
+                self.site_pks[site.entry_ref_id][site.site_id] = site.pk
+        # Sites of existing entries are read once, with the ones just inserted
+        missing = set(entry.pk for entry, _ in chains if entry.pk not in self.site_pks)
+        if missing:
+            for pk in missing:
+                self.site_pks[pk] = {}
+            for entry_pk, site_id, pk in Site.objects.filter(entry_ref__in=missing) \
+                    .values_list("entry_ref", "site_id", "pk"):
+                self.site_pks[entry_pk][site_id] = pk
+
+    def create_chains(self, chains):
+        objects = []
+        new_chains = []
+        reused = []
+        residues = []
+        for entry, chain_data in chains:
+            chain_data = dict(chain_data)
+            residues_data = chain_data.pop("residues", None) or []
+            kept = self.reused_chains.get((entry.pk, chain_data["chain_label"]))
+            if kept:
+                chain = kept.pop(0)
+                chain.chain_annotation = chain_data.get("chain_annotation")
+                reused.append(chain)
+            else:
+                chain = Chain(entry_ref=entry, **chain_data)
+                new_chains.append(chain)
+            objects.append(chain)
+            residues.append(residues_data)
+        bulk_insert(Chain, new_chains, self.batch_size, parent="entry_ref")
+        if reused:
+            Chain.objects.bulk_update(reused, ["chain_annotation"], batch_size=self.batch_size)
+        return [(chain, residue_data) for chain, residues_data in zip(objects, residues)
+                for residue_data in residues_data]
+
+    def create_residues(self, residues):
+        objects = []
+        site_data = []
+        for chain, residue_data in residues:
+            residue_data = dict(residue_data)
+            site_data.append(residue_data.pop("site_data", None) or [])
+            objects.append(Residue(chain_ref=chain, **residue_data))
+        bulk_insert(Residue, objects, self.batch_size, parent="chain_ref")
+        return [(residue, site_detail) for residue, site_details in zip(objects, site_data)
+                for site_detail in site_details]
+
+    def create_site_data(self, site_data):
+        objects = [SiteData(residue_ref=residue,
+                            site_id=self.site_pks[residue.chain_ref.entry_ref_id].get(site_detail.get("site_id_ref")),
+                            **site_detail)
+                   for residue, site_detail in site_data]
+        bulk_insert(SiteData, objects, self.batch_size)
+
+
+# Every relation to the models deleted with raw_delete, as (model, field name)
+# Their rows are deleted (CASCADE) or unlinked (SET_NULL) by the callers first:
+# delete_children and delete_chain_trees delete the trees bottom-up, and
+# patch_entry unlinks the site data of the sites it replaces
+RAW_DELETE_DEPENDENTS = {
+    Entry: {(Chain, "entry_ref"), (Site, "entry_ref"), (EvidenceCodeOntology, "entry_ref")},
+    Chain: {(Residue, "chain_ref")},
+    Residue: {(SiteData, "residue_ref")},
+    SiteData: set(),
+    Site: {(SiteData, "site")},
+    EvidenceCodeOntology: set()
+}
+
+
+def raw_delete(queryset):
+    """
+    Delete the rows of the queryset with a single DELETE statement,
+    without loading them into the deletion collector
+
+    This is QuerySet._raw_delete, so on_delete is not applied and no
+    signals are sent: the caller deletes or unlinks the dependent rows of
+    RAW_DELETE_DEPENDENTS first, and does what the receivers of signals.py
+    would, i.e. delete_entries invalidates the aggregated documents and
+    records the deletions
+    :param queryset: QuerySet of a model of RAW_DELETE_DEPENDENTS
+    :return: None
+    """
+    if queryset.model not in RAW_DELETE_DEPENDENTS:
+        raise ValueError("%s is not deleted with raw_delete" % queryset.model.__name__)
+    queryset._raw_delete(queryset.db)
+
+
+def delete_chain_trees(chains):
+    """
+    Delete chains with their residues and site data,
+    using one DELETE ... WHERE ... IN (subquery) per table
+    :param chains: QuerySet of Chain
+    :return: None
+    """
+    delete_residues(chains)
+    raw_delete(chains)
+
+
+def delete_residues(chains):
+    """
+    Delete the residues and site data of chains, keeping the chains themselves
+    :param chains: QuerySet of Chain
+    :return: None
+    """
+    chain_pks = chains.values("pk")
+    residue_pks = Residue.objects.filter(chain_ref__in=chain_pks).values("pk")
+    raw_delete(SiteData.objects.filter(residue_ref__in=residue_pks))
+    raw_delete(Residue.objects.filter(chain_ref__in=chain_pks))
+
+
+def delete_children(entries):
+    """
+    Delete the chains, sites and evidence codes of the entries,
+    keeping the entries themselves
+    :param entries: QuerySet of Entry
+    :return: None
+    """
+    entry_pks = entries.values("pk")
+    delete_chain_trees(Chain.objects.filter(entry_ref__in=entry_pks))
+    raw_delete(Site.objects.filter(entry_ref__in=entry_pks))
+    raw_delete(EvidenceCodeOntology.objects.filter(entry_ref__in=entry_pks))
+
+
+def delete_entries(entries):
+    """
+    Delete entries with their whole tree in one transaction, using a few
+    DELETE ... WHERE ... IN (subquery) statements, so no rows of the tree
+    are loaded into Python
+    :param entries: QuerySet of Entry
+    :return: Integer, number of deleted entries
+    """
+    with atomic_write():
+        deleted = list(entries.values_list("pk", "pdb_id", "data_resource"))
+        if deleted:
+            delete_children(entries)
+            raw_delete(entries)
+            invalidate(pdb_id for _, pdb_id, _ in deleted)
+            record("deleted", deleted, BATCH_SIZE)
+    return len(deleted)
+
+
+def link_site_data(site_data):
+    """
+    Link site data to the Site of their entry matching their site_id_ref,
+    with one UPDATE statement
+    :param site_data: QuerySet of SiteData
+    :return: Integer, number of updated rows
+    """
+    site = Site.objects.filter(site_id=OuterRef("site_id_ref"),
+                               entry_ref__chains__residues=OuterRef("residue_ref")).values("pk")[:1]
+    return site_data.filter(site_id_ref__isnull=False).update(site=Subquery(site))
+
+
+def update_fields(entry, data):
+    for field, value in dict(data, **NO_DOCUMENT).items():
+        setattr(entry, field, value)
+    entry.save()
+
+
+def replace_entry(entry, validated_data, batch_size=None):
+    """
+    Replace an existing entry in one transaction: the old tree is removed
+    with set-based deletes and the new one is bulk inserted
+    If anything fails, the old entry is left untouched
+    :param entry: Entry
+    :param validated_data: Dict, validated data of EntrySerializer
+    :param batch_size: Integer, number of rows per INSERT statement
+    :return: Entry
+    """
+    data = dict(validated_data)
+    children = dict((key, data.pop(key, None)) for key in TREE_FIELDS)
+    with atomic_write():
+        delete_children(Entry.objects.filter(pk=entry.pk))
+        # The PDB id may change
+        invalidate([entry.pdb_id])
+        update_fields(entry, data)
+        writer = BulkEntryWriter(batch_size)
+        writer.add_children(entry, children)
+        writer.save()
+    return entry
+
+
+def patch_entry(entry, validated_data, changes, batch_size=None):
+    """
+    Rewrite only the parts of an existing entry that changed
+    :param entry: Entry
+    :param validated_data: Dict, validated data of the complete, patched entry
+    :param changes: Dict, with the changed "chains" (set of chain labels),
+    "sites" (set of site ids) and whether the "evidence_code_ontology" changed
+    :param batch_size: Integer, number of rows per INSERT statement
+    :return: Entry
+    """
+    data = dict(validated_data)
+    chain_labels = set(str(label) for label in changes["chains"])
+    site_ids = set(str(site_id) for site_id in changes["sites"])
+    children = {
+        "chains": [chain for chain in data.pop("chains", None) or [] if chain["chain_label"] in chain_labels],
+        "sites": [site for site in data.pop("sites", None) or [] if str(site["site_id"]) in site_ids],
+        "evidence_code_ontology": data.pop("evidence_code_ontology", None) or []
+    }
+    with atomic_write():
+        # The rewritten chains keep their rows, and so their place in the document
+        kept = list(Chain.objects.filter(entry_ref=entry, chain_label__in=chain_labels).order_by("pk"))
+        delete_residues(Chain.objects.filter(pk__in=[chain.pk for chain in kept]))
+        replaced_sites = Site.objects.filter(entry_ref=entry,
+                                             site_id__in=[site["site_id"] for site in children["sites"]])
+        # The site data of the chains which did not change are linked again below
+        unlinked = SiteData.objects.filter(site__in=replaced_sites).update(site=None)
+        raw_delete(replaced_sites)
+        if changes["evidence_code_ontology"]:
+            raw_delete(EvidenceCodeOntology.objects.filter(entry_ref=entry))
+        else:
+            children["evidence_code_ontology"] = []
+        # The PDB id may change
+        invalidate([entry.pdb_id])
+        update_fields(entry, data)
+        writer = BulkEntryWriter(batch_size)
+        writer.reuse_chains(kept)
+        writer.add_children(entry, children)
+        writer.save()
+        unused = [chain.pk for chains in writer.reused_chains.values() for chain in chains]
+        if unused:
+            raw_delete(Chain.objects.filter(pk__in=unused))
+        if unlinked:
+            link_site_data(SiteData.objects.filter(residue_ref__chain_ref__entry_ref=entry, site__isnull=True))
+    return entry
@@ -0,0 +1,29 @@
+from django.conf import settings
+
+# Backends whose entries are only seen by the process which wrote them
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache"
+)
+
+
+def shared_cache():
+    """
+    :return: Boolean, whether every worker process sees the same default cache
+    """
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_BACKENDS
+
+
+def cache_ttl(name, ttl):
+    """
+    Seconds the entries of a cache, which is invalidated when the data
+    changes, are kept for. Invalidating a process local cache only reaches
+    the worker which made the change, so it is disabled unless the setting
+    is given explicitly, i.e. for a single process deployment
+    :param name: String, name of the setting
+    :param ttl: Integer, seconds when the default cache is shared
+    :return: Integer, 0 if the cache is disabled
+    """
+    if hasattr(settings, name):
+        return getattr(settings, name)
+    return ttl if shared_cache() else 0
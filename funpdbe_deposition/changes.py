@@ -0,0 +1,116 @@
+import datetime
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from funpdbe_deposition.models import ChangeEvent
+from funpdbe_deposition.models import PrunedChanges
+from funpdbe_deposition.sqlite import atomic_write
+from funpdbe_deposition.sqlite import before_commit
+
+CHANGE_FIELDS = ("pk", "action", "entry_pk", "pdb_id", "data_resource", "time")
+CHANGES_CHUNK_SIZE = getattr(settings, "FUNPDBE_CHANGES_CHUNK_SIZE", 2000)
+# Days events are kept for by the prune_changes command
+CHANGES_RETENTION_DAYS = getattr(settings, "FUNPDBE_CHANGES_RETENTION_DAYS", 90)
+
+
+def lock_log():
+    """
+    On PostgreSQL, sequence numbers are handed out on insert but become
+    visible on commit, possibly out of order, so a mirror could read past
+    an event which commits later. The transactions appending to the log
+    take turns with a table lock held until they commit, which makes the
+    order of the sequence numbers the order of the commits; reads are not
+    blocked. SQLite has a single writer already
+    The lock is only taken by write_events, right before the commit
+    :return: None
+    """
+    if connection.vendor == "postgresql" and connection.in_atomic_block:
+        with connection.cursor() as cursor:
+            cursor.execute("LOCK TABLE %s IN SHARE ROW EXCLUSIVE MODE" %
+                           connection.ops.quote_name(ChangeEvent._meta.db_table))
+
+
+def write_events(events, batch_size=None):
+    lock_log()
+    ChangeEvent.objects.bulk_create(events, batch_size=batch_size)
+
+
+def record(action, entries, batch_size=None):
+    """
+    Append events to the change log, as part of the current transaction
+    Inside atomic_write, the events are written at the end of the outermost
+    block, so the log is locked only while the transaction commits, however
+    long the rest of it takes; elsewhere, i.e. when Django deletes the
+    entries of a user, they are written right away
+    :param action: String, "created", "updated" or "deleted"
+    :param entries: Iterable of Entry pk, PDB id and resource name tuples
+    :param batch_size: Integer, number of rows per INSERT statement
+    :return: None
+    """
+    events = [ChangeEvent(action=action, entry_pk=pk, pdb_id=pdb_id, data_resource=data_resource)
+              for pk, pdb_id, data_resource in entries]
+    if events:
+        before_commit(lambda: write_events(events, batch_size))
+
+
+def prune(days=None):
+    """
+    Delete the events older than the retention period, recording the
+    sequence number of the last one for changes_pruned
+    :param days: Integer, defaults to FUNPDBE_CHANGES_RETENTION_DAYS
+    :return: Integer, number of deleted events
+    """
+    days = CHANGES_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    with atomic_write():
+        events = ChangeEvent.objects.filter(time__lt=cutoff)
+        seq = events.aggregate(seq=Max("pk"))["seq"]
+        if seq is None:
+            return 0
+        PrunedChanges.objects.create(seq=seq)
+        return events.filter(pk__lte=seq).delete()[0]
+
+
+def changes_pruned(seq):
+    """
+    Whether events after a sequence number were pruned, so a mirror which
+    last saw it has to copy the entries again
+    :param seq: Integer, sequence number of the last event seen
+    :return: Boolean
+    """
+    return PrunedChanges.objects.filter(seq__gt=seq).exists()
+
+
+def changes_since(seq, resource=None):
+    """
+    The events after a sequence number, in order
+    :param seq: Integer, sequence number of the last event seen
+    :param resource: String, resource name, or None for every resource
+    :return: QuerySet of ChangeEvent values
+    """
+    events = ChangeEvent.objects.filter(pk__gt=seq)
+    if resource is not None:
+        events = events.filter(data_resource=resource)
+    return events.order_by("pk").values(*CHANGE_FIELDS)
+
+
+def stream_changes(events):
+    """
+    Stream a JSON list of events, read from the database in chunks
+    Each event has its sequence number as "seq", to be sent back as ?since=
+    :param events: QuerySet of ChangeEvent values
+    :return: StreamingHttpResponse
+    """
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+    def generate():
+        yield b"["
+        for index, event in enumerate(events.iterator(chunk_size=CHANGES_CHUNK_SIZE)):
+            event["seq"] = event.pop("pk")
+            yield (b"," if index else b"") + encoder.encode(event).encode("utf-8")
+        yield b"]"
+
+    return StreamingHttpResponse(generate(), content_type="application/json")
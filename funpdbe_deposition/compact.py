@@ -0,0 +1,151 @@
+"""
+Compact representation of the residues of a chain, as parallel arrays
+
+    "residues": {
+        "pdb_res_label": ["1", "2"],
+        "aa_type": ["ALA", "GLY"],
+        "site_data": {
+            "residue": [0, 0, 1],
+            "site_id_ref": [1, 2, 1],
+            "raw_score": [0.5, 0.7, 0.1],
+            "confidence_score": [0.9, 0.9, 0.4],
+            "confidence_classification": ["high", "high", "low"]
+        }
+    }
+
+"residue" is the index of the residue each site data belongs to
+Requested with ?format=compact, both when reading and depositing entries
+"""
+import json
+from funpdbe_deposition.renderers import CompactJSONRenderer
+from funpdbe_deposition.validation import CLASSIFICATION_NAMES
+
+COMPACT_FORMAT = "compact"
+# Part of the ETag, as the compact and nested responses differ
+COMPACT_ETAG_PREFIX = b"compact"
+SITE_DATA_COLUMNS = ("site_id_ref", "raw_score", "confidence_score", "confidence_classification")
+
+
+def compact_requested(request):
+    return request is not None and request.query_params.get("format") == COMPACT_FORMAT
+
+
+def compact_residues(residues):
+    """
+    :param residues: List of residue dicts, as serialized by ResidueSerializer
+    :return: Dict of columns
+    """
+    rows = [(index, site_data) for index, residue in enumerate(residues) for site_data in residue["site_data"]]
+    site_data = {"residue": [index for index, _ in rows]}
+    for column in SITE_DATA_COLUMNS:
+        site_data[column] = [row[column] for _, row in rows]
+    return {
+        "pdb_res_label": [residue["pdb_res_label"] for residue in residues],
+        "aa_type": [residue["aa_type"] for residue in residues],
+        "site_data": site_data
+    }
+
+
+def compact_chains(chains):
+    return [dict(chain, residues=compact_residues(chain["residues"])) for chain in chains or []]
+
+
+def compact_document(document):
+    """
+    :param document: Bytes, JSON document of an entry
+    :return: Bytes, the same document with compact residues
+    """
+    data = json.loads(document.decode("utf-8"))
+    data["chains"] = compact_chains(data.get("chains"))
+    return CompactJSONRenderer().render(data)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_labels(values, max_length):
+    """
+    Labels may be sent as numbers, they are stored as strings like in CharField
+    :return: Tuple of the cleaned values and the index of the first invalid one, or None
+    """
+    cleaned = []
+    for index, value in enumerate(values):
+        if not isinstance(value, str) and not is_number(value):
+            return cleaned, index
+        value = str(value).strip()
+        if not value or len(value) > max_length:
+            return cleaned, index
+        cleaned.append(value)
+    return cleaned, None
+
+
+def first_invalid(values, valid):
+    for index, value in enumerate(values):
+        if not valid(value):
+            return index
+    return None
+
+
+SITE_DATA_CHECKS = {
+    "site_id_ref": (lambda value: value is None or (isinstance(value, int) and not isinstance(value, bool)),
+                    "A valid integer or null is required."),
+    "raw_score": (lambda value: value is None or is_number(value), "A valid number or null is required."),
+    "confidence_score": (lambda value: value is None or is_number(value), "A valid number or null is required."),
+    "confidence_classification": (lambda value: value is None or value in CLASSIFICATION_NAMES,
+                                  "A valid classification or null is required.")
+}
+
+
+def column_error(column, index, message):
+    return {column: ["Item %d: %s" % (index, message)]}
+
+
+def expand_residues(data):
+    """
+    Validate compact residues one column at a time and expand them
+    into the nested residue dicts written by BulkEntryWriter
+    :param data: Dict of columns
+    :return: Tuple of the list of residue dicts and errors, one of which is None
+    """
+    if not isinstance(data, dict):
+        return None, "Expected an object of residue columns."
+    columns = {}
+    for column, max_length in (("pdb_res_label", 10), ("aa_type", 3)):
+        values = data.get(column)
+        if not isinstance(values, list):
+            return None, {column: ["Expected a list."]}
+        columns[column], index = check_labels(values, max_length)
+        if index is not None:
+            return None, column_error(column, index, "A string of at most %d characters is required." % max_length)
+    count = len(columns["pdb_res_label"])
+    if len(columns["aa_type"]) != count:
+        return None, {"aa_type": ["Expected %d items, like pdb_res_label." % count]}
+
+    site_data = data.get("site_data") or {"residue": []}
+    if not isinstance(site_data, dict) or not isinstance(site_data.get("residue"), list):
+        return None, {"site_data": ["Expected an object of site data columns with a residue list."]}
+    indexes = site_data["residue"]
+    index = first_invalid(indexes, lambda value: isinstance(value, int) and not isinstance(value, bool)
+                          and 0 <= value < count)
+    if index is not None:
+        return None, {"site_data": column_error("residue", index, "A residue index is required.")}
+    for column in SITE_DATA_COLUMNS:
+        values = site_data.get(column)
+        if values is None:
+            values = [None] * len(indexes)
+        if not isinstance(values, list) or len(values) != len(indexes):
+            return None, {"site_data": {column: ["Expected %d items, like residue." % len(indexes)]}}
+        valid, message = SITE_DATA_CHECKS[column]
+        index = first_invalid(values, valid)
+        if index is not None:
+            return None, {"site_data": column_error(column, index, message)}
+        if column in ("raw_score", "confidence_score"):
+            values = [None if value is None else float(value) for value in values]
+        columns[column] = values
+
+    residues = [{"pdb_res_label": label, "aa_type": aa_type, "site_data": []}
+                for label, aa_type in zip(columns["pdb_res_label"], columns["aa_type"])]
+    for row, index in enumerate(indexes):
+        residues[index]["site_data"].append(dict((column, columns[column][row]) for column in SITE_DATA_COLUMNS))
+    return residues, None
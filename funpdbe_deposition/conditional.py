@@ -0,0 +1,108 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from funpdbe_deposition.rendering import RENDER_VERSION
+from funpdbe_deposition.rendering import document_hash
+from funpdbe_deposition.rendering import documents
+
+
+def combine(hashes, prefix=b""):
+    """
+    Strong ETag of a list of documents, from the hashes of the documents
+    :param hashes: Iterable of hex digests, in the order of the documents
+    :param prefix: Bytes, anything else in the response, i.e. page links
+    :return: String, quoted ETag
+    """
+    digest = hashlib.sha1(prefix)
+    for value in hashes:
+        digest.update(value.encode("ascii"))
+    return '"%s"' % digest.hexdigest()
+
+
+def documents_etag(items, prefix=b""):
+    return combine((document_hash(document) for document in items), prefix)
+
+
+class ResultSet(object):
+    """
+    Validators of the entries of a response, read with one query
+    which does not load the stored documents
+
+    The update times of the entries do not change when an entry of a list
+    is deleted, so only sets of a single entry are dated: lists are
+    validated by their ETag alone
+    """
+
+    def __init__(self, queryset, dated=False):
+        self.queryset = queryset
+        self.dated = dated
+        self.rows = list(queryset.order_by("pk").values_list("pk", "updated", "rendered_hash", "rendered_version"))
+
+    def exists(self):
+        return bool(self.rows)
+
+    def last_modified(self):
+        """
+        :return: Integer, POSIX timestamp of the latest change, in whole
+        seconds like If-Modified-Since, or None
+        """
+        if not self.dated or not self.rows:
+            return None
+        return int(max(updated for _, updated, _, _ in self.rows).timestamp())
+
+    def etag(self, prefix=b""):
+        """
+        :return: String, quoted ETag, or None if any document is not
+        stored yet, so its hash is not known before rendering it
+        """
+        hashes = []
+        for _, _, value, version in self.rows:
+            if value is None or version != RENDER_VERSION:
+                return None
+            hashes.append(value)
+        return combine(hashes, prefix)
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Check the If-None-Match and If-Modified-Since headers of a GET request
+    :return: HttpResponse, 304 (not modified), or None to send the full response
+    """
+    if request is None:
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def add_validators(response, etag, last_modified):
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def conditional_response(request, result_set, respond, prefix=b""):
+    """
+    Answer a conditional GET without loading the documents when the
+    client's copy is current, or else build the response and add its validators
+    If some documents are not stored yet, the ETag is computed from
+    the documents once they are rendered
+    :param request: Request, or None for an unconditional response
+    :param result_set: ResultSet, of the entries of the response
+    :param respond: Callable, turning the list of documents into the response
+    :param prefix: Bytes, anything else in the response, i.e. page links
+    :return: HttpResponse
+    """
+    etag = result_set.etag(prefix)
+    last_modified = result_set.last_modified()
+    response = None
+    if etag is not None:
+        response = not_modified(request, etag, last_modified)
+    if response is None:
+        items = list(documents(result_set.queryset))
+        if etag is None:
+            etag = documents_etag(items, prefix)
+            response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = respond(items)
+    return add_validators(response, etag, last_modified)
@@ -0,0 +1,100 @@
+from rest_framework import status
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.rendering import CHUNK_SIZE
+from funpdbe_deposition.rendering import store_rendered
+from funpdbe_deposition.serializers import EntrySerializer
+
+INVALID_JSON = "Invalid JSON data - check your data structure"
+RESOURCE_NAME_MISMATCH = "Resource name provided by user is different than in the JSON data"
+PROGRESS_INTERVAL = 100
+
+
+class BatchDeposition(object):
+    """
+    Validates many entries of one resource one by one, then writes
+    all the valid ones together with a single BulkEntryWriter
+    """
+
+    serializer_class = EntrySerializer
+
+    def __init__(self, owner, resource, progress=None):
+        """
+        :param owner: User, owner of the new entries
+        :param resource: String, resource name the entries must belong to
+        :param progress: Callable, called with the number of validated items
+        """
+        self.owner = owner
+        self.resource = resource
+        self.progress = progress
+        self.seen = set()
+
+    def validate_item(self, item):
+        """
+        Validate one entry of the batch
+        :return: Tuple of validated data and errors, one of which is None
+        """
+        if not isinstance(item, dict) or "data_resource" not in item:
+            return None, INVALID_JSON
+        if item["data_resource"] != self.resource:
+            return None, RESOURCE_NAME_MISMATCH
+        serializer = self.serializer_class(data=item)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        pdb_id = serializer.validated_data["pdb_id"]
+        if pdb_id in self.seen:
+            return None, {"pdb_id": ["Duplicate entry in this batch"]}
+        self.seen.add(pdb_id)
+        return serializer.validated_data, None
+
+    def validate_items(self, items):
+        """
+        Validate every entry, queueing the valid ones for writing
+        :param items: List of entry data
+        :return: Tuple of the BulkEntryWriter and the list of results, one per item
+        """
+        writer = BulkEntryWriter()
+        results = []
+        for index, item in enumerate(items):
+            validated_data, errors = self.validate_item(item)
+            if errors is None:
+                writer.add(validated_data, owner=self.owner)
+                results.append({"index": index, "pdb_id": validated_data["pdb_id"],
+                                "status": status.HTTP_201_CREATED})
+            else:
+                results.append({"index": index, "status": status.HTTP_400_BAD_REQUEST, "errors": errors})
+            if self.progress and (index + 1) % PROGRESS_INTERVAL == 0:
+                self.progress(index + 1)
+        return writer, results
+
+    def write(self, writer, results):
+        """
+        Write the queued entries and store their rendered documents
+        :param writer: BulkEntryWriter
+        :param results: List of results, as returned by validate_items
+        :return: Tuple of the list of results and the HTTP status code summarizing them
+        """
+        created = [entry.pk for entry in writer.save()] if writer.pending else []
+        for start in range(0, len(created), CHUNK_SIZE):
+            store_rendered(Entry.objects.filter(pk__in=created[start:start + CHUNK_SIZE]))
+        created_results = [result for result in results if result["status"] == status.HTTP_201_CREATED]
+        for result, pk in zip(created_results, created):
+            result["pk"] = pk
+
+        if len(created) == len(results):
+            status_code = status.HTTP_201_CREATED
+        elif created:
+            status_code = status.HTTP_207_MULTI_STATUS
+        else:
+            status_code = status.HTTP_400_BAD_REQUEST
+        return results, status_code
+
+    def deposit(self, items):
+        """
+        Validate and write the entries
+        :param items: List of entry data
+        :return: Tuple of the list of results, one per item, and the
+        HTTP status code summarizing them
+        """
+        writer, results = self.validate_items(items)
+        return self.write(writer, results)
@@ -0,0 +1,89 @@
+import csv
+import io
+from django.conf import settings
+from funpdbe_deposition.models import SiteData
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Output column name and the SiteData lookup it is read from
+COLUMNS = (
+    ("pdb_id", "residue_ref__chain_ref__entry_ref__pdb_id"),
+    ("chain_label", "residue_ref__chain_ref__chain_label"),
+    ("pdb_res_label", "residue_ref__pdb_res_label"),
+    ("aa_type", "residue_ref__aa_type"),
+    ("site_id_ref", "site_id_ref"),
+    ("raw_score", "raw_score"),
+    ("confidence_score", "confidence_score"),
+    ("confidence_classification", "confidence_classification")
+)
+EXPORT_CHUNK_SIZE = getattr(settings, "FUNPDBE_EXPORT_CHUNK_SIZE", 2000)
+OUTPUT_FORMATS = {
+    "csv": "text/csv",
+    "npz": "application/octet-stream"
+}
+# site_id_ref is an integer column in the .npz output, missing values are stored as
+MISSING_SITE_ID = -1
+
+
+def score_rows(resource):
+    """
+    Every site data row of a resource, flattened with its residue, chain
+    and entry by a single JOIN query, which is read in chunks
+    :param resource: String, resource name
+    :return: Iterator of tuples, in the order of COLUMNS
+    """
+    site_data = SiteData.objects.filter(residue_ref__chain_ref__entry_ref__data_resource=resource)
+    rows = site_data.order_by("pk").values_list(*[lookup for _, lookup in COLUMNS])
+    return rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def csv_chunks(rows):
+    """
+    Write the rows as CSV with a header line, a chunk of rows at a time
+    :param rows: Iterable of tuples, in the order of COLUMNS
+    :return: Iterator of bytes
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([name for name, _ in COLUMNS])
+    for index, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if index % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def npz_bytes(rows):
+    """
+    Write the rows as a compressed NumPy archive with one array per column
+    Missing scores are NaN, missing site references MISSING_SITE_ID and
+    missing classifications empty strings
+    :param rows: Iterable of tuples, in the order of COLUMNS
+    :return: Bytes
+    """
+    if numpy is None:
+        raise RuntimeError("NumPy is required for the .npz export")
+    columns = [[] for _ in COLUMNS]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+    pdb_ids, chain_labels, res_labels, aa_types, site_ids, raw_scores, confidence_scores, classifications = columns
+    arrays = {
+        "pdb_id": numpy.array(pdb_ids, dtype="U4"),
+        "chain_label": numpy.array(chain_labels, dtype=str),
+        "pdb_res_label": numpy.array(res_labels, dtype=str),
+        "aa_type": numpy.array(aa_types, dtype="U3"),
+        "site_id_ref": numpy.array([MISSING_SITE_ID if value is None else value for value in site_ids],
+                                   dtype=numpy.int64),
+        "raw_score": numpy.array(raw_scores, dtype=numpy.float64),
+        "confidence_score": numpy.array(confidence_scores, dtype=numpy.float64),
+        "confidence_classification": numpy.array([value or "" for value in classifications], dtype=str)
+    }
+    buffer = io.BytesIO()
+    numpy.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
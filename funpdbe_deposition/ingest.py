@@ -0,0 +1,157 @@
+import tempfile
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.deposition import INVALID_JSON
+from funpdbe_deposition.schema import validate_group
+from funpdbe_deposition.validation import dangling_site_refs
+from funpdbe_deposition.deposition import RESOURCE_NAME_MISMATCH
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.serializers import ChainSerializer
+from funpdbe_deposition.serializers import CompactChainSerializer
+from funpdbe_deposition.sqlite import atomic_write
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Uploads are kept in memory up to this size, and spooled to disk beyond it
+SPOOL_MEMORY = getattr(settings, "FUNPDBE_SPOOL_MEMORY", 1024 * 1024)
+READ_SIZE = 64 * 1024
+# Entry fields read before the chains, everything but the chains is small
+HEADER_ARRAYS = ("sites", "evidence_code_ontology")
+SCALAR_EVENTS = ("string", "number", "boolean", "null")
+
+
+def spool(stream):
+    """
+    Copy the request body to a temporary file, a chunk at a time
+    :param stream: File-like, i.e. the request
+    :return: SpooledTemporaryFile, at position 0
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        upload.write(chunk)
+    upload.seek(0)
+    return upload
+
+
+def read_header(upload):
+    """
+    Read every field of the entry but the chains, which are skipped
+    without building them, so the fields may come in any order
+    :param upload: File, JSON entry
+    :return: Dict
+    """
+    header = {}
+    builder = None
+    building = None
+    for prefix, event, value in ijson.parse(upload, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == building and event in ("end_array", "end_map"):
+                header[building] = builder.value
+                builder = None
+        elif prefix in HEADER_ARRAYS and event in ("start_array", "start_map"):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            building = prefix
+        elif prefix == "" and event not in ("start_map", "map_key", "end_map"):
+            # The body is not a JSON object
+            return None
+        elif prefix and "." not in prefix and event in SCALAR_EVENTS:
+            header[prefix] = value
+    upload.seek(0)
+    return header
+
+
+class StreamingDeposition(object):
+    """
+    Validates and writes one entry while reading its chains from the upload
+
+    The body is spooled to a temporary file and read twice: first every field
+    but the chains, to validate and create the entry, then one chain at a
+    time, so memory is bounded by the largest chain instead of the body
+    """
+
+    def __init__(self, owner, resource, compact=False, batch_size=None):
+        """
+        :param owner: User, owner of the new entry
+        :param resource: String, resource name the entry must belong to
+        :param compact: Boolean, whether the residues are compact columns
+        :param batch_size: Integer, number of rows per INSERT statement
+        """
+        self.owner = owner
+        self.resource = resource
+        self.chain_serializer = CompactChainSerializer if compact else ChainSerializer
+        self.writer = BulkEntryWriter(batch_size)
+        self.site_ids = set()
+
+    def validate_header(self, header):
+        if header is None or "data_resource" not in header:
+            return None, INVALID_JSON
+        if header["data_resource"] != self.resource:
+            return None, RESOURCE_NAME_MISMATCH
+        header["chains"] = []
+        serializer = EntrySerializer(data=header)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        self.site_ids = set(site["site_id"] for site in serializer.validated_data["sites"])
+        return serializer.validated_data, None
+
+    def write_chains(self, entry, upload):
+        """
+        :return: Tuple of the number of chains and residues written, and
+        the errors of the first invalid chain, or None
+        """
+        chains = residues = pending = 0
+        for index, chain in enumerate(ijson.items(upload, "chains.item", use_float=True)):
+            validated = validate_group(self.chain_serializer, [chain])
+            if validated is None:
+                serializer = self.chain_serializer(data=chain)
+                if not serializer.is_valid():
+                    return chains, residues, {"chains": {str(index): serializer.errors}}
+                validated = [serializer.validated_data]
+            references = dangling_site_refs(validated, self.site_ids)
+            if references:
+                return chains, residues, {"chains": references}
+            self.writer.add_children(entry, {"chains": validated})
+            chains += 1
+            count = len(validated[0]["residues"])
+            residues += count
+            pending += count
+            if pending >= self.writer.batch_size:
+                self.writer.save()
+                pending = 0
+        self.writer.save()
+        return chains, residues, None
+
+    def deposit(self, stream):
+        """
+        :param stream: File-like, request body with one JSON entry
+        :return: Tuple of the result and the HTTP status code
+        """
+        upload = spool(stream)
+        try:
+            validated_data, errors = self.validate_header(read_header(upload))
+            if errors is not None:
+                return errors, status.HTTP_400_BAD_REQUEST
+            with atomic_write():
+                self.writer.add(validated_data, owner=self.owner)
+                entry = self.writer.save()[0]
+                chains, residues, errors = self.write_chains(entry, upload)
+                if errors is not None:
+                    transaction.set_rollback(True)
+                    return errors, status.HTTP_400_BAD_REQUEST
+        except ijson.JSONError:
+            return INVALID_JSON, status.HTTP_400_BAD_REQUEST
+        finally:
+            upload.close()
+        result = {"pk": entry.pk, "pdb_id": entry.pdb_id, "data_resource": entry.data_resource,
+                  "chains": chains, "residues": residues}
+        return result, status.HTTP_201_CREATED
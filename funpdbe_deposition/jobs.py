@@ -0,0 +1,149 @@
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from funpdbe_deposition.models import DepositionJob
+from funpdbe_deposition.deposition import BatchDeposition
+from funpdbe_deposition.deposition import INVALID_JSON
+from funpdbe_deposition.parsers import NDJSONParser
+from funpdbe_deposition.sqlite import atomic_write
+
+logger = logging.getLogger(__name__)
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The in-process worker pool, created on first use
+    Its size is set by FUNPDBE_JOB_WORKERS
+    Its first task runs the jobs left queued by a restart, unless
+    FUNPDBE_JOBS_RESUME is False; jobs left running by a stopped
+    worker are only requeued by run_deposition_jobs --requeue
+    """
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=getattr(settings, "FUNPDBE_JOB_WORKERS", 2))
+            if getattr(settings, "FUNPDBE_JOBS_RESUME", True):
+                executor.submit(resume_queued)
+    return executor
+
+
+def submit(owner, resource, content_type, body):
+    """
+    Store an upload as a queued job and hand it over to the workers
+    :param owner: User
+    :param resource: String, resource name
+    :param content_type: String, content type of the upload
+    :param body: Bytes, JSON entry, JSON array of entries or NDJSON
+    :return: DepositionJob
+    """
+    with atomic_write():
+        job = DepositionJob.objects.create(owner=owner, data_resource=resource,
+                                           content_type=content_type, payload=body)
+    enqueue(job.pk)
+    return job
+
+
+def enqueue(pk):
+    """
+    Run the job in the worker pool once the job is committed, or right
+    away when FUNPDBE_JOBS_EAGER is set (i.e. in tests)
+    """
+    if getattr(settings, "FUNPDBE_JOBS_EAGER", False):
+        run_job(pk)
+    else:
+        transaction.on_commit(lambda: get_executor().submit(run_in_thread, pk))
+
+
+def run_in_thread(pk):
+    try:
+        run_job(pk)
+    finally:
+        # Worker threads have their own database connections
+        connection.close()
+
+
+def resume_queued():
+    try:
+        count = run_queued()
+        if count:
+            logger.info("Resumed %d queued deposition jobs", count)
+    except Exception:
+        logger.exception("Resuming the queued deposition jobs failed")
+    finally:
+        connection.close()
+
+
+def parse_items(content_type, body):
+    """
+    Parse an upload into a list of entries
+    :param content_type: String, NDJSON or otherwise JSON
+    :param body: Bytes, JSON entry, JSON array of entries or NDJSON
+    :return: List of entry data
+    """
+    if content_type.startswith(NDJSONParser.media_type):
+        parser = NDJSONParser()
+    else:
+        parser = JSONParser()
+    items = parser.parse(io.BytesIO(body))
+    if isinstance(items, dict):
+        items = [items]
+    if not isinstance(items, list):
+        raise ParseError(INVALID_JSON)
+    return items
+
+
+def parse_payload(job):
+    return parse_items(job.content_type, bytes(job.payload))
+
+
+def update_job(jobs, **fields):
+    with atomic_write():
+        return jobs.update(**fields)
+
+
+def run_job(pk):
+    """
+    Claim a queued job and run the validation and save of its entries
+    :param pk: Integer, DepositionJob pk
+    :return: Boolean, False if the job was not queued (i.e. claimed by another worker)
+    """
+    jobs = DepositionJob.objects.filter(pk=pk)
+    if not update_job(jobs.filter(status="queued"), status="running"):
+        return False
+    job = jobs.get()
+    try:
+        items = parse_payload(job)
+        update_job(jobs, total=len(items))
+        deposition = BatchDeposition(job.owner, job.data_resource,
+                                     progress=lambda processed: update_job(jobs, processed=processed))
+        results, _ = deposition.deposit(items)
+        update_job(jobs, status="finished", processed=len(items), results=json.dumps(results),
+                   payload=None, finished=timezone.now())
+    except ParseError as error:
+        update_job(jobs, status="failed", error=str(error.detail), finished=timezone.now())
+    except Exception as error:
+        logger.exception("Deposition job %s failed", pk)
+        update_job(jobs, status="failed", error=str(error), finished=timezone.now())
+    return True
+
+
+def run_queued():
+    """
+    Run the queued jobs in order of submission, i.e. after a restart
+    :return: Integer, number of jobs run here and not by another worker
+    """
+    count = 0
+    for pk in DepositionJob.objects.filter(status="queued").order_by("pk").values_list("pk", flat=True):
+        if run_job(pk):
+            count += 1
+    return count
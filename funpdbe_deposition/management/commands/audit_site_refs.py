@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from funpdbe_deposition.queries import dangling_site_refs_by_entry
+from funpdbe_deposition.validation import resource_valid
+
+
+class Command(BaseCommand):
+    help = "List the entries with site data referring to a site_id missing from their sites"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resource", dest="resource", default=None, help="Audit only this resource")
+
+    def handle(self, *args, **options):
+        if options["resource"] is not None and not resource_valid(options["resource"]):
+            raise CommandError("Invalid data resource %s" % options["resource"])
+        entries = total = 0
+        for pdb_id, data_resource, dangling in dangling_site_refs_by_entry(options["resource"]).iterator():
+            self.stdout.write("%s\t%s\t%d" % (data_resource, pdb_id, dangling))
+            entries += 1
+            total += dangling
+        self.stdout.write("Found %d dangling site references in %d entries" % (total, entries))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from funpdbe_deposition import export
+from funpdbe_deposition.validation import resource_valid
+
+
+class Command(BaseCommand):
+    help = "Export the site data of every residue of a resource as a flat CSV or NumPy .npz table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", help="Resource name")
+        parser.add_argument("path", help="Output file, the format is taken from its extension (.csv or .npz)")
+
+    def handle(self, *args, **options):
+        if not resource_valid(options["resource"]):
+            raise CommandError("Invalid data resource %s" % options["resource"])
+        output = options["path"].rsplit(".", 1)[-1]
+        if output not in export.OUTPUT_FORMATS:
+            raise CommandError("Unknown output format %s, use .csv or .npz" % output)
+        if output == "npz" and export.numpy is None:
+            raise CommandError("NumPy is required for the .npz export")
+        rows = export.score_rows(options["resource"])
+        with open(options["path"], "wb") as handle:
+            if output == "csv":
+                for chunk in export.csv_chunks(rows):
+                    handle.write(chunk)
+            else:
+                handle.write(export.npz_bytes(rows))
+        self.stdout.write("Exported the scores of %s to %s" % (options["resource"], options["path"]))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from funpdbe_deposition.changes import CHANGES_RETENTION_DAYS
+from funpdbe_deposition.changes import prune
+
+
+class Command(BaseCommand):
+    help = "Delete the change log events older than the retention period, i.e. daily from cron"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=CHANGES_RETENTION_DAYS, dest="days",
+                            help="Days events are kept for")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Deleted %d change events" % prune(options["days"]))
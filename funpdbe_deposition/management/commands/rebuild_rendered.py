@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.rendering import RENDER_VERSION
+from funpdbe_deposition.rendering import CHUNK_SIZE
+from funpdbe_deposition.rendering import store_rendered
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-rendered JSON documents of entries which are stale or missing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", dest="all",
+                            help="Rebuild every document, i.e. after changing FUNPDBE_COMPRESS_RENDERED")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, dest="chunk_size",
+                            help="Number of entries rendered together")
+
+    def handle(self, *args, **options):
+        entries = Entry.objects.all()
+        if not options["all"]:
+            entries = entries.filter(Q(rendered_json__isnull=True) | ~Q(rendered_version=RENDER_VERSION) |
+                                     Q(rendered_version__isnull=True) | Q(rendered_hash__isnull=True))
+        rendered = store_rendered(entries, options["chunk_size"])
+        self.stdout.write("Rebuilt %d pre-rendered documents" % len(rendered))
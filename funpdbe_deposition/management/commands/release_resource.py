@@ -0,0 +1,52 @@
+import json
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from rest_framework.exceptions import ParseError
+from funpdbe_deposition.jobs import parse_items
+from funpdbe_deposition.parsers import NDJSONParser
+from funpdbe_deposition.release import ResourceRelease
+from funpdbe_deposition.validation import resource_valid
+
+
+class Command(BaseCommand):
+    help = "Purge one release of a resource, or replace it with the entries of a JSON or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", help="Resource name")
+        parser.add_argument("version", help="resource_version of the release to purge or replace")
+        parser.add_argument("--replace", dest="replace", metavar="FILE",
+                            help="JSON array or NDJSON (.ndjson, .jsonl) file with the new entries")
+        parser.add_argument("--owner", dest="owner",
+                            help="Username of the owner of the new entries")
+
+    def read_items(self, path):
+        content_type = NDJSONParser.media_type if path.endswith((".ndjson", ".jsonl")) else "application/json"
+        with open(path, "rb") as handle:
+            try:
+                return parse_items(content_type, handle.read())
+            except ParseError as error:
+                raise CommandError(str(error.detail))
+
+    def handle(self, *args, **options):
+        if not resource_valid(options["resource"]):
+            raise CommandError("Invalid data resource %s" % options["resource"])
+        owner = None
+        if options["owner"]:
+            owner = User.objects.filter(username=options["owner"]).first()
+            if owner is None:
+                raise CommandError("No user %s" % options["owner"])
+        elif options["replace"]:
+            raise CommandError("--owner is required with --replace")
+        release = ResourceRelease(owner, options["resource"], options["version"])
+
+        if not options["replace"]:
+            self.stdout.write("Deleted %d entries" % release.purge())
+            return
+        deleted, results, _ = release.replace(self.read_items(options["replace"]))
+        failed = [result for result in results if "errors" in result]
+        if failed:
+            for result in failed:
+                self.stderr.write("Entry %d: %s" % (result["index"], json.dumps(result["errors"])))
+            raise CommandError("%d invalid entries, the release was not changed" % len(failed))
+        self.stdout.write("Deleted %d entries, created %d entries" % (deleted, len(results)))
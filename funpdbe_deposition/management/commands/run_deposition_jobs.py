@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from funpdbe_deposition.models import DepositionJob
+from funpdbe_deposition.jobs import run_queued
+from funpdbe_deposition.jobs import update_job
+
+
+class Command(BaseCommand):
+    help = "Run queued deposition jobs, i.e. as a separate worker process or after a restart"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", dest="loop",
+                            help="Keep polling for new jobs")
+        parser.add_argument("--interval", type=float, default=5.0, dest="interval",
+                            help="Seconds between polls when looping")
+        parser.add_argument("--requeue", action="store_true", dest="requeue",
+                            help="Requeue jobs left running by a stopped worker before starting")
+
+    def handle(self, *args, **options):
+        if options["requeue"]:
+            update_job(DepositionJob.objects.filter(status="running"), status="queued", processed=0)
+        while True:
+            count = run_queued()
+            if count:
+                self.stdout.write("Ran %d deposition jobs" % count)
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
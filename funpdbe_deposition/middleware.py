@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses shorter than this are not worth compressing
+MIN_LENGTH = 200
+BROTLI_QUALITY = getattr(settings, "FUNPDBE_BROTLI_QUALITY", 5)
+
+
+def accepted_encodings(header):
+    """
+    :param header: String, value of Accept-Encoding
+    :return: Set of the content codings the client accepts
+    """
+    accepted = set()
+    for item in header.split(","):
+        parts = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for parameter in parts[1:]:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        if parts[0] and quality > 0:
+            accepted.add(parts[0].lower())
+    return accepted
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def brotli_string(content):
+    return brotli.compress(content, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli, when the client accepts it and the
+    brotli package is installed, or else with gzip, like GZipMiddleware
+    Strong ETags are made weak, as they describe the uncompressed content,
+    which still lets conditional requests match them
+    """
+
+    def choose_encoding(self, request):
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < MIN_LENGTH:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+        if response.streaming:
+            compress = brotli_sequence if encoding == "br" else compress_sequence
+            response.streaming_content = compress(response.streaming_content)
+            # The compressed size is not known before it is streamed
+            if response.has_header("Content-Length"):
+                del response["Content-Length"]
+        else:
+            compress = brotli_string if encoding == "br" else compress_string
+            compressed = compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0001_squashed_0005_auto_20180306_1359'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sitedata',
+            name='site_id_ref',
+            field=models.IntegerField(null=True, verbose_name='Site JSON reference identifier'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0006_alter_sitedata_site_id_ref'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='rendered_json',
+            field=models.BinaryField(editable=False, null=True, verbose_name='Pre-rendered JSON document, optionally compressed'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='rendered_version',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Format version of the pre-rendered JSON document'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0007_entry_rendered'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chain',
+            index=models.Index(fields=['entry_ref', 'chain_label'], name='chain_entry_label_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['data_resource', 'pdb_id'], name='entry_resource_pdb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='site',
+            index=models.Index(fields=['entry_ref', 'site_id'], name='site_entry_site_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sitedata',
+            index=models.Index(fields=['residue_ref', 'site_id_ref'], name='sitedata_residue_site_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('funpdbe_deposition', '0008_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepositionJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_resource', models.CharField(choices=[('cath-funsites', 'cath-funsites'), ('nod', 'nod'), ('3dligandsite', '3dligandsite'), ('cansar', 'cansar'), ('credo', 'credo'), ('popscomp', 'popscomp'), ('14-3-3-pred', '14-3-3-pred'), ('dynamine', 'dynamine')], max_length=255, verbose_name='Resource name')),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('running', 'running'), ('finished', 'finished'), ('failed', 'failed')], default='queued', max_length=20, verbose_name='Status of the job')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Content type of the uploaded data')),
+                ('payload', models.BinaryField(null=True, verbose_name='Uploaded data, removed when the job is done')),
+                ('total', models.IntegerField(default=0, verbose_name='Number of entries in the upload')),
+                ('processed', models.IntegerField(default=0, verbose_name='Number of entries validated so far')),
+                ('results', models.TextField(null=True, verbose_name='JSON list of results, one per entry')),
+                ('error', models.TextField(null=True, verbose_name='Error which stopped the job')),
+                ('submitted', models.DateTimeField(auto_now_add=True, verbose_name='Time of submission')),
+                ('finished', models.DateTimeField(null=True, verbose_name='Time of completion')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deposition_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
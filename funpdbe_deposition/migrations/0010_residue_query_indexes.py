@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0009_depositionjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='residue',
+            index=models.Index(fields=['chain_ref', 'pdb_res_label'], name='residue_chain_label_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sitedata',
+            index=models.Index(fields=['residue_ref', 'confidence_score'], name='sitedata_residue_conf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sitedata',
+            index=models.Index(fields=['residue_ref', 'raw_score'], name='sitedata_residue_raw_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0010_residue_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='rendered_hash',
+            field=models.CharField(editable=False, max_length=40, null=True, verbose_name='SHA-1 of the uncompressed pre-rendered JSON document'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Time of the first deposition'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Time of the last change'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0011_entry_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('created', 'created'), ('updated', 'updated'), ('deleted', 'deleted')], max_length=10, verbose_name='Type of the change')),
+                ('entry_pk', models.IntegerField(verbose_name='Primary key of the changed entry')),
+                ('pdb_id', models.CharField(max_length=4, verbose_name='PDB identifier')),
+                ('data_resource', models.CharField(choices=[('cath-funsites', 'cath-funsites'), ('nod', 'nod'), ('3dligandsite', '3dligandsite'), ('cansar', 'cansar'), ('credo', 'credo'), ('popscomp', 'popscomp'), ('14-3-3-pred', '14-3-3-pred'), ('dynamine', 'dynamine')], max_length=255, verbose_name='Resource name')),
+                ('time', models.DateTimeField(auto_now_add=True, verbose_name='Time of the change')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(fields=['data_resource', 'id'], name='change_resource_seq_idx'),
+        ),
+    ]
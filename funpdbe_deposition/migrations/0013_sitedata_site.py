@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0012_changeevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitedata',
+            name='site',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='site_data', to='funpdbe_deposition.site', verbose_name='Site this site data belongs to'),
+        ),
+    ]
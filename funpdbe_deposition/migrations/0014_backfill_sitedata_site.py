@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db import transaction
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import OuterRef
+from django.db.models import Subquery
+
+# Site data rows linked per transaction, short enough not to block depositions
+CHUNK_SIZE = 10000
+
+
+def backfill_site(apps, schema_editor):
+    """
+    Resolve (entry, site_id_ref) to the Site of every SiteData, one range
+    of primary keys per transaction, so the table is never locked for long
+    and the migration can be interrupted and run again
+    """
+    SiteData = apps.get_model("funpdbe_deposition", "SiteData")
+    Site = apps.get_model("funpdbe_deposition", "Site")
+    using = schema_editor.connection.alias
+    bounds = SiteData.objects.using(using).aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return
+    site = Site.objects.using(using).filter(site_id=OuterRef("site_id_ref"),
+                                            entry_ref__chains__residues=OuterRef("residue_ref")).values("pk")[:1]
+    for start in range(bounds["low"], bounds["high"] + 1, CHUNK_SIZE):
+        with transaction.atomic(using=using):
+            SiteData.objects.using(using).filter(pk__gte=start, pk__lt=start + CHUNK_SIZE, site__isnull=True,
+                                                 site_id_ref__isnull=False).update(site=Subquery(site))
+
+
+class Migration(migrations.Migration):
+    # Every chunk is committed on its own
+    atomic = False
+
+    dependencies = [
+        ('funpdbe_deposition', '0013_sitedata_site'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_site, migrations.RunPython.noop),
+    ]
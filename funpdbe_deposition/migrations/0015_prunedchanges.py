@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funpdbe_deposition', '0014_backfill_sitedata_site'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrunedChanges',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.IntegerField(verbose_name='Sequence number of the last pruned event')),
+                ('time', models.DateTimeField(auto_now_add=True, verbose_name='Time of the pruning')),
+            ],
+        ),
+    ]
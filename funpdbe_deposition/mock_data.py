@@ -29,4 +29,37 @@ class MockData(object):
                     "source_accession": "2abc",
                     "source_release_date": "01/01/2000"}],
             "evidence_code_ontology": [{"eco_term": "computational combinatorial evidence used in automatic assertion",
-                "eco_code": "ECO:0000246"}]}
\ No newline at end of file
+                "eco_code": "ECO:0000246"}]}
+
+    @staticmethod
+    def generate(pdb_id="2abc", data_resource="cath-funsites", chains=1, residues=10, site_data=1):
+        """
+        Generate a valid entry of arbitrary size, i.e. for testing
+        bulk operations and for benchmarks
+        :param pdb_id: String, PDB id of the entry
+        :param data_resource: String, resource name
+        :param chains: Integer, number of chains
+        :param residues: Integer, number of residues per chain
+        :param site_data: Integer, number of site data per residue
+        :return: Dict
+        """
+        data = MockData.set_data()
+        data["pdb_id"] = pdb_id
+        data["data_resource"] = data_resource
+        data["sites"] = [{"site_id": site_id,
+                          "label": "ligand_binding_site",
+                          "source_database": "pdb",
+                          "source_accession": pdb_id,
+                          "source_release_date": "01/01/2000"} for site_id in range(1, site_data + 1)]
+        data["chains"] = [{"chain_label": chr(ord("A") + chain % 26) + (str(chain // 26) if chain >= 26 else ""),
+                           "chain_annotation": "foo",
+                           "residues": [{"pdb_res_label": str(residue),
+                                         "aa_type": "ALA",
+                                         "site_data": [{"site_id_ref": site_id,
+                                                        "raw_score": (residue % 100) / 100.0,
+                                                        "confidence_score": 0.9,
+                                                        "confidence_classification": "high"}
+                                                       for site_id in range(1, site_data + 1)]}
+                                        for residue in range(1, residues + 1)]}
+                          for chain in range(chains)]
+        return data
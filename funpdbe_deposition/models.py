@@ -21,6 +21,17 @@ CLASSIFICATION = (
     ("high" ,"high"),
     ("null", "null")
 )
+CHANGE_ACTIONS = (
+    ("created", "created"),
+    ("updated", "updated"),
+    ("deleted", "deleted")
+)
+JOB_STATUS = (
+    ("queued", "queued"),
+    ("running", "running"),
+    ("finished", "finished"),
+    ("failed", "failed")
+)
 
 
 class Entry(models.Model):
@@ -52,8 +63,32 @@ class Entry(models.Model):
                                     max_length=10,
                                     null=True)
 
+    rendered_json = models.BinaryField("Pre-rendered JSON document, optionally compressed",
+                                       null=True,
+                                       editable=False)
+
+    rendered_version = models.IntegerField("Format version of the pre-rendered JSON document",
+                                           null=True,
+                                           editable=False)
+
+    rendered_hash = models.CharField("SHA-1 of the uncompressed pre-rendered JSON document",
+                                     max_length=40,
+                                     null=True,
+                                     editable=False)
+
+    created = models.DateTimeField("Time of the first deposition",
+                                   auto_now_add=True)
+
+    updated = models.DateTimeField("Time of the last change",
+                                   auto_now=True,
+                                   db_index=True)
+
     class Meta:
         unique_together = ("pdb_id", "data_resource")
+        # The unique constraint above already indexes lookups by pdb_id
+        indexes = [
+            models.Index(fields=["data_resource", "pdb_id"], name="entry_resource_pdb_idx")
+        ]
 
 
 class Chain(models.Model):
@@ -72,6 +107,11 @@ class Chain(models.Model):
                                         null=True,
                                         max_length=255)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["entry_ref", "chain_label"], name="chain_entry_label_idx")
+        ]
+
 
 class Residue(models.Model):
     """
@@ -88,6 +128,11 @@ class Residue(models.Model):
     aa_type = models.CharField("Amino acid code",
                                max_length=3)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["chain_ref", "pdb_res_label"], name="residue_chain_label_idx")
+        ]
+
 
 class SiteData(models.Model):
     """
@@ -101,6 +146,13 @@ class SiteData(models.Model):
     site_id_ref = models.IntegerField("Site JSON reference identifier",
                                       null=True)
 
+    # The Site of the same entry with site_id equal to site_id_ref
+    site = models.ForeignKey("Site",
+                             verbose_name="Site this site data belongs to",
+                             related_name="site_data",
+                             null=True,
+                             on_delete=models.SET_NULL)
+
     raw_score = models.FloatField("Value",
                               null=True)
 
@@ -112,6 +164,14 @@ class SiteData(models.Model):
                                       max_length=100,
                                       null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["residue_ref", "site_id_ref"], name="sitedata_residue_site_idx"),
+            # Score filters of the residue query, applied per residue of the matched chains
+            models.Index(fields=["residue_ref", "confidence_score"], name="sitedata_residue_conf_idx"),
+            models.Index(fields=["residue_ref", "raw_score"], name="sitedata_residue_raw_idx")
+        ]
+
 
 class Site(models.Model):
     """
@@ -138,6 +198,11 @@ class Site(models.Model):
                                            max_length=10,
                                            null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["entry_ref", "site_id"], name="site_entry_site_id_idx")
+        ]
+
 
 class EvidenceCodeOntology(models.Model):
     """
@@ -153,3 +218,81 @@ class EvidenceCodeOntology(models.Model):
     eco_code = models.CharField("Evidence Code Ontology code",
                                 max_length=255,
                                 null=True)
+
+
+class DepositionJob(models.Model):
+    """
+    Asynchronous deposition of one or more entries
+    """
+    owner = models.ForeignKey('auth.User', related_name='deposition_jobs', on_delete=models.CASCADE)
+
+    data_resource = models.CharField("Resource name",
+                                     choices=RESOURCES,
+                                     max_length=255)
+
+    status = models.CharField("Status of the job",
+                              choices=JOB_STATUS,
+                              max_length=20,
+                              default="queued")
+
+    content_type = models.CharField("Content type of the uploaded data",
+                                    max_length=100)
+
+    payload = models.BinaryField("Uploaded data, removed when the job is done",
+                                 null=True)
+
+    total = models.IntegerField("Number of entries in the upload",
+                                default=0)
+
+    processed = models.IntegerField("Number of entries validated so far",
+                                    default=0)
+
+    results = models.TextField("JSON list of results, one per entry",
+                               null=True)
+
+    error = models.TextField("Error which stopped the job",
+                             null=True)
+
+    submitted = models.DateTimeField("Time of submission",
+                                     auto_now_add=True)
+
+    finished = models.DateTimeField("Time of completion",
+                                    null=True)
+
+
+class ChangeEvent(models.Model):
+    """
+    Change log of the entries, the pk is the sequence number of the change
+    Entries are referenced by value, so that the events outlive them
+    """
+    action = models.CharField("Type of the change",
+                              choices=CHANGE_ACTIONS,
+                              max_length=10)
+
+    entry_pk = models.IntegerField("Primary key of the changed entry")
+
+    pdb_id = models.CharField("PDB identifier",
+                              max_length=4)
+
+    data_resource = models.CharField("Resource name",
+                                     choices=RESOURCES,
+                                     max_length=255)
+
+    time = models.DateTimeField("Time of the change",
+                                auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["data_resource", "id"], name="change_resource_seq_idx")
+        ]
+
+
+class PrunedChanges(models.Model):
+    """
+    Runs of prune_changes, so that mirrors which last synced before the
+    pruned events can be told to copy the entries again
+    """
+    seq = models.IntegerField("Sequence number of the last pruned event")
+
+    time = models.DateTimeField("Time of the pruning",
+                                auto_now_add=True)
@@ -0,0 +1,146 @@
+import base64
+import binascii
+import json
+from django.conf import settings
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.rendering import documents
+from funpdbe_deposition.rendering import json_list
+from funpdbe_deposition.rendering import parsed
+from funpdbe_deposition.rendering import stored_accepted
+from funpdbe_deposition.conditional import ResultSet
+from funpdbe_deposition.conditional import conditional_response
+from funpdbe_deposition.compact import COMPACT_ETAG_PREFIX
+from funpdbe_deposition.compact import compact_document
+from funpdbe_deposition.compact import compact_requested
+
+PAGE_SIZE = getattr(settings, "FUNPDBE_PAGE_SIZE", 100)
+MAX_PAGE_SIZE = getattr(settings, "FUNPDBE_MAX_PAGE_SIZE", 1000)
+CURSOR_PARAM = "cursor"
+PAGE_SIZE_PARAM = "page_size"
+STREAM_PARAM = "stream"
+
+
+def encode_cursor(direction, pk):
+    """
+    Cursors are opaque to the clients, but they simply encode
+    the direction ("a" for after, "b" for before) and an Entry pk
+    """
+    return base64.urlsafe_b64encode(("%s%d" % (direction, pk)).encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
+        direction, pk = decoded[0], int(decoded[1:])
+    except (ValueError, IndexError, TypeError, binascii.Error, UnicodeError):
+        return None
+    if direction not in ("a", "b") or pk < 0:
+        return None
+    return direction, pk
+
+
+def pagination_requested(request):
+    return CURSOR_PARAM in request.query_params or PAGE_SIZE_PARAM in request.query_params
+
+
+def stream_requested(request):
+    return request.query_params.get(STREAM_PARAM, "").lower() in ("1", "true", "yes")
+
+
+class KeysetPaginator(object):
+    """
+    Keyset (seek) pagination on Entry.pk
+
+    Unlike offset pagination, every page is a single indexed range scan,
+    no matter how deep into the archive the client is
+    """
+
+    def __init__(self, request, queryset):
+        self.request = request
+        self.queryset = queryset
+
+    def get_page_size(self):
+        try:
+            page_size = int(self.request.query_params.get(PAGE_SIZE_PARAM, PAGE_SIZE))
+        except ValueError:
+            return None
+        if page_size < 1:
+            return None
+        return min(page_size, MAX_PAGE_SIZE)
+
+    def get_page(self, page_size, cursor):
+        pks = self.queryset.values_list("pk", flat=True)
+        if cursor is None or cursor[0] == "a":
+            after = cursor[1] if cursor else 0
+            page = list(pks.filter(pk__gt=after).order_by("pk")[:page_size + 1])
+            has_next = len(page) > page_size
+            page = page[:page_size]
+            has_prev = bool(page) and pks.filter(pk__lt=page[0]).exists()
+        else:
+            page = list(pks.filter(pk__lt=cursor[1]).order_by("-pk")[:page_size + 1])
+            has_prev = len(page) > page_size
+            page = list(reversed(page[:page_size]))
+            has_next = bool(page) and pks.filter(pk__gt=page[-1]).exists()
+        return page, has_next, has_prev
+
+    def link(self, direction, pk):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, CURSOR_PARAM, encode_cursor(direction, pk))
+
+    def get_response(self):
+        page_size = self.get_page_size()
+        if page_size is None:
+            return Response("Invalid page size", status=status.HTTP_400_BAD_REQUEST)
+        cursor = None
+        if CURSOR_PARAM in self.request.query_params:
+            cursor = decode_cursor(self.request.query_params[CURSOR_PARAM])
+            if cursor is None:
+                return Response("Invalid cursor", status=status.HTTP_400_BAD_REQUEST)
+
+        page, has_next, has_prev = self.get_page(page_size, cursor)
+        links = {
+            "next": self.link("a", page[-1]) if has_next else None,
+            "prev": self.link("b", page[0]) if has_prev else None
+        }
+        # The stored entry documents are spliced into the page as they are
+        prefix = json.dumps(links)[:-1].encode("utf-8")
+        compact = compact_requested(self.request)
+
+        def respond(items):
+            if compact:
+                items = [compact_document(document) for document in items]
+            content = prefix + b',"results":' + json_list(items) + b"}"
+            return HttpResponse(content, content_type="application/json")
+
+        if not stored_accepted(self.request):
+            items = documents(Entry.objects.filter(pk__in=page))
+            if compact:
+                items = (compact_document(document) for document in items)
+            return Response(dict(links, results=parsed(items)))
+        etag_prefix = COMPACT_ETAG_PREFIX + prefix if compact else prefix
+        return conditional_response(self.request, ResultSet(Entry.objects.filter(pk__in=page)), respond, etag_prefix)
+
+
+def stream_entries(queryset, transform=None):
+    """
+    Stream a JSON list of entries, writing one entry at a time
+    so that the whole archive is never held in memory
+    :param queryset: QuerySet of Entry
+    :param transform: Callable, applied to every document, i.e. compact_document
+    :return: StreamingHttpResponse
+    """
+
+    def generate():
+        yield b"["
+        for index, document in enumerate(documents(queryset)):
+            if index:
+                yield b","
+            yield transform(document) if transform else document
+        yield b"]"
+
+    return StreamingHttpResponse(generate(), content_type="application/json")
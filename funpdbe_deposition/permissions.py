@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.db import transaction
+from funpdbe_deposition.caching import cache_ttl
+
+# 0 disables the cache, which is the default unless the cache is shared by the workers
+PERMISSION_TTL = cache_ttl("FUNPDBE_PERMISSION_TTL", 300)
+
+
+def cache_key(user_pk):
+    return "funpdbe_deposition:resources:%s" % user_pk
+
+
+def user_resources(user):
+    """
+    The resources a user is allowed to deposit to, i.e. the names of the
+    groups of the user, cached for FUNPDBE_PERMISSION_TTL seconds
+    The cache is invalidated when group memberships change, see signals.py
+    :param user: User or AnonymousUser
+    :return: Frozenset of resource names
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    if not PERMISSION_TTL:
+        return frozenset(user.groups.values_list("name", flat=True))
+    resources = cache.get(cache_key(user.pk))
+    if resources is None:
+        resources = frozenset(user.groups.values_list("name", flat=True))
+        cache.set(cache_key(user.pk), resources, PERMISSION_TTL)
+    return resources
+
+
+def can_deposit(user, resource):
+    """
+    :param user: User or AnonymousUser
+    :param resource: String, resource name
+    :return: Boolean
+    """
+    return resource in user_resources(user)
+
+
+def invalidate(user_pks):
+    """
+    Forget the cached resources of the users, right away and again once
+    the current transaction commits, as a request may cache the old groups
+    in between
+    :param user_pks: Iterable of User pks
+    :return: None
+    """
+    keys = [cache_key(pk) for pk in user_pks]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
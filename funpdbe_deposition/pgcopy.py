@@ -0,0 +1,91 @@
+"""
+COPY based bulk loading of residues and site data on PostgreSQL
+
+Primary keys are reserved from the sequence of the table first, so the
+rows can be streamed with COPY ... FROM STDIN, which is much faster than
+INSERT statements, and still be referenced by the rows of the next level
+Used by bulk.bulk_insert only when the default database is PostgreSQL
+"""
+import io
+from django.conf import settings
+from django.db import connection
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import SiteData
+
+# Set to False to always use INSERT statements
+USE_COPY = getattr(settings, "FUNPDBE_PG_COPY", True)
+# Fewer rows are inserted with bulk_create, as COPY has a fixed overhead
+COPY_MIN_ROWS = getattr(settings, "FUNPDBE_PG_COPY_MIN_ROWS", 1000)
+# Rows written to the COPY buffer at once
+COPY_CHUNK_SIZE = getattr(settings, "FUNPDBE_PG_COPY_CHUNK_SIZE", 20000)
+COPY_MODELS = (Residue, SiteData)
+ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_supported(model, objects):
+    """
+    :return: Boolean, whether the objects should be loaded with COPY
+    """
+    return USE_COPY and model in COPY_MODELS and len(objects) >= COPY_MIN_ROWS and \
+        connection.vendor == "postgresql"
+
+
+def copy_value(value):
+    """
+    :param value: Value prepared for the database
+    :return: String, the value in the COPY text format
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value).translate(ESCAPES)
+
+
+def copy_rows(objects, attnames):
+    """
+    The fields of COPY_MODELS hold integers, floats, strings or None,
+    which are written as they are, without get_db_prep_save
+    :return: StringIO, one tab separated line per object
+    """
+    buffer = io.StringIO()
+    for obj in objects:
+        values = obj.__dict__
+        buffer.write("\t".join([copy_value(values[attname]) for attname in attnames]))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def reserve_pks(cursor, model, count):
+    table = model._meta.db_table
+    cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+                   [table, model._meta.pk.column, count])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def copy_insert(model, objects):
+    """
+    Insert the objects with COPY and set their primary keys
+    :param model: Model class, one of COPY_MODELS
+    :param objects: List of unsaved model instances
+    :return: List of saved model instances
+    """
+    quote = connection.ops.quote_name
+    fields = model._meta.concrete_fields
+    statement = "COPY %s (%s) FROM STDIN" % (quote(model._meta.db_table),
+                                             ", ".join(quote(field.column) for field in fields))
+    with connection.cursor() as cursor:
+        for obj, pk in zip(objects, reserve_pks(cursor, model, len(objects))):
+            obj.pk = pk
+        # The psycopg2 cursor under the Django wrapper
+        copy_cursor = cursor.cursor
+        for start in range(0, len(objects), COPY_CHUNK_SIZE):
+            copy_cursor.copy_expert(statement, copy_rows(objects[start:start + COPY_CHUNK_SIZE],
+                                                         [field.attname for field in fields]))
+    for obj in objects:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+    return objects
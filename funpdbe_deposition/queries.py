@@ -0,0 +1,122 @@
+import math
+from django.db.models import Count
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.db.models import Prefetch
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Chain
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.models import Site
+from funpdbe_deposition.models import EvidenceCodeOntology
+from funpdbe_deposition.export import COLUMNS
+from funpdbe_deposition.validation import resource_valid
+from funpdbe_deposition.validation import classification_valid
+
+RESIDUE_COLUMNS = (("data_resource", "residue_ref__chain_ref__entry_ref__data_resource"),) + COLUMNS + \
+                  (("site_label", "site__label"),)
+# Query parameter and the SiteData lookup of the score filters
+SCORE_FILTERS = (
+    ("min_raw_score", "raw_score__gte"),
+    ("max_raw_score", "raw_score__lte"),
+    ("min_confidence_score", "confidence_score__gte"),
+    ("max_confidence_score", "confidence_score__lte")
+)
+
+
+def entry_tree_prefetches():
+    """
+    Prefetch plan for the nested tree serialized by EntrySerializer
+    Every level is fetched with one query, ordered as it was deposited
+    :return: List of Prefetch
+    """
+    return [
+        Prefetch("chains", queryset=Chain.objects.order_by("pk")),
+        Prefetch("chains__residues", queryset=Residue.objects.order_by("pk")),
+        Prefetch("chains__residues__site_data", queryset=SiteData.objects.order_by("pk")),
+        Prefetch("sites", queryset=Site.objects.order_by("pk")),
+        Prefetch("evidence_code_ontology", queryset=EvidenceCodeOntology.objects.order_by("pk"))
+    ]
+
+
+def entry_queryset(queryset=None):
+    """
+    Shared query plan of the read views: serializing the entries costs
+    a fixed number of queries, no matter how many entries or residues
+    there are
+    :param queryset: QuerySet of Entry, or None for all entries
+    :return: QuerySet of Entry
+    """
+    if queryset is None:
+        queryset = Entry.objects.all()
+    return queryset.defer("rendered_json").select_related("owner").prefetch_related(*entry_tree_prefetches())
+
+
+def residue_filters(params):
+    """
+    Translate the query parameters of a residue query into SiteData lookups
+    :param params: Dict-like, query parameters
+    :return: Dict, keyword arguments of QuerySet.filter
+    :raises ValueError: when a parameter has an invalid value
+    """
+    filters = {}
+    for param, lookup in SCORE_FILTERS:
+        if param in params:
+            try:
+                value = float(params[param])
+            except ValueError:
+                value = math.nan
+            # float() also reads "nan" and "inf", which match nothing or everything
+            if not math.isfinite(value):
+                raise ValueError("Invalid %s, a number is expected" % param)
+            filters[lookup] = value
+    if "data_resource" in params:
+        if not resource_valid(params["data_resource"]):
+            raise ValueError("Invalid data resource")
+        filters["residue_ref__chain_ref__entry_ref__data_resource"] = params["data_resource"]
+    if "confidence_classification" in params:
+        if not classification_valid(params["confidence_classification"]):
+            raise ValueError("Invalid confidence_classification")
+        filters["confidence_classification"] = params["confidence_classification"]
+    if "chain_label" in params:
+        filters["residue_ref__chain_ref__chain_label"] = params["chain_label"]
+    if "pdb_res_label" in params:
+        filters["residue_ref__pdb_res_label"] = params["pdb_res_label"]
+    if "site_label" in params:
+        filters["site__label"] = params["site_label"]
+    return filters
+
+
+def residue_rows(pdb_id, filters):
+    """
+    The site data of a PDB entry, from any resource, matching the filters,
+    flattened with their residue, chain and entry by a single JOIN query
+    The lookups follow the Entry (pdb_id), Chain (entry_ref, chain_label),
+    Residue (chain_ref, pdb_res_label) and SiteData (residue_ref, score) indexes,
+    and the site label is joined through the site foreign key
+    :param pdb_id: String, lower case PDB id
+    :param filters: Dict, as returned by residue_filters
+    :return: List of dicts, with the keys of RESIDUE_COLUMNS
+    """
+    site_data = SiteData.objects.filter(residue_ref__chain_ref__entry_ref__pdb_id=pdb_id, **filters)
+    names = [name for name, _ in RESIDUE_COLUMNS]
+    rows = site_data.order_by("pk").values_list(*[lookup for _, lookup in RESIDUE_COLUMNS])
+    return [dict(zip(names, row)) for row in rows]
+
+
+def dangling_site_refs_by_entry(resource=None):
+    """
+    Count the site data of every entry whose site_id_ref matches none of
+    the sites of the entry, with one anti-join (NOT EXISTS) over the database
+    :param resource: String, resource name to audit, or None for all
+    :return: QuerySet of dicts with pdb_id, data_resource and dangling
+    """
+    entry = "residue_ref__chain_ref__entry_ref"
+    sites = Site.objects.filter(entry_ref=OuterRef(entry), site_id=OuterRef("site_id_ref"))
+    site_data = SiteData.objects.filter(site_id_ref__isnull=False)
+    if resource is not None:
+        site_data = site_data.filter(**{entry + "__data_resource": resource})
+    return site_data.annotate(has_site=Exists(sites)).filter(has_site=False) \
+        .values(entry + "__pdb_id", entry + "__data_resource") \
+        .annotate(dangling=Count("pk")).order_by(entry + "__data_resource", entry + "__pdb_id") \
+        .values_list(entry + "__pdb_id", entry + "__data_resource", "dangling")
@@ -0,0 +1,75 @@
+from django.db import transaction
+from rest_framework import status
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.bulk import delete_entries
+from funpdbe_deposition.deposition import BatchDeposition
+from funpdbe_deposition.serializers import ReleaseEntrySerializer
+from funpdbe_deposition.sqlite import atomic_write
+
+ALREADY_EXISTS = "Entry with this PDB id already exists in another release of this resource"
+
+
+class ResourceRelease(BatchDeposition):
+    """
+    Purges one release of a resource, or replaces it with a new set of entries
+
+    Every entry of the new release is validated before anything is written,
+    then the old release is deleted and the new one inserted with
+    set-based statements in a single transaction, so readers see either
+    the old release or the new one
+    """
+    serializer_class = ReleaseEntrySerializer
+
+    def __init__(self, owner, resource, version, progress=None):
+        """
+        :param owner: User, owner of the new entries
+        :param resource: String, resource name
+        :param version: String, resource_version of the release to purge or replace
+        :param progress: Callable, called with the number of validated items
+        """
+        super(ResourceRelease, self).__init__(owner, resource, progress)
+        self.version = version
+
+    def entries(self):
+        return Entry.objects.filter(data_resource=self.resource, resource_version=self.version)
+
+    def purge(self):
+        """
+        Delete every entry of the release
+        :return: Integer, number of deleted entries
+        """
+        return delete_entries(self.entries())
+
+    def conflicts(self, pdb_ids, chunk_size):
+        """
+        PDB ids which are taken by entries of the resource outside the release
+        """
+        existing = set()
+        for start in range(0, len(pdb_ids), chunk_size):
+            existing.update(Entry.objects.filter(data_resource=self.resource,
+                                                 pdb_id__in=pdb_ids[start:start + chunk_size])
+                            .values_list("pdb_id", flat=True))
+        return existing
+
+    def replace(self, items):
+        """
+        Replace the release with new entries, all or nothing
+        :param items: List of entry data
+        :return: Tuple of the number of deleted entries, the list of results
+        and the HTTP status code; if any entry is invalid, nothing is changed
+        and only the failed results are returned
+        """
+        writer, results = self.validate_items(items)
+        if len(writer.pending) != len(results):
+            return 0, [result for result in results if "errors" in result], status.HTTP_400_BAD_REQUEST
+
+        with atomic_write():
+            deleted = self.purge()
+            taken = self.conflicts([result["pdb_id"] for result in results], writer.batch_size)
+            if taken:
+                transaction.set_rollback(True)
+                failed = [dict(result, status=status.HTTP_400_BAD_REQUEST, errors={"pdb_id": [ALREADY_EXISTS]})
+                          for result in results if result["pdb_id"] in taken]
+                return 0, failed, status.HTTP_400_BAD_REQUEST
+            results, status_code = self.write(writer, results)
+        return deleted, results, status_code
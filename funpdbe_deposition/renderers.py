@@ -0,0 +1,33 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON without whitespace, rendered with orjson when it is installed
+
+    The output is equivalent to the compact output of JSONRenderer, only
+    float exponents and U+2028/U+2029 may be written differently
+    Requests asking for indentation are left to JSONRenderer
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super(CompactJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super(CompactJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder.default)
+
+
+class CompactFormatRenderer(CompactJSONRenderer):
+    """
+    Selected by ?format=compact, the entry views then send and accept
+    the residues of each chain as parallel arrays, see compact.py
+    """
+    format = "compact"
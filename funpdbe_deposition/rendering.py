@@ -0,0 +1,151 @@
+import hashlib
+import json
+import zlib
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.queries import entry_queryset
+from funpdbe_deposition.renderers import CompactJSONRenderer
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.sqlite import atomic_write
+
+# Increase when the output of EntrySerializer changes, so that
+# the stored documents are considered stale and get rebuilt
+RENDER_VERSION = 1
+COMPRESS_RENDERED = getattr(settings, "FUNPDBE_COMPRESS_RENDERED", False)
+CHUNK_SIZE = 100
+
+
+def render_entry(entry):
+    """
+    Render the JSON document of an entry, exactly as the API serves it
+    :param entry: Entry, ideally fetched through entry_queryset()
+    :return: Bytes
+    """
+    return CompactJSONRenderer().render(EntrySerializer(entry).data)
+
+
+def pack(document):
+    if COMPRESS_RENDERED:
+        return zlib.compress(document)
+    return document
+
+
+def unpack(blob):
+    blob = bytes(blob)
+    # Uncompressed documents are JSON objects, zlib streams never start with "{"
+    if blob[:1] == b"{":
+        return blob
+    return zlib.decompress(blob)
+
+
+def document_hash(document):
+    return hashlib.sha1(document).hexdigest()
+
+
+def is_stale(blob, version):
+    return blob is None or version != RENDER_VERSION
+
+
+def store_rendered(entries, chunk_size=CHUNK_SIZE):
+    """
+    Render and store the documents of the entries, one chunk at a time
+    :param entries: QuerySet of Entry
+    :param chunk_size: Integer, number of entries rendered together
+    :return: Dict of Entry pk to document
+    """
+    rendered = {}
+    pks = list(entries.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(pks), chunk_size):
+        chunk = dict((entry.pk, render_entry(entry))
+                     for entry in entry_queryset(Entry.objects.filter(pk__in=pks[start:start + chunk_size])))
+        # Rendered first, so the write transaction is short
+        with atomic_write():
+            for pk, document in chunk.items():
+                Entry.objects.filter(pk=pk).update(rendered_json=pack(document),
+                                                   rendered_version=RENDER_VERSION,
+                                                   rendered_hash=document_hash(document))
+        rendered.update(chunk)
+    return rendered
+
+
+def resolve(rows):
+    missing = [pk for pk, blob, version in rows if is_stale(blob, version)]
+    rendered = {}
+    if missing:
+        for entry in entry_queryset(Entry.objects.filter(pk__in=missing)):
+            rendered[entry.pk] = render_entry(entry)
+    for pk, blob, version in rows:
+        if pk in rendered:
+            yield rendered[pk]
+        else:
+            yield unpack(blob)
+
+
+def documents(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield the JSON document of every entry in pk order
+
+    Stored documents are sent back as they are, the ones which are
+    missing or stale are rendered on the fly, one chunk at a time
+    :param queryset: QuerySet of Entry
+    :param chunk_size: Integer, number of entries rendered together
+    :return: Generator of bytes
+    """
+    rows = queryset.order_by("pk").values_list("pk", "rendered_json", "rendered_version")
+    chunk = []
+    for row in rows.iterator():
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            for document in resolve(chunk):
+                yield document
+            chunk = []
+    for document in resolve(chunk):
+        yield document
+
+
+def stored_accepted(request):
+    """
+    Whether the stored documents can be sent as they are, i.e. the
+    negotiated renderer writes JSON without indentation, unlike the
+    browsable API (?format=api) or an Accept header asking for indent=N
+    :param request: Request, or None
+    :return: Boolean
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is None:
+        return True
+    return isinstance(renderer, JSONRenderer) and not renderer.get_indent(request.accepted_media_type or "", {})
+
+
+def parsed(items):
+    """
+    :param items: Iterable of JSON documents, as bytes
+    :return: List of the data of the documents, for DRF to render
+    """
+    return [json.loads(document.decode("utf-8")) for document in items]
+
+
+def json_list(items):
+    return b"[" + b",".join(items) + b"]"
+
+
+def list_response(items, status=200):
+    """
+    Response with a JSON list of documents
+    :param items: Iterable of bytes
+    :param status: Integer, HTTP status code
+    :return: HttpResponse
+    """
+    return HttpResponse(json_list(items), status=status, content_type="application/json")
+
+
+def rendered_response(queryset, status=200):
+    """
+    Response with the JSON list of the documents of the entries
+    :param queryset: QuerySet of Entry
+    :param status: Integer, HTTP status code
+    :return: HttpResponse
+    """
+    return list_response(documents(queryset), status)
@@ -0,0 +1,257 @@
+"""
+Nested serializers compiled into plain Python checks
+
+The fields of a serializer (i.e. ChainSerializer, with its residues and
+site data) are turned once into one small function per field, which only
+accepts values in their canonical JSON form and returns exactly what the
+DRF field would return for them. Anything else, i.e. a missing field,
+a number sent as a string or an invalid value, makes the compiled check
+give up, and the data is validated again by the serializer itself, so
+errors and their field paths are always the ones of DRF
+
+Large entries are split into groups of chains validated by a pool of processes
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.conf import settings
+from django.core import validators
+from rest_framework import fields
+from rest_framework import serializers
+
+# Number of processes validating the chains of large entries, 0 to disable the pool
+VALIDATION_WORKERS = getattr(settings, "FUNPDBE_VALIDATION_WORKERS", min(4, os.cpu_count() or 1))
+# Smallest number of residues validated by the pool
+PARALLEL_RESIDUES = getattr(settings, "FUNPDBE_PARALLEL_RESIDUES", 50000)
+# Validators of model fields, which the compiled checks implement
+KNOWN_VALIDATORS = (validators.MaxLengthValidator, validators.MinLengthValidator,
+                    validators.MaxValueValidator, validators.MinValueValidator,
+                    validators.ProhibitNullCharactersValidator)
+INVALID = object()
+
+compiled_serializers = {}
+pool = None
+
+
+def compile_char_field(field):
+    max_length = field.max_length
+    min_length = max(field.min_length or 0, 1)
+
+    def check(value):
+        # Only ASCII strings without surrounding whitespace,
+        # which DRF stores unchanged
+        if type(value) is not str or not value.isascii() or "\x00" in value:
+            return INVALID
+        if not min_length <= len(value) <= (max_length or len(value)) or value != value.strip():
+            return INVALID
+        return value
+    return check
+
+
+def compile_integer_field(field):
+    min_value = field.min_value
+    max_value = field.max_value
+
+    def check(value):
+        if type(value) is not int:
+            return INVALID
+        if (min_value is not None and value < min_value) or (max_value is not None and value > max_value):
+            return INVALID
+        return value
+    return check
+
+
+def compile_float_field(field):
+    if field.min_value is not None or field.max_value is not None:
+        return None
+
+    def check(value):
+        if type(value) is not float and type(value) is not int:
+            return INVALID
+        value = float(value)
+        return value if math.isfinite(value) else INVALID
+    return check
+
+
+def compile_choice_field(field):
+    choices = dict((key, value) for key, value in field.choice_strings_to_values.items() if key)
+
+    def check(value):
+        if type(value) is not str:
+            return INVALID
+        return choices.get(value, INVALID)
+    return check
+
+
+def compile_list_serializer(field):
+    child = compile_field(field.child)
+    if child is None or getattr(field, "max_length", None) or getattr(field, "min_length", None):
+        return None
+    allow_empty = field.allow_empty
+
+    def check(value):
+        if type(value) is not list or not (value or allow_empty):
+            return INVALID
+        items = []
+        for item in value:
+            item = child(item)
+            if item is INVALID:
+                return INVALID
+            items.append(item)
+        return items
+    return check
+
+
+FIELD_COMPILERS = (
+    (fields.ChoiceField, compile_choice_field),
+    (fields.CharField, compile_char_field),
+    (fields.IntegerField, compile_integer_field),
+    (fields.FloatField, compile_float_field),
+    (serializers.ListSerializer, compile_list_serializer)
+)
+
+
+def compile_field(field):
+    """
+    :param field: Field or serializer
+    :return: Function returning the validated value or INVALID,
+    or None if the field cannot be compiled
+    """
+    if isinstance(field, serializers.Serializer):
+        return compile_serializer(field)
+    if field.default is not fields.empty or field.validators and \
+            not all(isinstance(validator, KNOWN_VALIDATORS) for validator in field.validators):
+        return None
+    for field_class, compiler in FIELD_COMPILERS:
+        if type(field) is field_class:
+            check = compiler(field)
+            if check is None:
+                return None
+            if field.allow_null:
+                return lambda value: None if value is None else check(value)
+            return check
+    return None
+
+
+def compile_serializer(serializer):
+    """
+    Compile every writable field of a serializer without custom validation
+    :param serializer: Serializer instance
+    :return: Function returning the validated data or INVALID, or None
+    if any field or validation method cannot be compiled
+    """
+    if serializer.get_validators() or type(serializer).validate is not serializers.Serializer.validate:
+        return None
+    checks = []
+    for name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        check = compile_field(field)
+        if check is None or field.source != name or hasattr(serializer, "validate_" + name):
+            return None
+        checks.append((name, check, field.required))
+
+    def validate(data):
+        if type(data) is not dict:
+            return INVALID
+        validated = {}
+        for name, check, required in checks:
+            if name in data:
+                value = check(data[name])
+                if value is INVALID:
+                    return INVALID
+                validated[name] = value
+            elif required:
+                return INVALID
+        return validated
+    return validate
+
+
+def compiled(serializer_class):
+    """
+    :param serializer_class: Serializer class, compiled once per process
+    :return: Function returning the validated data or INVALID, or None
+    """
+    if serializer_class not in compiled_serializers:
+        compiled_serializers[serializer_class] = compile_serializer(serializer_class())
+    return compiled_serializers[serializer_class]
+
+
+def validate_group(serializer_class, items):
+    """
+    Validate the items with the compiled serializer
+    :param serializer_class: Serializer class
+    :param items: List of data
+    :return: List of validated data, or None if any item needs the serializer itself
+    """
+    validate = compiled(serializer_class)
+    if validate is None:
+        return None
+    validated = []
+    for item in items:
+        item = validate(item)
+        if item is INVALID:
+            return None
+        validated.append(item)
+    return validated
+
+
+def get_pool():
+    global pool
+    if pool is None:
+        pool = ProcessPoolExecutor(VALIDATION_WORKERS, initializer=django.setup)
+    return pool
+
+
+def shutdown_pool():
+    global pool
+    if pool is not None:
+        pool.shutdown(wait=False)
+        pool = None
+
+
+def residue_count(chain):
+    residues = chain.get("residues") if isinstance(chain, dict) else None
+    return len(residues) if isinstance(residues, list) else 0
+
+
+def split_chains(chains, groups):
+    """
+    Split the chains into consecutive groups of about the same number of residues
+    :return: List of lists of chains
+    """
+    counts = [residue_count(chain) for chain in chains]
+    size = sum(counts) / float(groups)
+    split = [[]]
+    total = 0
+    for chain, count in zip(chains, counts):
+        if split[-1] and total >= size * len(split):
+            split.append([])
+        split[-1].append(chain)
+        total += count
+    return split
+
+
+def validate_chains(serializer_class, chains):
+    """
+    Validate the chains of an entry, in the pool of processes when it is large
+    :param serializer_class: Serializer class of one chain
+    :param chains: List of chain data
+    :return: List of validated data, or None if the chains need the serializer itself
+    """
+    if not isinstance(chains, list):
+        return None
+    if VALIDATION_WORKERS > 1 and len(chains) > 1 and \
+            sum(residue_count(chain) for chain in chains) >= PARALLEL_RESIDUES:
+        groups = split_chains(chains, VALIDATION_WORKERS)
+        try:
+            results = list(get_pool().map(validate_group, [serializer_class] * len(groups), groups))
+        except (BrokenProcessPool, OSError):
+            shutdown_pool()
+            results = [validate_group(serializer_class, group) for group in groups]
+        if any(result is None for result in results):
+            return None
+        return [chain for result in results for chain in result]
+    return validate_group(serializer_class, chains)
@@ -1,3 +1,4 @@
+import json
 from rest_framework import serializers
 from funpdbe_deposition.models import Entry
 from funpdbe_deposition.models import Chain
@@ -5,6 +6,14 @@ from funpdbe_deposition.models import Residue
 from funpdbe_deposition.models import Site
 from funpdbe_deposition.models import SiteData
 from funpdbe_deposition.models import EvidenceCodeOntology
+from funpdbe_deposition.models import DepositionJob
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.bulk import replace_entry
+from funpdbe_deposition.bulk import patch_entry
+from funpdbe_deposition.validation import pdb_id_valid
+from funpdbe_deposition.validation import dangling_site_refs
+from funpdbe_deposition.compact import expand_residues
+from funpdbe_deposition.schema import validate_chains
 from django.contrib.auth.models import User
 
 
@@ -36,9 +45,48 @@ class ResidueSerializer(serializers.ModelSerializer):
         fields = ('pdb_res_label', 'aa_type', 'site_data')
 
 
+class ChainListSerializer(serializers.ListSerializer):
+    """
+    The chains of an entry, checked first by the compiled schema (see schema.py)
+    When any chain is invalid, every chain is validated again by the
+    serializers, so errors are reported exactly like before
+    """
+
+    def to_internal_value(self, data):
+        validated = validate_chains(type(self.child), data)
+        if validated is None:
+            return super(ChainListSerializer, self).to_internal_value(data)
+        return validated
+
+
 class ChainSerializer(serializers.ModelSerializer):
     residues = ResidueSerializer(many=True)
 
+    class Meta:
+        model = Chain
+        fields = ('chain_label', 'chain_annotation', 'residues')
+        list_serializer_class = ChainListSerializer
+
+
+class CompactResiduesField(serializers.Field):
+    """
+    Residues of a chain as parallel arrays, see compact.py
+    Every column is validated at once instead of one serializer per row
+    """
+
+    def to_internal_value(self, data):
+        residues, errors = expand_residues(data)
+        if errors is not None:
+            raise serializers.ValidationError(errors)
+        return residues
+
+    def to_representation(self, value):
+        return value
+
+
+class CompactChainSerializer(serializers.ModelSerializer):
+    residues = CompactResiduesField()
+
     class Meta:
         model = Chain
         fields = ('chain_label', 'chain_annotation', 'residues')
@@ -70,46 +118,66 @@ class EntrySerializer(serializers.ModelSerializer):
                   'resource_entry_url', 'release_date', 'chains', 'sites',
                   'evidence_code_ontology', 'owner')
 
-    def create_subsection(self, parent, data, next_function):
-        if data:
-            for item in data:
-                next_function(parent, item)
-
-    def create_ecos(self, entry, eco_data):
-        EvidenceCodeOntology.objects.create(entry_ref=entry, **eco_data)
-
-    def create_sites(self, entry, site_data):
-        Site.objects.create(entry_ref=entry, **site_data)
+    def __init__(self, *args, **kwargs):
+        super(EntrySerializer, self).__init__(*args, **kwargs)
+        # Depositions with ?format=compact send the residues as parallel arrays
+        if self.context.get("compact"):
+            self.fields["chains"] = CompactChainSerializer(many=True)
 
-    def create_chains_or_residues(self, parent, data, label):
-        if label not in ["residues", "site_data"]:
-            return None
-        popped = data.pop(label, None)
-        if label == "residues":
-            new_item = Chain.objects.create(entry_ref=parent, **data)
-            to_call = self.create_residues_data
-        else:
-            new_item = Residue.objects.create(chain_ref=parent, **data)
-            to_call = self.create_site_details
-        self.create_subsection(new_item, popped, to_call)
-
-    def create_chains(self, entry, chain_data):
-        self.create_chains_or_residues(entry, chain_data, "residues")
+    def create(self, validated_data):
+        writer = BulkEntryWriter()
+        writer.add(validated_data)
+        return writer.save()[0]
+
+    def validate_pdb_id(self, value):
+        if not pdb_id_valid(value):
+            raise serializers.ValidationError("Invalid PDB id pattern")
+        # Entries are looked up by lower case PDB id
+        return value.lower()
+
+    def validate(self, data):
+        # Every site_id_ref must be the site_id of one of the sites of the entry
+        site_ids = set(site["site_id"] for site in data.get("sites") or [])
+        errors = dangling_site_refs(data.get("chains") or [], site_ids)
+        if errors:
+            raise serializers.ValidationError({"chains": errors})
+        return data
+
+    def update(self, instance, validated_data):
+        """
+        Replace the entry, or when the context describes the "changes"
+        of a PATCH request, rewrite only the chains and sites that changed
+        """
+        changes = self.context.get("changes")
+        if changes is None:
+            return replace_entry(instance, validated_data)
+        return patch_entry(instance, validated_data, changes)
+
+
+class ReleaseEntrySerializer(EntrySerializer):
+    """
+    Validates the entries of a new release of a resource, which may reuse
+    the PDB ids of the release they replace, so PDB id and resource name
+    are checked for uniqueness only once the old release is deleted
+    """
 
-    def create_residues_data(self, chain, residue_data):
-        self.create_chains_or_residues(chain, residue_data, "site_data")
+    class Meta(EntrySerializer.Meta):
+        validators = []
 
-    def create_site_details(self, residue, site_detail):
-        SiteData.objects.create(residue_ref=residue, **site_detail)
 
-    def create(self, validated_data):
-        chains_data = validated_data.pop('chains', None)
-        sites_data = validated_data.pop('sites', None)
-        ecos_data = validated_data.pop('evidence_code_ontology', None)
-        entry = Entry.objects.create(**validated_data)
+class DepositionJobSerializer(serializers.ModelSerializer):
+    """
+    Progress and results of an asynchronous deposition
+    """
+    owner = serializers.ReadOnlyField(source='owner.username')
+    results = serializers.SerializerMethodField()
 
-        self.create_subsection(entry, sites_data, self.create_sites)
-        self.create_subsection(entry, ecos_data, self.create_ecos)
-        self.create_subsection(entry, chains_data, self.create_chains)
+    class Meta:
+        model = DepositionJob
+        fields = ('pk', 'data_resource', 'status', 'total', 'processed', 'results', 'error',
+                  'submitted', 'finished', 'owner')
 
-        return entry
+    def get_results(self, job):
+        if job.results is None:
+            return None
+        return json.loads(job.results)
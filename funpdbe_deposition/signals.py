@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.permissions import invalidate
+from funpdbe_deposition import aggregate
+from funpdbe_deposition.changes import record
+from funpdbe_deposition.sqlite import apply_pragmas
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate the cached resources of users whose groups changed, whether
+    through user.groups or group.user_set
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate([instance.pk])
+    elif action == "pre_clear":
+        invalidate(instance.user_set.values_list("pk", flat=True))
+    else:
+        invalidate(pk_set or [])
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    """
+    Renaming or deleting a group changes the resources of its users
+    """
+    if not kwargs.get("created"):
+        invalidate(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    A new user may reuse the pk of a deleted one
+    """
+    if kwargs.get("created", True):
+        invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Entry)
+@receiver(post_delete, sender=Entry)
+def entry_changed(sender, instance, **kwargs):
+    """
+    Entries saved or deleted one by one, i.e. when their owner is deleted
+    The bulk writes and deletes of bulk.py invalidate the cache themselves
+    """
+    aggregate.invalidate([instance.pdb_id])
+
+
+@receiver(post_delete, sender=Entry)
+def entry_deleted(sender, instance, **kwargs):
+    """
+    Entries deleted one by one, i.e. when their owner is deleted, are
+    logged here, as the bulk deletes of bulk.py send no signals
+    """
+    record("deleted", [(instance.pk, instance.pdb_id, instance.data_resource)])
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """
+    Tune every new SQLite connection, see sqlite.py
+    """
+    apply_pragmas(connection)
@@ -0,0 +1,175 @@
+"""
+Tuning for installations which stay on SQLite
+
+Every new connection gets the pragmas of SQLITE_PRAGMAS, so readers wait
+for at most busy_timeout milliseconds instead of failing with "database is
+locked". Before its first write, the database is switched to the WAL journal
+(JOURNAL_MODE), with which readers are never blocked by a write; as the mode
+is stored in the file, databases which are only read are left untouched
+SQLite still allows one writer at a time, so the write transactions of
+this process are queued first in order of arrival (atomic_write), and
+never compete for the database lock among themselves; they take the
+lock as soon as they start, waiting for writers of other processes
+Every write of this app goes through atomic_write; the transactions Django
+starts itself, i.e. for sessions, the admin or deleting a user with its
+entries, are not queued and only wait for the lock
+BEGIN IMMEDIATE needs the backend of funpdbe_deposition.backends.sqlite3,
+which funpdbe/database.py selects
+"""
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+from django.db import transaction
+
+# Applied in order to every new SQLite connection
+SQLITE_PRAGMAS = getattr(settings, "FUNPDBE_SQLITE_PRAGMAS", (
+    # Durable at every checkpoint, not at every commit, which is safe with WAL
+    ("synchronous", "normal"),
+    ("busy_timeout", 20000),
+    # Negative sizes are in KiB, 64 MiB of page cache per connection
+    ("cache_size", -65536),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "memory")
+))
+# Set by the first write transaction of every connection, None to keep the journal of the file
+JOURNAL_MODE = getattr(settings, "FUNPDBE_SQLITE_JOURNAL_MODE", "wal")
+# Set to False to let concurrent writes wait on the database lock only
+WRITE_QUEUE = getattr(settings, "FUNPDBE_SQLITE_WRITE_QUEUE", True)
+
+
+def apply_pragmas(sqlite_connection):
+    """
+    :param sqlite_connection: DatabaseWrapper, a new connection
+    :return: None
+    """
+    if sqlite_connection.vendor != "sqlite":
+        return
+    with sqlite_connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute("PRAGMA %s = %s" % (name, value))
+
+
+class WriteQueue(object):
+    """
+    A reentrant lock handed to waiting threads in order of arrival
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+        self.owner = None
+        self.depth = 0
+
+    def acquire(self):
+        thread = threading.get_ident()
+        with self.condition:
+            if self.owner == thread:
+                self.depth += 1
+                return
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            while ticket != self.serving:
+                self.condition.wait()
+            self.owner = thread
+            self.depth = 1
+
+    def release(self):
+        with self.condition:
+            self.depth -= 1
+            if self.depth == 0:
+                self.owner = None
+                self.serving += 1
+                self.condition.notify_all()
+
+
+write_queue = WriteQueue()
+
+
+class WriteScope(threading.local):
+    """
+    The callbacks of before_commit in the atomic_write blocks of a thread
+    """
+    depth = 0
+
+    def __init__(self):
+        self.callbacks = []
+
+
+write_scope = WriteScope()
+
+
+def before_commit(callback):
+    """
+    Run a callback as the last statements of the outermost atomic_write
+    block, right before it commits, or right away outside of atomic_write
+    The callbacks of blocks which roll back are dropped
+    :param callback: Callable, without arguments
+    :return: None
+    """
+    if write_scope.depth:
+        write_scope.callbacks.append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def scoped():
+    """
+    Collect the callbacks of before_commit, inside transaction.atomic()
+    """
+    mark = len(write_scope.callbacks)
+    write_scope.depth += 1
+    try:
+        yield
+    except BaseException:
+        del write_scope.callbacks[mark:]
+        raise
+    finally:
+        write_scope.depth -= 1
+    if connection.needs_rollback:
+        del write_scope.callbacks[mark:]
+    elif not write_scope.depth:
+        callbacks, write_scope.callbacks = write_scope.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+@contextmanager
+def immediate_transaction():
+    """
+    Start the next transaction with BEGIN IMMEDIATE, which waits for the
+    write lock up to busy_timeout, instead of BEGIN, whose first write
+    fails at once with "database is locked" when another connection
+    wrote since the transaction read its first row
+    Without the backend of funpdbe_deposition.backends.sqlite3, this does nothing
+    """
+    connection.begin_immediate = True
+    try:
+        yield
+    finally:
+        connection.begin_immediate = False
+
+
+@contextmanager
+def atomic_write():
+    """
+    transaction.atomic() for transactions which write, waiting for their
+    turn in the write queue first when the database is SQLite
+    Runs the callbacks of before_commit at the end of the outermost block
+    """
+    if not WRITE_QUEUE or connection.vendor != "sqlite":
+        with transaction.atomic(), scoped():
+            yield
+        return
+    write_queue.acquire()
+    try:
+        if connection.in_atomic_block:
+            with transaction.atomic(), scoped():
+                yield
+        else:
+            with immediate_transaction(), transaction.atomic(), scoped():
+                yield
+    finally:
+        write_queue.release()
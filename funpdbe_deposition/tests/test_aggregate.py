@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition import aggregate
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/pdb/1abc/aggregated/"
+
+
+class ApiAggregatedTests(TestCase):
+    """
+    Testing the cross-resource residue view of a PDB id
+    """
+
+    def setUp(self):
+        cache.clear()
+        # As with a cache shared by the workers
+        patcher = mock.patch.object(aggregate, "AGGREGATE_TTL", 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        for resource in ("cath-funsites", "nod", "dynamine"):
+            Group.objects.create(name=resource).user_set.add(user)
+        self.client.login(username="test", password="test")
+        # Anonymous, so reading costs no session queries
+        self.reader = Client()
+        self.post(MockData.generate("1abc", "cath-funsites", chains=2, residues=3, site_data=2))
+        nod = MockData.generate("1abc", "nod", chains=1, residues=4)
+        nod["chains"][0]["residues"][3]["site_data"] = []
+        self.post(nod)
+
+    def post(self, data):
+        response = self.client.post("/funpdbe_deposition/entries/resource/%s/" % data["data_resource"],
+                                    json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def get(self):
+        response = self.reader.get(URL)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    """
+    Test if the residues of every resource are merged per chain
+    This should succeed with 200
+    """
+    def test_pivot(self):
+        with self.assertNumQueries(1):
+            document = self.get()
+        self.assertEqual(document["pdb_id"], "1abc")
+        self.assertEqual(document["resources"], ["cath-funsites", "nod"])
+        self.assertEqual([chain["chain_label"] for chain in document["chains"]], ["A", "B"])
+        residues = document["chains"][0]["residues"]
+        self.assertEqual([residue["pdb_res_label"] for residue in residues], ["1", "2", "3", "4"])
+        self.assertEqual(sorted(residues[0]["site_data"]), ["cath-funsites", "nod"])
+        self.assertEqual([site["site_id_ref"] for site in residues[0]["site_data"]["cath-funsites"]], [1, 2])
+        self.assertEqual(residues[0]["site_data"]["nod"], [{"site_id_ref": 1, "raw_score": 0.01,
+                                                           "confidence_score": 0.9,
+                                                           "confidence_classification": "high"}])
+        self.assertEqual(residues[3]["site_data"], {"nod": []})
+        self.assertEqual(sorted(document["chains"][1]["residues"][0]["site_data"]), ["cath-funsites"])
+
+    """
+    Test if the document is served from the cache
+    """
+    def test_cached(self):
+        self.get()
+        with self.assertNumQueries(0):
+            self.get()
+
+    """
+    Test if the document is built for every request without a shared cache
+    """
+    def test_uncached_without_ttl(self):
+        with mock.patch.object(aggregate, "AGGREGATE_TTL", 0):
+            self.get()
+            with self.assertNumQueries(1):
+                self.get()
+            self.assertIsNone(cache.get(aggregate.cache_key("1abc")))
+
+    """
+    Test if writing or deleting an entry of the PDB id invalidates the cache
+    """
+    def test_invalidated_on_write_and_delete(self):
+        self.get()
+        self.post(MockData.generate("1abc", "dynamine", residues=1))
+        self.assertEqual(self.get()["resources"], ["cath-funsites", "dynamine", "nod"])
+        self.client.delete("/funpdbe_deposition/entries/resource/nod/1abc/")
+        self.assertEqual(self.get()["resources"], ["cath-funsites", "dynamine"])
+        response = self.client.patch("/funpdbe_deposition/entries/resource/dynamine/1abc/",
+                                     json.dumps({"chains": [{"chain_label": "Z", "residues": [
+                                         {"pdb_res_label": "1", "aa_type": "ALA", "site_data": []}]}]}),
+                                     content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([chain["chain_label"] for chain in self.get()["chains"]], ["A", "B", "Z"])
+        Entry.objects.get(data_resource="dynamine").delete()
+        self.assertEqual(self.get()["resources"], ["cath-funsites"])
+
+    """
+    Test if a PDB id without entries is not found
+    This should fail with 404 (not found)
+    """
+    def test_no_entries(self):
+        response = self.client.get("/funpdbe_deposition/entries/pdb/2abc/aggregated/")
+        self.assertEqual(response.status_code, 404)
+
+    """
+    Test if an invalid PDB id is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_pdb_id(self):
+        response = self.client.get("/funpdbe_deposition/entries/pdb/invalid/aggregated/")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/batch/"
+
+
+class ApiBatchTests(TestCase):
+    """
+    Testing batch POST of many entries of one resource
+    """
+
+    def setUp(self):
+        self.client = Client()
+        group = Group.objects.create(name="cath-funsites")
+        user = User.objects.create_user("test", "test@test.test", "test")
+        group.user_set.add(user)
+        self.client.login(username="test", password="test")
+        self.entries = [MockData.generate(pdb_id, residues=3) for pdb_id in ("1abc", "2abc", "3abc")]
+
+    """
+    Test if a JSON array of valid entries is created
+    This should succeed with 201 (created)
+    """
+    def test_posting_json_array(self):
+        response = self.client.post(URL, json.dumps(self.entries), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result["pdb_id"] for result in response.json()], ["1abc", "2abc", "3abc"])
+        self.assertEqual(Entry.objects.count(), 3)
+        self.assertEqual(Residue.objects.count(), 9)
+        self.assertFalse(Entry.objects.filter(rendered_json__isnull=True).exists())
+
+    """
+    Test if NDJSON is accepted
+    This should succeed with 201 (created)
+    """
+    def test_posting_ndjson(self):
+        body = "\n".join(json.dumps(entry) for entry in self.entries) + "\n"
+        response = self.client.post(URL, body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Entry.objects.count(), 3)
+
+    """
+    Test if invalid items are reported while the valid ones are created
+    This should succeed with 207 (multi-status)
+    """
+    def test_posting_partly_invalid(self):
+        self.entries[1] = {"data_resource": "cath-funsites"}
+        self.entries.append(MockData.generate("1abc", data_resource="nod"))
+        self.entries.append(MockData.generate("1abc"))
+        response = self.client.post(URL, json.dumps(self.entries), content_type="application/json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result["status"] for result in response.json()], [201, 400, 201, 400, 400])
+        self.assertEqual(Entry.objects.count(), 2)
+
+    """
+    Test if an existing entry is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_posting_existing(self):
+        self.client.post(URL, json.dumps(self.entries), content_type="application/json")
+        response = self.client.post(URL, json.dumps(self.entries), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test if a single object is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_posting_object(self):
+        response = self.client.post(URL, json.dumps(self.entries[0]), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test if malformed NDJSON is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_posting_bad_ndjson(self):
+        response = self.client.post(URL, "{}\n{", content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test if batch POST works without permission
+    This should fail with 403 (forbidden)
+    """
+    def test_posting_without_permission(self):
+        url = "/funpdbe_deposition/entries/resource/nod/batch/"
+        response = self.client.post(url, json.dumps(self.entries), content_type="application/json")
+        self.assertEqual(response.status_code, 403)
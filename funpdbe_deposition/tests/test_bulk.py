@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from benchmarks.bench_post import create_per_row
+from funpdbe_deposition.models import Chain
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Site
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.bulk import delete_entries
+from funpdbe_deposition.bulk import raw_delete
+from funpdbe_deposition.bulk import RAW_DELETE_DEPENDENTS
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.mock_data import MockData
+
+
+class TestBulkEntryWriter(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("test", "test@test.test", "test")
+
+    def validated(self, data):
+        serializer = EntrySerializer(data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.validated_data
+
+    def count_queries(self, data):
+        writer = BulkEntryWriter()
+        writer.add(self.validated(data), owner=self.user)
+        with CaptureQueriesContext(connection) as context:
+            writer.save()
+        return len(context.captured_queries)
+
+    def strip(self, data):
+        data = dict(data)
+        data.pop("pk")
+        data.pop("pdb_id")
+        return data
+
+    def test_writes_whole_tree(self):
+        data = MockData.generate(chains=3, residues=20, site_data=2)
+        entry = EntrySerializer().create(dict(self.validated(data), owner=self.user))
+        self.assertEqual(Chain.objects.filter(entry_ref=entry).count(), 3)
+        self.assertEqual(Residue.objects.filter(chain_ref__entry_ref=entry).count(), 60)
+        self.assertEqual(SiteData.objects.filter(residue_ref__chain_ref__entry_ref=entry).count(), 120)
+        self.assertEqual(entry.sites.count(), 2)
+        self.assertEqual(entry.evidence_code_ontology.count(), 1)
+
+    def test_same_representation_as_per_row_path(self):
+        serializer = EntrySerializer()
+        data = MockData.generate(residues=5, site_data=2)
+        bulk = serializer.create(dict(self.validated(data), owner=self.user))
+        expected = self.strip(EntrySerializer(bulk).data)
+        bulk.delete()
+        per_row = create_per_row(dict(self.validated(data), owner=self.user))
+        self.assertEqual(expected, self.strip(EntrySerializer(per_row).data))
+
+    def test_query_count_does_not_grow_with_residues(self):
+        small = self.count_queries(MockData.generate("1abc", residues=2))
+        large = self.count_queries(MockData.generate("2abc", residues=100))
+        self.assertEqual(small, large)
+
+    def test_multiple_entries(self):
+        writer = BulkEntryWriter()
+        for pdb_id in ("1abc", "2abc", "3abc"):
+            writer.add(self.validated(MockData.generate(pdb_id, residues=3)), owner=self.user)
+        entries = writer.save()
+        self.assertEqual([entry.pdb_id for entry in entries], ["1abc", "2abc", "3abc"])
+        for entry in entries:
+            self.assertEqual(Residue.objects.filter(chain_ref__entry_ref=entry).count(), 3)
+
+    def write(self, *pdb_ids, **kwargs):
+        writer = BulkEntryWriter()
+        for pdb_id in pdb_ids:
+            writer.add(self.validated(MockData.generate(pdb_id, site_data=2, **kwargs)), owner=self.user)
+        return writer.save()
+
+    def test_delete_entries(self):
+        self.write("1abc", "2abc", residues=3)
+        self.assertEqual(delete_entries(Entry.objects.filter(pdb_id="1abc")), 1)
+        self.assertEqual(list(Entry.objects.values_list("pdb_id", flat=True)), ["2abc"])
+        self.assertEqual(Residue.objects.count(), 3)
+        self.assertEqual(SiteData.objects.count(), 6)
+        self.assertEqual(Site.objects.count(), 2)
+        self.assertEqual(Chain.objects.count(), 1)
+
+    def test_delete_query_count_does_not_grow_with_residues(self):
+        self.write("1abc", residues=2)
+        self.write("2abc", residues=300)
+        with CaptureQueriesContext(connection) as small:
+            delete_entries(Entry.objects.filter(pdb_id="1abc"))
+        with CaptureQueriesContext(connection) as large:
+            delete_entries(Entry.objects.filter(pdb_id="2abc"))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertFalse(SiteData.objects.exists())
+
+    def test_delete_leaves_no_dangling_rows(self):
+        self.write("1abc", "2abc", residues=3)
+        delete_entries(Entry.objects.filter(pdb_id="1abc"))
+        connection.check_constraints()
+        self.assertFalse(SiteData.objects.exclude(site__isnull=True).exclude(site__in=Site.objects.all()).exists())
+
+    def test_raw_delete_dependents(self):
+        # A new relation to a raw deleted model has to be handled by the deletes of bulk.py first
+        for model, dependents in RAW_DELETE_DEPENDENTS.items():
+            relations = model._meta.related_objects
+            self.assertEqual(set((relation.related_model, relation.field.name) for relation in relations),
+                             dependents, model.__name__)
+
+    def test_raw_delete_other_model(self):
+        with self.assertRaises(ValueError):
+            raw_delete(User.objects.all())
+
+    def test_delete_nothing(self):
+        self.assertEqual(delete_entries(Entry.objects.filter(pdb_id="1abc")), 0)
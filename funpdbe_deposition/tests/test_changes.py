@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import datetime
+import json
+import threading
+import time
+from io import StringIO
+from unittest import skipIf
+from django.core.management import call_command
+from django.db import connection
+from django.db import transaction
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition.changes import changes_since
+from funpdbe_deposition.changes import record
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.models import ChangeEvent
+from funpdbe_deposition.sqlite import atomic_write
+
+URL = "/funpdbe_deposition/changes/"
+RESOURCE_URL = "/funpdbe_deposition/entries/resource/%s/"
+
+
+class ApiChangeTests(TestCase):
+    """
+    Testing the change log of the entries
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("test", "test@test.test", "test")
+        for resource in ("cath-funsites", "nod"):
+            Group.objects.create(name=resource).user_set.add(self.user)
+        self.client.login(username="test", password="test")
+
+    def post(self, pdb_id, resource="cath-funsites"):
+        response = self.client.post(RESOURCE_URL % resource, json.dumps(MockData.generate(pdb_id, resource)),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def changes(self, **params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b"".join(response.streaming_content).decode("utf-8"))
+
+    def actions(self, events):
+        return [(event["action"], event["pdb_id"], event["data_resource"]) for event in events]
+
+    """
+    Test if creating, updating and deleting entries is logged in order
+    This should succeed with 200
+    """
+    def test_log(self):
+        self.post("1abc")
+        self.post("1abc", "nod")
+        self.client.patch(RESOURCE_URL % "cath-funsites" + "1abc/", json.dumps({"release_date": "02/02/2000"}),
+                          content_type="application/json")
+        self.client.delete(RESOURCE_URL % "nod" + "1abc/")
+        events = self.changes()
+        self.assertEqual(self.actions(events), [("created", "1abc", "cath-funsites"), ("created", "1abc", "nod"),
+                                                ("updated", "1abc", "cath-funsites"), ("deleted", "1abc", "nod")])
+        self.assertEqual([event["seq"] for event in events], sorted(event["seq"] for event in events))
+        self.assertEqual(events[0]["entry_pk"], events[2]["entry_pk"])
+
+    """
+    Test if only the events after since are sent
+    This should succeed with 200
+    """
+    def test_since(self):
+        self.post("1abc")
+        last = self.changes()[-1]["seq"]
+        self.assertEqual(self.changes(since=last), [])
+        self.post("2abc", "nod")
+        self.post("3abc")
+        self.assertEqual(self.actions(self.changes(since=last)), [("created", "2abc", "nod"),
+                                                                  ("created", "3abc", "cath-funsites")])
+        self.assertEqual(self.actions(self.changes(since=last, data_resource="nod")), [("created", "2abc", "nod")])
+
+    """
+    Test if batch deposition and deleting the owner of entries are logged
+    This should succeed with 200
+    """
+    def test_batch_and_owner_deletion(self):
+        entries = [MockData.generate(pdb_id) for pdb_id in ("1abc", "2abc")]
+        self.client.post(RESOURCE_URL % "cath-funsites" + "batch/", json.dumps(entries),
+                         content_type="application/json")
+        self.user.delete()
+        self.assertEqual([event["action"] for event in self.changes()], ["created", "created", "deleted", "deleted"])
+
+    """
+    Test if an invalid since or resource name is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_parameters(self):
+        for params in ({"since": "abc"}, {"since": "-1"}, {"data_resource": "invalid"}):
+            response = self.client.get(URL, params)
+            self.assertEqual(response.status_code, 400)
+
+    """
+    Test if appending to the log locks it until commit on PostgreSQL only
+    """
+    def test_log_lock(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.post("1abc")
+        locks = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("LOCK TABLE")]
+        self.assertEqual(len(locks), 1 if connection.vendor == "postgresql" else 0)
+
+    """
+    Test if the events of a write are appended as the last step of its transaction,
+    and dropped with the blocks which roll back
+    """
+    def test_events_at_commit(self):
+        with atomic_write():
+            record("created", [(1, "1abc", "nod")])
+            self.assertFalse(ChangeEvent.objects.exists())
+            with atomic_write():
+                record("created", [(2, "2abc", "nod")])
+                transaction.set_rollback(True)
+            try:
+                with atomic_write():
+                    record("created", [(3, "3abc", "nod")])
+                    raise ValueError
+            except ValueError:
+                pass
+            record("deleted", [(1, "1abc", "nod")])
+            self.assertFalse(ChangeEvent.objects.exists())
+        self.assertEqual(list(ChangeEvent.objects.order_by("pk").values_list("action", "pdb_id")),
+                         [("created", "1abc"), ("deleted", "1abc")])
+
+    """
+    Test if the prune_changes command deletes the events older than the retention period
+    """
+    def test_prune(self):
+        self.post("1abc")
+        self.post("2abc")
+        ChangeEvent.objects.filter(pdb_id="1abc").update(time=timezone.now() - datetime.timedelta(days=100))
+        out = StringIO()
+        call_command("prune_changes", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Deleted 1 change events")
+        self.assertEqual(self.actions(ChangeEvent.objects.values()), [("created", "2abc", "cath-funsites")])
+        call_command("prune_changes", days=0, stdout=out)
+        self.assertFalse(ChangeEvent.objects.exists())
+
+    """
+    Test if a mirror which missed pruned events is told to copy the entries again
+    This should fail with 410 (gone)
+    """
+    def test_since_pruned(self):
+        for pdb_id in ("1abc", "2abc", "3abc"):
+            self.post(pdb_id)
+        seqs = [event["seq"] for event in self.changes()]
+        ChangeEvent.objects.filter(pk__in=seqs[:2]).update(time=timezone.now() - datetime.timedelta(days=100))
+        call_command("prune_changes", stdout=StringIO())
+        for since in (0, seqs[0]):
+            self.assertEqual(self.client.get(URL, {"since": since}).status_code, 410)
+        self.assertEqual(self.actions(self.changes(since=seqs[1])), [("created", "3abc", "cath-funsites")])
+        self.assertEqual(self.changes(since=seqs[2]), [])
+        call_command("prune_changes", days=0, stdout=StringIO())
+        self.assertEqual(self.client.get(URL, {"since": seqs[1]}).status_code, 410)
+        self.assertEqual(self.changes(since=seqs[2]), [])
+
+
+@skipIf(connection.vendor != "postgresql", "Sequence numbers commit out of order on PostgreSQL only")
+class ChangeOrderTests(TransactionTestCase):
+    """
+    Testing that sequence numbers become visible in order
+    """
+
+    """
+    Test if a transaction appending to the log waits for an earlier one to commit,
+    so that no event with a lower sequence number becomes visible later
+    """
+    def test_commit_order(self):
+        seen = []
+
+        def second():
+            with transaction.atomic():
+                record("created", [(2, "2abc", "nod")])
+            seen.extend(event["pdb_id"] for event in changes_since(0))
+            connection.close()
+
+        with transaction.atomic():
+            record("created", [(1, "1abc", "nod")])
+            thread = threading.Thread(target=second)
+            thread.start()
+            time.sleep(0.5)
+            # The second transaction is still waiting for the lock
+            self.assertTrue(thread.is_alive())
+        thread.join()
+        self.assertEqual(seen, ["1abc", "2abc"])
+        self.assertEqual(list(ChangeEvent.objects.order_by("pk").values_list("pdb_id", flat=True)), ["1abc", "2abc"])
+
+    """
+    Test if a long write only locks the log while it commits, so other writers
+    do not wait for the rest of it
+    """
+    def test_lock_at_commit(self):
+        def second():
+            with atomic_write():
+                record("created", [(2, "2abc", "nod")])
+            connection.close()
+
+        with atomic_write():
+            record("created", [(1, "1abc", "nod")])
+            thread = threading.Thread(target=second)
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(list(ChangeEvent.objects.order_by("pk").values_list("pdb_id", flat=True)), ["2abc", "1abc"])
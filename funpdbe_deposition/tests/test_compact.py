@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition.compact import compact_chains
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+
+
+def compact_entry(pdb_id, **kwargs):
+    data = MockData.generate(pdb_id, **kwargs)
+    data["chains"] = compact_chains(data["chains"])
+    return data
+
+
+class ApiCompactTests(TestCase):
+    """
+    Testing the compact residue columns of ?format=compact
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        self.client.login(username="test", password="test")
+
+    def post(self, data, url=URL + "?format=compact"):
+        return self.client.post(url, json.dumps(data), content_type="application/json")
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    """
+    Test if a compact deposition is stored like the same nested deposition
+    This should succeed with 201 (created)
+    """
+    def test_post_compact(self):
+        response = self.post(compact_entry("1abc", chains=2, residues=3, site_data=2))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["chains"][0]["residues"]["pdb_res_label"], ["1", "2", "3"])
+        self.assertEqual(self.post(MockData.generate("2abc", chains=2, residues=3, site_data=2), URL).status_code,
+                         201)
+        compact = self.get(URL + "1abc/").json()[0]
+        nested = self.get(URL + "2abc/").json()[0]
+        self.assertEqual(compact["chains"], nested["chains"])
+
+    """
+    Test if the entry views send compact residues
+    This should succeed with 200
+    """
+    def test_get_compact(self):
+        self.post(MockData.generate("1abc", residues=3, site_data=2), URL)
+        residues = self.get(URL + "1abc/?format=compact").json()[0]["chains"][0]["residues"]
+        self.assertEqual(residues["aa_type"], ["ALA", "ALA", "ALA"])
+        self.assertEqual(residues["site_data"]["residue"], [0, 0, 1, 1, 2, 2])
+        self.assertEqual(residues["site_data"]["site_id_ref"], [1, 2, 1, 2, 1, 2])
+        for url in ("/funpdbe_deposition/entries/?format=compact", "/funpdbe_deposition/entries/pdb/1abc/?format=compact",
+                    URL + "?format=compact&stream=true"):
+            response = self.get(url)
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+            self.assertEqual(json.loads(content.decode("utf-8"))[0]["chains"][0]["residues"], residues)
+        page = self.get(URL + "?format=compact&page_size=1").json()
+        self.assertEqual(page["results"][0]["chains"][0]["residues"], residues)
+
+    """
+    Test if compact and nested responses have different ETags
+    """
+    def test_etag(self):
+        self.post(MockData.generate("1abc", residues=3), URL)
+        self.assertNotEqual(self.get(URL + "1abc/")["ETag"], self.get(URL + "1abc/?format=compact")["ETag"])
+
+    """
+    Test if invalid columns are rejected with the column and item
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_columns(self):
+        data = compact_entry("1abc", residues=3)
+        data["chains"][0]["residues"]["aa_type"].pop()
+        response = self.post(data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("aa_type", response.json()["chains"][0]["residues"])
+
+        data = compact_entry("1abc", residues=3)
+        data["chains"][0]["residues"]["site_data"]["confidence_classification"][1] = "invalid"
+        response = self.post(data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["chains"][0]["residues"]["site_data"]["confidence_classification"],
+                         ["Item 1: A valid classification or null is required."])
+
+        data = compact_entry("1abc", residues=3)
+        data["chains"][0]["residues"]["site_data"]["residue"][2] = 3
+        self.assertEqual(self.post(data).status_code, 400)
+
+    """
+    Test if a PATCH can send compact chains
+    This should succeed with 200
+    """
+    def test_patch_compact(self):
+        self.post(MockData.generate("1abc", chains=2, residues=3), URL)
+        chain = compact_chains(MockData.generate("1abc", residues=5)["chains"])[0]
+        response = self.client.patch(URL + "1abc/?format=compact", json.dumps({"chains": [chain]}),
+                                     content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        chains = response.json()["chains"]
+        self.assertEqual(dict((chain["chain_label"], len(chain["residues"]["pdb_res_label"])) for chain in chains),
+                         {"A": 5, "B": 3})
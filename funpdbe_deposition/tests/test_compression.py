@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import gzip
+import json
+from unittest import mock
+from unittest import skipIf
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+from funpdbe_deposition import middleware
+from funpdbe_deposition import renderers
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.middleware import accepted_encodings
+from funpdbe_deposition.middleware import brotli
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.renderers import CompactJSONRenderer
+from funpdbe_deposition.serializers import EntrySerializer
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/2abc/"
+
+
+class TestCompression(TestCase):
+    """
+    Testing response compression and the compact JSON renderer
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        serializer = EntrySerializer(data=MockData.generate(residues=50))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        writer = BulkEntryWriter()
+        writer.add(serializer.validated_data, owner=user)
+        writer.save()
+        self.plain = self.client.get(URL)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings("gzip, deflate, br"), {"gzip", "deflate", "br"})
+        self.assertEqual(accepted_encodings("br;q=0, gzip;q=0.5"), {"gzip"})
+        self.assertEqual(accepted_encodings(""), set())
+
+    def test_gzip(self):
+        response = self.client.get(URL, HTTP_ACCEPT_ENCODING="gzip;q=1.0, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), self.plain.content)
+        self.assertLess(len(response.content), len(self.plain.content) / 5)
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli(self):
+        response = self.client.get(URL, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.plain.content)
+
+    def test_no_brotli(self):
+        with mock.patch.object(middleware, "brotli", None):
+            response = self.client.get(URL, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.plain.content)
+
+    def test_streaming(self):
+        url = "/funpdbe_deposition/entries/?stream=true"
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)),
+                         b"".join(self.client.get(url).streaming_content))
+
+    def test_not_accepted_or_short(self):
+        self.assertFalse(self.plain.has_header("Content-Encoding"))
+        response = self.client.get("/funpdbe_deposition/entries/pdb/invalid/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_weak_etag_matches(self):
+        response = self.client.get(URL, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["ETag"], "W/" + self.plain["ETag"])
+        response = self.client.get(URL, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_compact_renderer(self):
+        data = MockData.generate(residues=3)
+        rendered = CompactJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertEqual(json.loads(rendered.decode("utf-8")), data)
+        indented = CompactJSONRenderer().render(data, "application/json; indent=2")
+        self.assertIn(b"\n  ", indented)
+
+    def test_compact_renderer_without_orjson(self):
+        data = MockData.generate(residues=3)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(CompactJSONRenderer().render(data), JSONRenderer().render(data))
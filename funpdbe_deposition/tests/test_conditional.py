@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from django.utils.http import http_date
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.mock_data import MockData
+
+DETAIL = "/funpdbe_deposition/entries/resource/cath-funsites/1abc/"
+LISTS = ("/funpdbe_deposition/entries/", "/funpdbe_deposition/entries/resource/cath-funsites/",
+         "/funpdbe_deposition/entries/pdb/1abc/", DETAIL)
+
+
+class ApiConditionalTests(TestCase):
+    """
+    Testing ETag and Last-Modified on the entry views
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        self.client.login(username="test", password="test")
+        # Anonymous, so reading costs no session queries
+        self.reader = Client()
+        for pdb_id in ("1abc", "2abc"):
+            response = self.client.post("/funpdbe_deposition/entries/resource/cath-funsites/",
+                                        json.dumps(MockData.generate(pdb_id, residues=2)),
+                                        content_type="application/json")
+            self.assertEqual(response.status_code, 201)
+
+    """
+    Test if every entry view answers a matching If-None-Match with 304,
+    without loading the documents
+    """
+    def test_etag(self):
+        for url in LISTS:
+            response = self.reader.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.has_header("Last-Modified"), url == DETAIL)
+            with self.assertNumQueries(1):
+                response = self.reader.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+    """
+    Test if the ETag changes with the content, and only then
+    """
+    def test_etag_changes_with_content(self):
+        etag = self.reader.get(DETAIL)["ETag"]
+        response = self.client.patch(DETAIL, json.dumps({"release_date": "02/02/2000"}),
+                                     content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        response = self.reader.get(DETAIL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        other = self.reader.get("/funpdbe_deposition/entries/resource/cath-funsites/2abc/")
+        self.assertNotEqual(other["ETag"], response["ETag"])
+
+    """
+    Test if the ETag of documents which are not stored yet is the same
+    as the one computed from the stored hashes
+    """
+    def test_etag_of_documents_not_stored(self):
+        etag = self.reader.get(LISTS[0])["ETag"]
+        Entry.objects.update(rendered_json=None, rendered_hash=None)
+        response = self.reader.get(LISTS[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    """
+    Test if If-Modified-Since is answered from the update time of the entry,
+    when the client sends back the Last-Modified of the server
+    """
+    def test_last_modified(self):
+        last_modified = self.reader.get(DETAIL)["Last-Modified"]
+        response = self.reader.get(DETAIL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        updated = Entry.objects.get(pdb_id="1abc").updated.timestamp()
+        response = self.reader.get(DETAIL, HTTP_IF_MODIFIED_SINCE=http_date(updated - 60))
+        self.assertEqual(response.status_code, 200)
+
+    """
+    Test if a list which lost an entry is sent again
+    """
+    def test_list_without_deleted_entry(self):
+        url = LISTS[1]
+        response = self.reader.get(url)
+        self.client.delete("/funpdbe_deposition/entries/resource/cath-funsites/2abc/")
+        response = self.reader.get(url, HTTP_IF_NONE_MATCH=response["ETag"],
+                                   HTTP_IF_MODIFIED_SINCE=http_date(Entry.objects.get().updated.timestamp() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    """
+    Test if pages have their own ETag
+    """
+    def test_page_etag(self):
+        first = self.reader.get(LISTS[0], {"page_size": 1})
+        second = self.reader.get(first.json()["next"])
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        response = self.reader.get(LISTS[0], {"page_size": 1}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    """
+    Test if the creation time is kept and the update time follows changes
+    """
+    def test_timestamps(self):
+        entry = Entry.objects.get(pdb_id="1abc")
+        self.assertLessEqual(entry.created, entry.updated)
+        self.client.patch(DETAIL, json.dumps({"release_date": "02/02/2000"}), content_type="application/json")
+        changed = Entry.objects.get(pdb_id="1abc")
+        self.assertEqual(changed.created, entry.created)
+        self.assertGreater(changed.updated, entry.updated)
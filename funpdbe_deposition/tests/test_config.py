@@ -1,10 +1,26 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
+from funpdbe.caches import cache_settings
 from funpdbe_deposition.apps import FunpdbeDepositionConfig
 
 
 class TestConfig(TestCase):
 
     def test_config(self):
-        self.assertEqual(FunpdbeDepositionConfig.name, "funpdbe_deposition")
\ No newline at end of file
+        self.assertEqual(FunpdbeDepositionConfig.name, "funpdbe_deposition")
+
+
+class TestCacheSettings(TestCase):
+
+    def test_default(self):
+        self.assertEqual(cache_settings({})["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+
+    def test_memcached(self):
+        caches = cache_settings({"FUNPDBE_CACHE_BACKEND": "memcached", "FUNPDBE_CACHE_LOCATION": "a:11211,b:11211"})
+        self.assertEqual(caches["LOCATION"], ["a:11211", "b:11211"])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache_settings({"FUNPDBE_CACHE_BACKEND": "redis"})
@@ -18,7 +18,7 @@ class ApiDeleteTests(TestCase):
         self.group = Group.objects.create(name="cath-funsites")
         self.user = User.objects.create_user("test", "test@test.test", "test")
         self.group.user_set.add(self.user)
-        self.entry = Entry.objects.create(owner_id=1, pdb_id="0x00", data_resource="cath-funsites")
+        self.entry = Entry.objects.create(owner=self.user, pdb_id="0x00", data_resource="cath-funsites")
 
     def generic_delete_test(self, url, code):
         self.client.login(username='test', password='test')
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import csv
+import io
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from unittest import skipIf
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from funpdbe_deposition import export
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.serializers import EntrySerializer
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/scores/"
+
+
+class ApiExportTests(TestCase):
+    """
+    Testing the flat export of the residue scores of a resource
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        writer = BulkEntryWriter()
+        for pdb_id, resource in (("1abc", "cath-funsites"), ("2abc", "cath-funsites"), ("1abc", "nod")):
+            serializer = EntrySerializer(data=MockData.generate(pdb_id, resource, chains=2, residues=3, site_data=2))
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            writer.add(serializer.validated_data, owner=user)
+        writer.save()
+
+    def read_csv(self, content):
+        return list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+
+    """
+    Test if every site data of the resource is exported as CSV, with one query
+    This should succeed with 200
+    """
+    def test_csv(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(URL)
+            content = b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = self.read_csv(content)
+        self.assertEqual(len(rows), 2 * 2 * 3 * 2)
+        self.assertEqual(rows[0], {"pdb_id": "1abc", "chain_label": "A", "pdb_res_label": "1", "aa_type": "ALA",
+                                   "site_id_ref": "1", "raw_score": "0.01", "confidence_score": "0.9",
+                                   "confidence_classification": "high"})
+        self.assertEqual(set(row["pdb_id"] for row in rows), {"1abc", "2abc"})
+
+    """
+    Test if the NumPy archive has one array per column
+    This should succeed with 200
+    """
+    @skipIf(export.numpy is None, "NumPy is not installed")
+    def test_npz(self):
+        response = self.client.get(URL, {"output": "npz"})
+        self.assertEqual(response.status_code, 200)
+        arrays = export.numpy.load(io.BytesIO(response.content))
+        self.assertEqual(sorted(arrays.files), sorted(name for name, _ in export.COLUMNS))
+        self.assertEqual(len(arrays["raw_score"]), 24)
+        self.assertEqual(arrays["pdb_id"][0], "1abc")
+        self.assertAlmostEqual(arrays["raw_score"][0], 0.01)
+
+    """
+    Test if the NumPy archive is refused when NumPy is not installed
+    This should fail with 501 (not implemented)
+    """
+    def test_npz_without_numpy(self):
+        with mock.patch.object(export, "numpy", None):
+            response = self.client.get(URL, {"output": "npz"})
+        self.assertEqual(response.status_code, 501)
+
+    """
+    Test if an unknown output format is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_output(self):
+        response = self.client.get(URL, {"output": "xls"})
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test if an invalid resource name is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_resource(self):
+        response = self.client.get("/funpdbe_deposition/entries/resource/invalid/scores/")
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test the management command writing a CSV file
+    """
+    def test_command(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command("export_scores", "nod", path, stdout=StringIO())
+        with open(path, "rb") as exported:
+            rows = self.read_csv(exported.read())
+        self.assertEqual(len(rows), 12)
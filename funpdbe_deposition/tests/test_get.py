@@ -13,7 +13,7 @@ class ApiGetTests(TestCase):
     def setUp(self):
         self.client = Client()
         self.user = User.objects.create_user("test", "test@test.test", "test")
-        self.entry = Entry.objects.create(owner_id=1, pdb_id="0x00", data_resource="cath-funsites")
+        self.entry = Entry.objects.create(owner=self.user, pdb_id="0x00", data_resource="cath-funsites")
 
     def tearDown(self):
         User.objects.all().delete()
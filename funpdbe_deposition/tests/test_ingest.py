@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import json
+from collections import OrderedDict
+from unittest import mock
+from unittest import skipIf
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition import ingest
+from funpdbe_deposition.compact import compact_chains
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import ChangeEvent
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+
+
+@skipIf(ingest.ijson is None, "ijson is not installed")
+class ApiIngestTests(TestCase):
+    """
+    Testing the streaming ingestion of entries/resource/<resource>/upload/
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        self.client.login(username="test", password="test")
+
+    def upload(self, data, query=""):
+        body = data if isinstance(data, str) else json.dumps(data)
+        return self.client.post(URL + "upload/" + query, body, content_type="application/json")
+
+    """
+    Test if a large entry is written while streaming, with the chains
+    before the other fields, and reads back like a regular POST
+    This should succeed with 201 (created)
+    """
+    def test_upload(self):
+        data = MockData.generate("1abc", chains=3, residues=40, site_data=2)
+        chains_first = OrderedDict([("chains", data.pop("chains"))] + list(data.items()))
+        response = self.upload(chains_first)
+        self.assertEqual(response.status_code, 201)
+        result = response.json()
+        self.assertEqual((result["pdb_id"], result["chains"], result["residues"]), ("1abc", 3, 120))
+        self.assertEqual(Residue.objects.filter(chain_ref__entry_ref__pk=result["pk"]).count(), 120)
+        self.client.post(URL, json.dumps(MockData.generate("2abc", chains=3, residues=40, site_data=2)),
+                         content_type="application/json")
+        streamed = self.client.get(URL + "1abc/").json()[0]
+        posted = self.client.get(URL + "2abc/").json()[0]
+        self.assertEqual(streamed["chains"], posted["chains"])
+        self.assertEqual(len(streamed["sites"]), len(posted["sites"]))
+
+    """
+    Test if compact residues can be streamed with ?format=compact
+    This should succeed with 201 (created)
+    """
+    def test_upload_compact(self):
+        data = MockData.generate("1abc", chains=2, residues=5, site_data=2)
+        data["chains"] = compact_chains(data["chains"])
+        response = self.upload(data, "?format=compact")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["residues"], 10)
+
+    """
+    Test if an invalid chain rolls back the whole entry
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_chain(self):
+        data = MockData.generate("1abc", chains=3, residues=5)
+        del data["chains"][2]["chain_label"]
+        response = self.upload(data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2", response.json()["chains"])
+        self.assertFalse(Entry.objects.exists())
+        self.assertFalse(Residue.objects.exists())
+
+    """
+    Test if truncated or non-object bodies are rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_json(self):
+        body = json.dumps(MockData.generate("1abc", residues=5))
+        for invalid in (body[:-20], "[]", ""):
+            self.assertEqual(self.upload(invalid).status_code, 400)
+        self.assertFalse(Entry.objects.exists())
+
+    """
+    Test if the resource of the URL must match the entry
+    This should fail with 400 (bad request)
+    """
+    def test_resource_mismatch(self):
+        response = self.upload(MockData.generate("1abc", data_resource="nod"))
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test if users outside the resource group cannot upload
+    This should fail with 403 (forbidden)
+    """
+    def test_no_permission(self):
+        self.assertEqual(Client().post(URL + "upload/", json.dumps(MockData.generate("1abc")),
+                                       content_type="application/json").status_code, 403)
+
+    """
+    Test if an entry written in several batches is logged once as created
+    """
+    def test_change_events(self):
+        deposition = ingest.StreamingDeposition(User.objects.get(), "cath-funsites", batch_size=10)
+        body = json.dumps(MockData.generate("1abc", chains=4, residues=10)).encode("utf-8")
+        result, status_code = deposition.deposit(io.BytesIO(body))
+        self.assertEqual(status_code, 201)
+        self.assertEqual(list(ChangeEvent.objects.values_list("action", flat=True)), ["created"])
+
+
+
+class ApiIngestFallbackTests(TestCase):
+    """
+    Testing entries/resource/<resource>/upload/ without ijson
+    """
+
+    """
+    Test if uploads are refused when ijson is not installed, while POST still works
+    This should fail with 501 (not implemented)
+    """
+    def test_no_ijson(self):
+        client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        client.login(username="test", password="test")
+        body = json.dumps(MockData.generate("1abc"))
+        with mock.patch.object(ingest, "ijson", None):
+            response = client.post(URL + "upload/", body, content_type="application/json")
+            self.assertEqual(response.status_code, 501)
+            response = client.post(URL, body, content_type="application/json")
+            self.assertEqual(response.status_code, 201)
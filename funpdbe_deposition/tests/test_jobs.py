@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test import Client
+from django.test import override_settings
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition import jobs
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import DepositionJob
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/async/"
+
+
+@override_settings(FUNPDBE_JOBS_EAGER=True)
+class ApiJobTests(TestCase):
+    """
+    Testing asynchronous deposition and the job status API
+    """
+
+    def setUp(self):
+        self.client = Client()
+        group = Group.objects.create(name="cath-funsites")
+        user = User.objects.create_user("test", "test@test.test", "test")
+        group.user_set.add(user)
+        self.client.login(username="test", password="test")
+
+    def submit(self, data, content_type="application/json"):
+        response = self.client.post(URL, data, content_type=content_type)
+        self.assertEqual(response.status_code, 202)
+        return self.client.get(response["Location"])
+
+    """
+    Test if an uploaded entry is saved by the job
+    This should succeed with 202 (accepted), then 200 on the job
+    """
+    def test_single_entry(self):
+        job = self.submit(json.dumps(MockData().data)).json()
+        self.assertEqual(job["status"], "finished")
+        self.assertEqual(job["total"], 1)
+        self.assertEqual(job["results"][0]["status"], 201)
+        self.assertTrue(Entry.objects.filter(pdb_id="2abc").exists())
+
+    """
+    Test if an NDJSON upload reports errors per entry
+    """
+    def test_ndjson_with_errors(self):
+        body = "\n".join([json.dumps(MockData.generate("1abc")), json.dumps({"data_resource": "cath-funsites"})])
+        job = self.submit(body, "application/x-ndjson").json()
+        self.assertEqual(job["status"], "finished")
+        self.assertEqual([result["status"] for result in job["results"]], [201, 400])
+        self.assertIn("pdb_id", job["results"][1]["errors"])
+
+    """
+    Test if a job with unparseable data is reported as failed
+    """
+    def test_invalid_json(self):
+        job = self.submit("{").json()
+        self.assertEqual(job["status"], "failed")
+        self.assertIsNotNone(job["error"])
+
+    """
+    Test if the job is hidden from other users
+    This should fail with 403 (forbidden)
+    """
+    def test_job_of_other_user(self):
+        response = self.client.post(URL, json.dumps(MockData().data), content_type="application/json")
+        User.objects.create_user("test2", "test2@test.test", "test2")
+        self.client.login(username="test2", password="test2")
+        self.assertEqual(self.client.get(response["Location"]).status_code, 403)
+
+    """
+    Test if a missing job is reported
+    This should fail with 404 (not found)
+    """
+    def test_missing_job(self):
+        self.assertEqual(self.client.get("/funpdbe_deposition/jobs/42/").status_code, 404)
+
+    """
+    Test if asynchronous POST works without permission
+    This should fail with 403 (forbidden)
+    """
+    def test_posting_without_permission(self):
+        url = "/funpdbe_deposition/entries/resource/nod/async/"
+        response = self.client.post(url, json.dumps(MockData().data), content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    """
+    Test if the worker command runs jobs left in the queue
+    """
+    def test_worker_command(self):
+        with mock.patch("funpdbe_deposition.jobs.enqueue"):
+            self.client.post(URL, json.dumps(MockData().data), content_type="application/json")
+        self.assertEqual(DepositionJob.objects.get().status, "queued")
+        call_command("run_deposition_jobs", stdout=StringIO())
+        self.assertEqual(DepositionJob.objects.get().status, "finished")
+        self.assertTrue(Entry.objects.filter(pdb_id="2abc").exists())
+
+
+class JobExecutorTests(TransactionTestCase):
+    """
+    Testing jobs run by the worker pool, after their commit
+    """
+
+    def setUp(self):
+        self.client = Client()
+        group = Group.objects.create(name="cath-funsites")
+        user = User.objects.create_user("test", "test@test.test", "test")
+        group.user_set.add(user)
+        self.client.login(username="test", password="test")
+        patcher = mock.patch.object(jobs, "executor", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait(self):
+        jobs.executor.shutdown(wait=True)
+
+    """
+    Test if an upload is saved by a worker thread once the job is committed
+    """
+    def test_executor(self):
+        response = self.client.post(URL, json.dumps(MockData().data), content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertIsNotNone(jobs.executor)
+        self.wait()
+        job = DepositionJob.objects.get()
+        self.assertEqual(job.status, "finished")
+        self.assertEqual(json.loads(job.results)[0]["status"], 201)
+        self.assertTrue(Entry.objects.filter(pdb_id="2abc").exists())
+
+    """
+    Test if the jobs left queued by a restart are run by the new worker pool
+    """
+    def test_resume_queued(self):
+        with mock.patch("funpdbe_deposition.jobs.enqueue"):
+            self.client.post(URL, json.dumps(MockData().data), content_type="application/json")
+        self.assertEqual(DepositionJob.objects.get().status, "queued")
+        jobs.get_executor()
+        self.wait()
+        self.assertEqual(DepositionJob.objects.get().status, "finished")
+        self.assertTrue(Entry.objects.filter(pdb_id="2abc").exists())
+
+    """
+    Test if the new worker pool leaves the queue alone when resuming is turned off
+    """
+    @override_settings(FUNPDBE_JOBS_RESUME=False)
+    def test_no_resume(self):
+        with mock.patch("funpdbe_deposition.jobs.enqueue"):
+            self.client.post(URL, json.dumps(MockData().data), content_type="application/json")
+        jobs.get_executor()
+        self.wait()
+        self.assertEqual(DepositionJob.objects.get().status, "queued")
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase
+from django.test import override_settings
+
+APP = "funpdbe_deposition"
+SQUASHED = (APP, "0001_squashed_0005_auto_20180306_1359")
+# Applied by the installations which predate the committed migrations
+DEPLOYED = ["0001_initial", "0002_auto_20180205_1400", "0003_auto_20180205_1459",
+            "0004_auto_20180306_1356", "0005_auto_20180306_1359"]
+LOCAL_MIGRATION = """from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [(%r, %r)]
+
+    operations = []
+"""
+
+
+class MigrationTests(TestCase):
+    """
+    Testing the migration history against the deployed databases
+    """
+
+    def leaves(self, loader):
+        return [node for node in loader.graph.leaf_nodes() if node[0] == APP]
+
+    """
+    Test if the migrations of the app have a single leaf
+    """
+    def test_single_leaf(self):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        self.assertEqual(len(self.leaves(loader)), 1)
+        self.assertEqual(loader.disk_migrations[SQUASHED].replaces, [(APP, name) for name in DEPLOYED])
+
+    """
+    Test if a database with the deployed migrations only applies the later ones,
+    including the columns of the pre-rendered JSON document
+    """
+    def test_deployed_database(self):
+        applied = dict(((APP, name), None) for name in DEPLOYED)
+        with mock.patch.object(MigrationRecorder, "applied_migrations", return_value=applied):
+            executor = MigrationExecutor(connection)
+            self.assertIn(SQUASHED, executor.loader.applied_migrations)
+            plan = [migration.name for migration, backwards in
+                    executor.migration_plan(self.leaves(executor.loader))
+                    if migration.app_label == APP]
+        self.assertEqual(plan[:2], ["0006_alter_sitedata_site_id_ref", "0007_entry_rendered"])
+        self.assertNotIn(SQUASHED[1], plan)
+
+    """
+    Test if the deployed migration files, which were never committed,
+    do not give a second leaf when they are next to the committed ones
+    """
+    def test_local_migration_files(self):
+        directory = tempfile.mkdtemp()
+        package = os.path.join(directory, "local_migrations")
+        shutil.copytree(os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations"), package,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        previous = "0001_initial"
+        for name in DEPLOYED:
+            with open(os.path.join(package, name + ".py"), "w") as migration:
+                migration.write(LOCAL_MIGRATION % ((APP, previous) if name != previous else ("auth", "0001_initial")))
+            previous = name
+        sys.path.insert(0, directory)
+        try:
+            with override_settings(MIGRATION_MODULES={APP: "local_migrations"}):
+                loader = MigrationLoader(None, ignore_no_migrations=True)
+                self.assertEqual(self.leaves(loader), [(APP, "0015_prunedchanges")])
+                self.assertNotIn((APP, "0005_auto_20180306_1359"), loader.graph.nodes)
+        finally:
+            sys.path.remove(directory)
+            for module in [module for module in sys.modules if module.startswith("local_migrations")]:
+                del sys.modules[module]
+            shutil.rmtree(directory)
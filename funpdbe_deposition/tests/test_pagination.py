@@ -0,0 +1,62 @@
+from __future__ import unicode_literals
+import json
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.pagination import encode_cursor
+from funpdbe_deposition.pagination import decode_cursor
+
+
+class ApiPaginationTests(TestCase):
+    """
+    Testing cursor pagination and streaming of the list views
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("test", "test@test.test", "test")
+        for index in range(5):
+            Entry.objects.create(owner=self.user, pdb_id="%dabc" % index, data_resource="cath-funsites")
+        Entry.objects.create(owner=self.user, pdb_id="0abc", data_resource="nod")
+
+    def pdb_ids(self, page):
+        return [entry["pdb_id"] for entry in page["results"]]
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor("a", 42)), ("a", 42))
+        self.assertIsNone(decode_cursor("invalid"))
+
+    def test_walking_forward_and_back(self):
+        page = self.client.get("/funpdbe_deposition/entries/resource/cath-funsites/?page_size=2").json()
+        self.assertEqual(self.pdb_ids(page), ["0abc", "1abc"])
+        self.assertIsNone(page["prev"])
+        page = self.client.get(page["next"]).json()
+        self.assertEqual(self.pdb_ids(page), ["2abc", "3abc"])
+        page = self.client.get(page["next"]).json()
+        self.assertEqual(self.pdb_ids(page), ["4abc"])
+        self.assertIsNone(page["next"])
+        page = self.client.get(page["prev"]).json()
+        self.assertEqual(self.pdb_ids(page), ["2abc", "3abc"])
+        page = self.client.get(page["prev"]).json()
+        self.assertEqual(self.pdb_ids(page), ["0abc", "1abc"])
+        self.assertIsNone(page["prev"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/funpdbe_deposition/entries/?cursor=invalid")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_page_size(self):
+        response = self.client.get("/funpdbe_deposition/entries/?page_size=0")
+        self.assertEqual(response.status_code, 400)
+
+    def test_streaming(self):
+        response = self.client.get("/funpdbe_deposition/entries/?stream=true")
+        self.assertEqual(response.status_code, 200)
+        entries = json.loads(b"".join(response.streaming_content).decode("utf-8"))
+        self.assertEqual(len(entries), 6)
+
+    def test_streaming_when_none(self):
+        Entry.objects.all().delete()
+        response = self.client.get("/funpdbe_deposition/entries/?stream=true")
+        self.assertEqual(response.status_code, 404)
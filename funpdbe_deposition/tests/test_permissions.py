@@ -0,0 +1,78 @@
+from __future__ import unicode_literals
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.test import override_settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition import permissions
+from funpdbe_deposition.caching import cache_ttl
+from funpdbe_deposition.permissions import cache_key
+from funpdbe_deposition.permissions import user_resources
+from funpdbe_deposition.permissions import can_deposit
+
+SHARED_CACHE = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "funpdbe_cache"}}
+
+
+class TestPermissionCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # As with a cache shared by the workers
+        patcher = mock.patch.object(permissions, "PERMISSION_TTL", 300)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.group = Group.objects.create(name="cath-funsites")
+        self.user = User.objects.create_user("test", "test@test.test", "test")
+        self.group.user_set.add(self.user)
+
+    def test_cached_lookup(self):
+        self.assertEqual(user_resources(self.user), frozenset(["cath-funsites"]))
+        with self.assertNumQueries(0):
+            self.assertTrue(can_deposit(self.user, "cath-funsites"))
+            self.assertFalse(can_deposit(self.user, "nod"))
+
+    def test_anonymous_user(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(can_deposit(AnonymousUser(), "cath-funsites"))
+
+    def test_invalidated_when_user_joins_group(self):
+        self.assertFalse(can_deposit(self.user, "nod"))
+        self.user.groups.add(Group.objects.create(name="nod"))
+        self.assertTrue(can_deposit(self.user, "nod"))
+
+    def test_invalidated_when_group_loses_user(self):
+        self.assertTrue(can_deposit(self.user, "cath-funsites"))
+        self.group.user_set.remove(self.user)
+        self.assertFalse(can_deposit(self.user, "cath-funsites"))
+
+    def test_invalidated_when_group_is_cleared(self):
+        self.assertTrue(can_deposit(self.user, "cath-funsites"))
+        self.group.user_set.clear()
+        self.assertFalse(can_deposit(self.user, "cath-funsites"))
+
+    def test_invalidated_when_group_is_deleted(self):
+        self.assertTrue(can_deposit(self.user, "cath-funsites"))
+        self.group.delete()
+        self.assertFalse(can_deposit(self.user, "cath-funsites"))
+
+    def test_invalidated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.user_set.remove(self.user)
+            # A concurrent request caches the groups before the removal is committed
+            cache.set(cache_key(self.user.pk), frozenset(["cath-funsites"]))
+        self.assertFalse(can_deposit(self.user, "cath-funsites"))
+
+    def test_uncached_without_ttl(self):
+        with mock.patch.object(permissions, "PERMISSION_TTL", 0):
+            self.assertTrue(can_deposit(self.user, "cath-funsites"))
+            with self.assertNumQueries(1):
+                self.assertTrue(can_deposit(self.user, "cath-funsites"))
+
+    def test_default_ttl(self):
+        self.assertEqual(cache_ttl("FUNPDBE_UNKNOWN_TTL", 300), 0)
+        with override_settings(CACHES=SHARED_CACHE):
+            self.assertEqual(cache_ttl("FUNPDBE_UNKNOWN_TTL", 300), 300)
+        with override_settings(FUNPDBE_UNKNOWN_TTL=60):
+            self.assertEqual(cache_ttl("FUNPDBE_UNKNOWN_TTL", 300), 60)
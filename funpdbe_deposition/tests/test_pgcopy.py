@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from unittest import mock
+from unittest import skipIf
+from django.db import connection
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition import bulk
+from funpdbe_deposition import pgcopy
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+
+
+class TestPgCopy(TestCase):
+    """
+    Testing the COPY bulk loading of pgcopy.py
+    """
+
+    """
+    Test if values are written in the COPY text format
+    """
+    def test_copy_value(self):
+        self.assertEqual(pgcopy.copy_value(None), "\\N")
+        self.assertEqual(pgcopy.copy_value(0.1), "0.1")
+        self.assertEqual(pgcopy.copy_value(12), "12")
+        self.assertEqual(pgcopy.copy_value("a\tb\\c\nd"), "a\\tb\\\\c\\nd")
+
+    """
+    Test if COPY is only used for many residues or site data on PostgreSQL
+    """
+    def test_copy_supported(self):
+        residues = [Residue()] * pgcopy.COPY_MIN_ROWS
+        self.assertEqual(pgcopy.copy_supported(Residue, residues), connection.vendor == "postgresql")
+        self.assertFalse(pgcopy.copy_supported(Residue, residues[1:]))
+        self.assertFalse(pgcopy.copy_supported(User, residues))
+
+    """
+    Test if an entry loaded with COPY is read back like it was deposited
+    This should succeed with 201 (created)
+    """
+    @skipIf(connection.vendor != "postgresql", "COPY needs PostgreSQL")
+    def test_copy_deposition(self):
+        client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        client.login(username="test", password="test")
+        data = MockData.generate("1abc", chains=2, residues=30, site_data=2)
+        data["chains"][0]["residues"][0]["aa_type"] = "A\tB"
+        data["chains"][0]["residues"][1]["site_data"][0]["raw_score"] = None
+        with mock.patch.object(pgcopy, "COPY_MIN_ROWS", 1), mock.patch.object(pgcopy, "COPY_CHUNK_SIZE", 7), \
+                mock.patch.object(bulk, "copy_insert", wraps=pgcopy.copy_insert) as copy_insert:
+            response = client.post(URL, json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(copy_insert.called)
+        self.assertEqual(SiteData.objects.filter(residue_ref__chain_ref__entry_ref__pdb_id="1abc",
+                                                 site__isnull=False).count(), 120)
+        document = client.get(URL + "1abc/").json()[0]
+        self.assertEqual(document["chains"], data["chains"])
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import json
+from unittest import mock
 from django.test import TestCase
 from django.test import Client
 from django.contrib.auth.models import User
 from django.contrib.auth.models import Group
 from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Chain
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.bulk import BulkEntryWriter
 from funpdbe_deposition.mock_data import MockData
 
 
@@ -16,7 +20,7 @@ class ApiPutTests(TestCase):
         self.group = Group.objects.create(name="cath-funsites")
         self.user = User.objects.create_user("test", "test@test.test", "test")
         self.group.user_set.add(self.user)
-        self.entry = Entry.objects.create(owner_id=1, pdb_id="2abc", data_resource="cath-funsites")
+        self.entry = Entry.objects.create(owner=self.user, pdb_id="2abc", data_resource="cath-funsites")
         self.data = MockData()
 
     def generic_put_test(self, url, code):
@@ -108,7 +112,76 @@ class ApiPutTests(TestCase):
     This should fail with 400 (bad request)
     """
     def test_updating_when_json_mismatched(self):
-        Entry.objects.create(owner_id=1, pdb_id="2abc", data_resource="nod")
+        Entry.objects.create(owner=self.user, pdb_id="2abc", data_resource="nod")
         group2 = Group.objects.create(name="nod")
         group2.user_set.add(self.user)
-        self.generic_put_test('/funpdbe_deposition/entries/resource/nod/2abc/', 400)
\ No newline at end of file
+        self.generic_put_test('/funpdbe_deposition/entries/resource/nod/2abc/', 400)
+
+    """
+    Test if DELETE&POST replaces the whole tree of the entry
+    This should succeed with 201 (created)
+    """
+    def test_updating_replaces_tree(self):
+        self.data.data = MockData.generate(chains=2, residues=3)
+        self.generic_put_test('/funpdbe_deposition/entries/resource/cath-funsites/2abc/', 201)
+        self.data.data = MockData.generate(chains=1, residues=5)
+        self.generic_put_test('/funpdbe_deposition/entries/resource/cath-funsites/2abc/', 201)
+        self.assertEqual(Entry.objects.get().pk, self.entry.pk)
+        self.assertEqual(Chain.objects.count(), 1)
+        self.assertEqual(Residue.objects.count(), 5)
+
+    """
+    Test if a failing update leaves the old entry in place
+    """
+    def test_failed_update_keeps_old_entry(self):
+        self.data.data = MockData.generate(chains=2, residues=3)
+        self.generic_put_test('/funpdbe_deposition/entries/resource/cath-funsites/2abc/', 201)
+        self.data.data = MockData.generate(chains=1, residues=5)
+        with mock.patch.object(BulkEntryWriter, "create_site_data", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.generic_put_test('/funpdbe_deposition/entries/resource/cath-funsites/2abc/', 500)
+        self.assertEqual(Chain.objects.count(), 2)
+        self.assertEqual(Residue.objects.count(), 6)
+
+    """
+    Test if PATCH rewrites only the chains sent by the user
+    This should succeed with 200 (OK)
+    """
+    def test_patching_chain(self):
+        self.data.data = MockData.generate(chains=2, residues=3)
+        self.generic_put_test('/funpdbe_deposition/entries/resource/cath-funsites/2abc/', 201)
+        chain_a = Chain.objects.get(chain_label="A")
+        chain_b = Chain.objects.get(chain_label="B")
+        patch = {"chains": MockData.generate(chains=1, residues=5)["chains"]}
+        self.client.login(username='test', password='test')
+        response = self.client.patch('/funpdbe_deposition/entries/resource/cath-funsites/2abc/',
+                                     json.dumps(patch), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Chain.objects.get(chain_label="A").pk, chain_a.pk)
+        self.assertEqual(Chain.objects.get(chain_label="B").pk, chain_b.pk)
+        self.assertEqual(Residue.objects.filter(chain_ref__chain_label="A").count(), 5)
+        self.assertEqual(Residue.objects.filter(chain_ref__chain_label="B").count(), 3)
+        labels = [chain["chain_label"] for chain in response.json()["chains"]]
+        self.assertEqual(labels, ["A", "B"])
+
+    """
+    Test if PATCH works when the resource name in the JSON
+    does not match with the user provided resource name
+    This should fail with 400 (bad request)
+    """
+    def test_patching_when_json_mismatched(self):
+        self.client.login(username='test', password='test')
+        response = self.client.patch('/funpdbe_deposition/entries/resource/cath-funsites/2abc/',
+                                     json.dumps({"data_resource": "nod"}), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    """
+    Test if PATCH works when user is logged in but not permitted
+    This should fail with 403 (forbidden)
+    """
+    def test_patching_when_not_allowed(self):
+        User.objects.create_user("test2", "test2@test.test", "test2")
+        self.client.login(username='test2', password='test2')
+        response = self.client.patch('/funpdbe_deposition/entries/resource/cath-funsites/2abc/',
+                                     json.dumps({"release_date": "02/02/2000"}), content_type="application/json")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.rendering import store_rendered
+
+# Existence check and stored documents, then, for entries without a stored
+# document, one query per level of the tree (entry with owner, chains,
+# residues, site data, sites, evidence codes)
+RENDERING_QUERIES = 8
+STORED_QUERIES = 2
+
+
+class TestEntryQueryPlan(TestCase):
+    """
+    Testing that the read views run a fixed number of queries
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("test", "test@test.test", "test")
+
+    def deposit(self, pdb_ids, resource="cath-funsites", residues=2):
+        writer = BulkEntryWriter()
+        for pdb_id in pdb_ids:
+            serializer = EntrySerializer(data=MockData.generate(pdb_id, resource, chains=2,
+                                                                residues=residues, site_data=2))
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            writer.add(serializer.validated_data, owner=self.user)
+        writer.save()
+
+    def assert_queries(self, url, count):
+        with self.assertNumQueries(count):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def assert_views(self, count):
+        self.assert_queries("/funpdbe_deposition/entries/", count)
+        self.assert_queries("/funpdbe_deposition/entries/resource/cath-funsites/", count)
+        self.assert_queries("/funpdbe_deposition/entries/pdb/1abc/", count)
+        self.assert_queries("/funpdbe_deposition/entries/resource/cath-funsites/1abc/", count)
+
+    def test_few_entries(self):
+        self.deposit(["1abc"])
+        self.assert_views(RENDERING_QUERIES)
+
+    def test_many_entries_and_residues(self):
+        self.deposit(["1abc", "2abc", "3abc", "4abc"], residues=50)
+        self.deposit(["1abc"], resource="nod", residues=50)
+        self.assert_views(RENDERING_QUERIES)
+
+    def test_stored_documents(self):
+        self.deposit(["1abc", "2abc", "3abc", "4abc"], residues=50)
+        store_rendered(Entry.objects.all())
+        self.assert_views(STORED_QUERIES)
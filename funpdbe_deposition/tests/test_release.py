@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import Residue
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/release/1.0.0/"
+
+
+def release(pdb_ids, version, residues=2):
+    entries = []
+    for pdb_id in pdb_ids:
+        entry = MockData.generate(pdb_id, residues=residues)
+        entry["resource_version"] = version
+        entries.append(entry)
+    return entries
+
+
+class ApiReleaseTests(TestCase):
+    """
+    Testing purge and replacement of a whole release of a resource
+    """
+
+    def setUp(self):
+        self.client = Client()
+        group = Group.objects.create(name="cath-funsites")
+        user = User.objects.create_user("test", "test@test.test", "test")
+        group.user_set.add(user)
+        self.client.login(username="test", password="test")
+        self.client.post("/funpdbe_deposition/entries/resource/cath-funsites/batch/",
+                         json.dumps(release(["1abc", "2abc"], "1.0.0") + release(["3abc"], "0.9")),
+                         content_type="application/json")
+
+    def versions(self):
+        return dict(Entry.objects.values_list("pdb_id", "resource_version"))
+
+    """
+    Test if every entry of a release is deleted, and only those
+    This should succeed with 200
+    """
+    def test_purge(self):
+        response = self.client.delete(URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"deleted": 2})
+        self.assertEqual(self.versions(), {"3abc": "0.9"})
+        self.assertEqual(Residue.objects.count(), 2)
+
+    """
+    Test if purging a release without entries fails
+    This should fail with 404 (not found)
+    """
+    def test_purge_unknown_release(self):
+        response = self.client.delete("/funpdbe_deposition/entries/resource/cath-funsites/release/2.0/")
+        self.assertEqual(response.status_code, 404)
+
+    """
+    Test if a release is replaced by a new one reusing some PDB ids
+    This should succeed with 201 (created)
+    """
+    def test_replace(self):
+        response = self.client.post(URL, json.dumps(release(["2abc", "4abc"], "2.0")),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["deleted"], 2)
+        self.assertEqual(self.versions(), {"2abc": "2.0", "3abc": "0.9", "4abc": "2.0"})
+        self.assertFalse(Entry.objects.filter(rendered_json__isnull=True).exists())
+
+    """
+    Test if an invalid entry leaves the old release untouched
+    This should fail with 400 (bad request)
+    """
+    def test_replace_with_invalid_entry(self):
+        entries = release(["2abc", "4abc"], "2.0")
+        entries[1]["pdb_id"] = "invalid"
+        response = self.client.post(URL, json.dumps(entries), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result["index"] for result in response.json()["results"]], [1])
+        self.assertEqual(self.versions(), {"1abc": "1.0.0", "2abc": "1.0.0", "3abc": "0.9"})
+
+    """
+    Test if an entry clashing with another release rolls back the purge
+    This should fail with 400 (bad request)
+    """
+    def test_replace_with_entry_of_other_release(self):
+        response = self.client.post(URL, json.dumps(release(["2abc", "3abc"], "2.0")),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["deleted"], 0)
+        self.assertEqual([result["pdb_id"] for result in response.json()["results"]], ["3abc"])
+        self.assertEqual(self.versions(), {"1abc": "1.0.0", "2abc": "1.0.0", "3abc": "0.9"})
+        self.assertEqual(Residue.objects.count(), 6)
+
+    """
+    Test if an empty release is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_replace_with_nothing(self):
+        response = self.client.post(URL, "[]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Entry.objects.count(), 3)
+
+    """
+    Test if a release can be changed without permission
+    This should fail with 403 (forbidden)
+    """
+    def test_without_permission(self):
+        response = self.client.delete("/funpdbe_deposition/entries/resource/nod/release/1.0.0/")
+        self.assertEqual(response.status_code, 403)
+
+    """
+    Test the management command, replacing from an NDJSON file, then purging
+    """
+    def test_command(self):
+        handle, path = tempfile.mkstemp(suffix=".ndjson")
+        with os.fdopen(handle, "w") as ndjson:
+            ndjson.write("\n".join(json.dumps(entry) for entry in release(["4abc"], "2.0")))
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+        call_command("release_resource", "cath-funsites", "1.0.0", replace=path, owner="test", stdout=out)
+        self.assertIn("Deleted 2 entries, created 1 entries", out.getvalue())
+        call_command("release_resource", "cath-funsites", "2.0", stdout=out)
+        self.assertEqual(self.versions(), {"3abc": "0.9"})
+        with self.assertRaises(CommandError):
+            call_command("release_resource", "cath-funsites", "0.9", replace=path, stdout=out)
@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition import rendering
+from funpdbe_deposition.bulk import patch_entry
+from funpdbe_deposition.bulk import replace_entry
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.mock_data import MockData
+
+
+class TestRenderedDocuments(TestCase):
+    """
+    Testing the pre-rendered JSON documents of entries
+    """
+
+    def setUp(self):
+        self.client = Client()
+        group = Group.objects.create(name="cath-funsites")
+        self.user = User.objects.create_user("test", "test@test.test", "test")
+        group.user_set.add(self.user)
+        self.client.login(username="test", password="test")
+
+    def post(self):
+        return self.client.post("/funpdbe_deposition/entries/resource/cath-funsites/",
+                                json.dumps(MockData().data), content_type="application/json")
+
+    def test_post_stores_document(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 201)
+        entry = Entry.objects.get()
+        self.assertEqual(rendering.unpack(entry.rendered_json), response.content)
+        self.assertEqual(entry.rendered_version, rendering.RENDER_VERSION)
+        self.assertEqual(response.json()["chains"][0]["residues"][0]["site_data"][0]["site_id_ref"], 1)
+
+    def test_get_serves_stored_document(self):
+        self.post()
+        Entry.objects.update(rendered_json=b'{"stored": true}')
+        response = self.client.get("/funpdbe_deposition/entries/resource/cath-funsites/2abc/")
+        self.assertEqual(response.json(), [{"stored": True}])
+
+    def test_update_rebuilds_document(self):
+        self.post()
+        Entry.objects.update(rendered_json=b'{"stored": true}')
+        self.client.post("/funpdbe_deposition/entries/resource/cath-funsites/2abc/",
+                         json.dumps(MockData().data), content_type="application/json")
+        response = self.client.get("/funpdbe_deposition/entries/resource/cath-funsites/2abc/")
+        self.assertEqual(response.json()[0]["pdb_id"], "2abc")
+
+    def test_update_clears_document(self):
+        self.post()
+        data = MockData().data
+        data["release_date"] = "02/02/2000"
+        serializer = EntrySerializer(Entry.objects.get(), data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        no_changes = {"chains": set(), "sites": set(), "evidence_code_ontology": False}
+        for update in (lambda entry: replace_entry(entry, serializer.validated_data),
+                       lambda entry: patch_entry(entry, serializer.validated_data, no_changes)):
+            rendering.store_rendered(Entry.objects.all())
+            # Until store_rendered runs again, the entry has no document to serve
+            update(Entry.objects.get())
+            entry = Entry.objects.get()
+            self.assertEqual((entry.rendered_json, entry.rendered_version, entry.rendered_hash), (None, None, None))
+            response = self.client.get("/funpdbe_deposition/entries/resource/cath-funsites/2abc/")
+            self.assertEqual(response.json()[0]["release_date"], "02/02/2000")
+
+    def test_compressed_document(self):
+        self.post()
+        entry = Entry.objects.get()
+        with mock.patch.object(rendering, "COMPRESS_RENDERED", True):
+            packed = rendering.pack(rendering.unpack(entry.rendered_json))
+        self.assertNotEqual(packed[:1], b"{")
+        self.assertEqual(rendering.unpack(packed), rendering.unpack(entry.rendered_json))
+
+    def test_command_rebuilds_stale_and_missing(self):
+        self.post()
+        Entry.objects.create(owner=self.user, pdb_id="1abc", data_resource="cath-funsites")
+        Entry.objects.filter(pdb_id="2abc").update(rendered_version=rendering.RENDER_VERSION - 1)
+        out = StringIO()
+        call_command("rebuild_rendered", stdout=out)
+        self.assertIn("Rebuilt 2", out.getvalue())
+        self.assertFalse(Entry.objects.filter(rendered_json__isnull=True).exists())
+        self.assertFalse(Entry.objects.exclude(rendered_version=rendering.RENDER_VERSION).exists())
+
+    """
+    Test if the browsable API renders the entries, their pages and new entries
+    """
+    def test_browsable_api(self):
+        self.post()
+        url = "/funpdbe_deposition/entries/resource/cath-funsites/"
+        for query in ("2abc/?format=api", "?format=api&page_size=10"):
+            response = self.client.get(url + query)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response["Content-Type"].startswith("text/html"))
+            self.assertIn(b"2abc", response.content)
+        Entry.objects.all().delete()
+        response = self.client.post(url + "?format=api", json.dumps(MockData().data),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+
+    """
+    Test if an indented JSON response is rendered from the stored document
+    """
+    def test_indented_json(self):
+        self.post()
+        response = self.client.get("/funpdbe_deposition/entries/resource/cath-funsites/2abc/",
+                                   HTTP_ACCEPT="application/json; indent=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'\n  {\n    "', response.content)
+        stored = rendering.unpack(Entry.objects.get().rendered_json)
+        self.assertEqual(response.json(), [json.loads(stored.decode("utf-8"))])
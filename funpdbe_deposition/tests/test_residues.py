@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from funpdbe_deposition.bulk import BulkEntryWriter
+from funpdbe_deposition.mock_data import MockData
+from funpdbe_deposition.serializers import EntrySerializer
+
+URL = "/funpdbe_deposition/entries/pdb/1abc/residues/"
+
+
+class ApiResidueTests(TestCase):
+    """
+    Testing the residue level query of the site data of a PDB id
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        writer = BulkEntryWriter()
+        for pdb_id, resource in (("1abc", "cath-funsites"), ("1abc", "nod"), ("2abc", "nod")):
+            # raw_score is the residue number / 100
+            data = MockData.generate(pdb_id, resource, chains=2, residues=10)
+            data["chains"][1]["residues"][0]["site_data"][0]["confidence_classification"] = "low"
+            serializer = EntrySerializer(data=data)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            writer.add(serializer.validated_data, owner=user)
+        writer.save()
+
+    def get(self, **params):
+        with self.assertNumQueries(1):
+            response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    """
+    Test if the site data of every resource is listed without filters
+    This should succeed with 200
+    """
+    def test_no_filters(self):
+        rows = self.get()
+        self.assertEqual(len(rows), 40)
+        self.assertEqual(rows[0], {"data_resource": "cath-funsites", "pdb_id": "1abc", "chain_label": "A",
+                                   "pdb_res_label": "1", "aa_type": "ALA", "site_id_ref": 1, "raw_score": 0.01,
+                                   "confidence_score": 0.9, "confidence_classification": "high",
+                                   "site_label": "ligand_binding_site"})
+
+    """
+    Test if score ranges are applied
+    This should succeed with 200
+    """
+    def test_score_filters(self):
+        rows = self.get(min_raw_score="0.08", max_raw_score="0.09")
+        self.assertEqual(sorted(set(row["pdb_res_label"] for row in rows)), ["8", "9"])
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(len(self.get(min_confidence_score="0.8")), 40)
+        self.assertEqual(self.get(max_confidence_score="0.8"), [])
+
+    """
+    Test if resource, chain and classification filters are applied
+    This should succeed with 200
+    """
+    def test_other_filters(self):
+        self.assertEqual(len(self.get(data_resource="nod")), 20)
+        self.assertEqual(len(self.get(data_resource="nod", chain_label="B")), 10)
+        self.assertEqual(len(self.get(chain_label="A", pdb_res_label="3")), 2)
+        self.assertEqual(len(self.get(site_label="ligand_binding_site")), 40)
+        self.assertEqual(self.get(site_label="other"), [])
+        rows = self.get(confidence_classification="low")
+        self.assertEqual([(row["data_resource"], row["chain_label"]) for row in rows],
+                         [("cath-funsites", "B"), ("nod", "B")])
+
+    """
+    Test if invalid filter values are rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_filters(self):
+        for params in ({"min_raw_score": "high"}, {"min_raw_score": "nan"}, {"max_raw_score": "inf"},
+                       {"min_raw_score": "-Infinity"}, {"data_resource": "invalid"},
+                       {"confidence_classification": "invalid"}):
+            response = self.client.get(URL, params)
+            self.assertEqual(response.status_code, 400)
+
+    """
+    Test if an invalid PDB id is rejected
+    This should fail with 400 (bad request)
+    """
+    def test_invalid_pdb_id(self):
+        response = self.client.get("/funpdbe_deposition/entries/pdb/invalid/residues/")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from unittest import mock
+from django.test import TestCase
+from rest_framework import serializers
+from funpdbe_deposition import schema
+from funpdbe_deposition.serializers import ChainSerializer
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.mock_data import MockData
+
+
+def drf_chains(chains):
+    serializer = serializers.ListSerializer(child=ChainSerializer(), data=chains)
+    serializer.is_valid()
+    return serializer
+
+
+class TestSchema(TestCase):
+    """
+    Testing the compiled chain validation of schema.py
+    """
+
+    def setUp(self):
+        self.chains = MockData.generate(chains=3, residues=20, site_data=2)["chains"]
+
+    """
+    Test if the compiled validator returns the validated data of the serializers
+    """
+    def test_same_data(self):
+        self.chains[0]["residues"][0]["site_data"][0]["raw_score"] = 1
+        self.chains[1]["chain_annotation"] = None
+        self.chains[2]["unknown"] = "ignored"
+        validated = schema.validate_chains(ChainSerializer, self.chains)
+        self.assertEqual(validated, drf_chains(self.chains).validated_data)
+        self.assertIsInstance(validated[0]["residues"][0]["site_data"][0]["raw_score"], float)
+
+    """
+    Test if values which are not in their canonical form are left to the serializers
+    """
+    def test_fallback(self):
+        for change in ({"raw_score": "0.5"}, {"site_id_ref": 1.0}, {"confidence_classification": "bad"},
+                       {"site_id_ref": True}, {"raw_score": float("nan")}):
+            site_data = dict(self.chains[0]["residues"][0]["site_data"][0], **change)
+            chains = [dict(self.chains[0], residues=[dict(self.chains[0]["residues"][0], site_data=[site_data])])]
+            self.assertIsNone(schema.validate_chains(ChainSerializer, chains))
+        for label in (" A", "", "A" * 21, 7, "Å"):
+            self.assertIsNone(schema.validate_chains(ChainSerializer, [dict(self.chains[0], chain_label=label)]))
+        del self.chains[0]["residues"][0]["aa_type"]
+        self.assertIsNone(schema.validate_chains(ChainSerializer, self.chains))
+
+    """
+    Test if invalid entries keep the errors and field paths of the serializers
+    """
+    def test_errors(self):
+        data = MockData.generate(chains=2, residues=3)
+        data["chains"][1]["residues"][2]["site_data"][0]["confidence_classification"] = "bad"
+        data["chains"][1]["residues"][0]["pdb_res_label"] = "1" * 11
+        serializer = EntrySerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["chains"], drf_chains(data["chains"]).errors)
+        residues = serializer.errors["chains"][1]["residues"]
+        self.assertIn("pdb_res_label", residues[0])
+        self.assertIn("confidence_classification", residues[2]["site_data"][0])
+
+    """
+    Test if the chains of large entries are split across the pool of processes
+    """
+    def test_pool(self):
+        self.assertEqual([len(group) for group in schema.split_chains(self.chains, 2)], [2, 1])
+        with mock.patch.object(schema, "VALIDATION_WORKERS", 2), mock.patch.object(schema, "PARALLEL_RESIDUES", 1):
+            try:
+                validated = schema.validate_chains(ChainSerializer, self.chains)
+                self.chains[2]["residues"][0]["aa_type"] = "TOOLONG"
+                invalid = schema.validate_chains(ChainSerializer, self.chains)
+            finally:
+                schema.shutdown_pool()
+        self.assertEqual(validated, drf_chains(MockData.generate(chains=3, residues=20, site_data=2)["chains"])
+                         .validated_data)
+        self.assertIsNone(invalid)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from io import StringIO
+from django.test import TestCase
+from django.test import Client
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from funpdbe_deposition.compact import compact_chains
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.queries import dangling_site_refs_by_entry
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+
+
+class ApiSiteRefTests(TestCase):
+    """
+    Testing that every site_id_ref matches a site_id of its entry
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        self.client.login(username="test", password="test")
+
+    def post(self, data, url=URL):
+        return self.client.post(url, json.dumps(data), content_type="application/json")
+
+    """
+    Test if a reference to a missing site is rejected, pointing to the residue
+    This should fail with 400 (bad request)
+    """
+    def test_dangling_ref(self):
+        data = MockData.generate("1abc", chains=2, residues=3, site_data=2)
+        data["chains"][1]["residues"][2]["site_data"][1]["site_id_ref"] = 3
+        response = self.post(data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["chains"],
+                         ["Chain B, residue 3: site_id_ref 3 does not match any site_id in sites"])
+        self.assertFalse(Entry.objects.exists())
+
+    """
+    Test if null references are allowed, and errors are limited per entry
+    """
+    def test_null_and_limit(self):
+        data = MockData.generate("1abc", residues=30)
+        data["chains"][0]["residues"][0]["site_data"][0]["site_id_ref"] = None
+        self.assertEqual(self.post(data).status_code, 201)
+        data = MockData.generate("2abc", residues=30)
+        data["sites"] = []
+        self.assertEqual(len(self.post(data).json()["chains"]), 10)
+
+    """
+    Test if compact and streamed depositions are checked too
+    This should fail with 400 (bad request)
+    """
+    def test_compact_and_upload(self):
+        data = MockData.generate("1abc", chains=2, residues=3, site_data=2)
+        data["sites"].pop()
+        self.assertEqual(self.post(data, URL + "upload/").status_code, 400)
+        data["chains"] = compact_chains(data["chains"])
+        self.assertEqual(self.post(data, URL + "?format=compact").status_code, 400)
+        self.assertFalse(Entry.objects.exists())
+
+    """
+    Test if the audit command finds the references broken after deposition with one query
+    """
+    def test_audit(self):
+        self.post(MockData.generate("1abc", residues=3, site_data=2))
+        self.post(MockData.generate("2abc", residues=3, site_data=2))
+        SiteData.objects.filter(residue_ref__chain_ref__entry_ref__pdb_id="2abc", site_id_ref=2).update(site_id_ref=5)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(dangling_site_refs_by_entry()), [("2abc", "cath-funsites", 3)])
+        self.assertEqual(list(dangling_site_refs_by_entry("nod")), [])
+        out = StringIO()
+        call_command("audit_site_refs", stdout=out)
+        self.assertIn("cath-funsites\t2abc\t3", out.getvalue())
+        self.assertIn("Found 3 dangling site references in 1 entries", out.getvalue())
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test import Client
+from django.contrib.auth.models import User
+from django.contrib.auth.models import Group
+from django.db.models import F
+from funpdbe_deposition.models import Site
+from funpdbe_deposition.models import SiteData
+from funpdbe_deposition.mock_data import MockData
+
+URL = "/funpdbe_deposition/entries/resource/cath-funsites/"
+backfill = import_module("funpdbe_deposition.migrations.0014_backfill_sitedata_site")
+
+
+class SiteLinkTests(TestCase):
+    """
+    Testing the site foreign key of SiteData
+    """
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user("test", "test@test.test", "test")
+        Group.objects.create(name="cath-funsites").user_set.add(user)
+        self.client.login(username="test", password="test")
+
+    def post(self, data, url=URL):
+        response = self.client.post(url, json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def assertLinked(self, count):
+        self.assertEqual(SiteData.objects.count(), count)
+        linked = SiteData.objects.filter(site__site_id=F("site_id_ref"),
+                                         site__entry_ref=F("residue_ref__chain_ref__entry_ref"))
+        self.assertEqual(linked.count(), count)
+
+    """
+    Test if the site data are linked to their site when they are inserted
+    """
+    def test_insert(self):
+        self.post(MockData.generate("1abc", chains=2, residues=3, site_data=2))
+        self.post(MockData.generate("2abc", chains=2, residues=3, site_data=2), URL + "upload/")
+        self.assertLinked(24)
+
+    """
+    Test if the site data of unchanged chains are linked to sites replaced by PATCH
+    """
+    def test_patch(self):
+        data = MockData.generate("1abc", chains=2, residues=3, site_data=2)
+        self.post(data)
+        data["sites"][1]["label"] = "other_site"
+        data["chains"][0]["residues"][0]["pdb_res_label"] = "100"
+        response = self.client.patch(URL + "1abc/", json.dumps({"sites": data["sites"], "chains": data["chains"][:1]}),
+                                     content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertLinked(12)
+        self.assertEqual(SiteData.objects.filter(site__label="other_site").count(), 6)
+
+    """
+    Test if the backfill migration links every existing site data
+    """
+    def test_backfill(self):
+        self.post(MockData.generate("1abc", chains=2, residues=3, site_data=2))
+        self.post(MockData.generate("2abc", chains=1, residues=3, site_data=1))
+        SiteData.objects.update(site=None)
+        with mock.patch.object(backfill, "CHUNK_SIZE", 5):
+            backfill.backfill_site(apps, SimpleNamespace(connection=connection))
+        self.assertLinked(15)
+        Site.objects.filter(site_id=2).delete()
+        self.assertEqual(SiteData.objects.filter(site__isnull=True).count(), 6)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import skipIf
+from django.db import connection
+from django.db import transaction
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from funpdbe_deposition.models import Entry
+from funpdbe_deposition.sqlite import WriteQueue
+from funpdbe_deposition.sqlite import atomic_write
+from funpdbe_deposition.sqlite import write_queue
+
+
+class TestSqlite(TestCase):
+    """
+    Testing the SQLite tuning of sqlite.py
+    """
+
+    """
+    Test if the pragmas are applied to the connection
+    """
+    @skipIf(connection.vendor != "sqlite", "SQLite only")
+    def test_pragmas(self):
+        with connection.cursor() as cursor:
+            for pragma, expected in (("busy_timeout", 20000), ("synchronous", 1), ("cache_size", -65536)):
+                cursor.execute("PRAGMA %s" % pragma)
+                self.assertEqual(cursor.fetchone()[0], expected)
+
+    """
+    Test if the write queue is reentrant and served in order of arrival
+    """
+    def test_write_queue(self):
+        queue = WriteQueue()
+        served = []
+        queue.acquire()
+        queue.acquire()
+
+        def write(number):
+            queue.acquire()
+            served.append(number)
+            queue.release()
+
+        threads = []
+        for number in range(5):
+            thread = threading.Thread(target=write, args=(number,))
+            thread.start()
+            threads.append(thread)
+            # Wait for the thread to take its ticket
+            while queue.next_ticket != number + 2:
+                time.sleep(0.001)
+        queue.release()
+        self.assertEqual(served, [])
+        queue.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(served, [0, 1, 2, 3, 4])
+
+    """
+    Test if an error rolls back the transaction and releases the queue
+    """
+    def test_atomic_write(self):
+        user = User.objects.create_user("test", "test@test.test", "test")
+        with self.assertRaises(ValueError):
+            with atomic_write():
+                Entry.objects.create(owner=user, pdb_id="1abc", data_resource="nod")
+                raise ValueError()
+        self.assertFalse(Entry.objects.exists())
+        self.assertIsNone(write_queue.owner)
+        with atomic_write():
+            with atomic_write():
+                Entry.objects.create(owner=user, pdb_id="1abc", data_resource="nod")
+        self.assertTrue(Entry.objects.exists())
+
+
+@skipIf(connection.vendor != "sqlite", "SQLite only")
+class TestImmediateTransaction(TransactionTestCase):
+    """
+    Testing the transactions started by atomic_write on a database file,
+    which TestCase never starts, as it runs every test in a transaction
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "test.sqlite3")
+        # The in-memory test database lasts as long as its connection is open
+        name, memory = connection.settings_dict["NAME"], connection.connection
+        connection.connection = None
+        connection.settings_dict["NAME"] = self.path
+        self.addCleanup(self.restore, name, memory)
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE item (name TEXT)")
+
+    def restore(self, name, memory):
+        connection.close()
+        connection.settings_dict["NAME"] = name
+        connection.connection = memory
+
+    def other_connection(self):
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+        return other
+
+    """
+    Test if the WAL journal is only set by the first write transaction
+    """
+    def test_journal_mode(self):
+        other = self.other_connection()
+        self.assertEqual(other.execute("PRAGMA journal_mode").fetchall()[0][0], "delete")
+        with CaptureQueriesContext(connection) as queries:
+            with atomic_write():
+                with connection.cursor() as cursor:
+                    cursor.execute("INSERT INTO item VALUES ('first')")
+            with atomic_write():
+                with connection.cursor() as cursor:
+                    cursor.execute("INSERT INTO item VALUES ('second')")
+        statements = [query["sql"] for query in queries.captured_queries]
+        self.assertEqual(statements.count("PRAGMA journal_mode = wal"), 1)
+        self.assertEqual(statements.count("BEGIN IMMEDIATE"), 2)
+        self.assertEqual(self.other_connection().execute("PRAGMA journal_mode").fetchall()[0][0], "wal")
+
+    """
+    Test if the write lock is taken when the transaction starts, and not at its first write
+    """
+    def test_lock_at_begin(self):
+        other = self.other_connection()
+        with atomic_write():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM item")
+            with self.assertRaises(sqlite3.OperationalError):
+                other.execute("INSERT INTO item VALUES ('other')")
+            with connection.cursor() as cursor:
+                cursor.execute("INSERT INTO item VALUES ('mine')")
+        self.assertFalse(connection.begin_immediate)
+        other.execute("INSERT INTO item VALUES ('other')")
+        self.assertEqual(other.execute("SELECT COUNT(*) FROM item").fetchall()[0][0], 2)
+
+    """
+    Test if transaction.atomic still starts deferred transactions
+    """
+    def test_deferred(self):
+        other = self.other_connection()
+        with atomic_write():
+            pass
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM item")
+            # Readers do not block writers with the WAL journal
+            other.execute("INSERT INTO item VALUES ('other')")
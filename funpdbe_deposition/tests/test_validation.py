@@ -0,0 +1,43 @@
+from __future__ import unicode_literals
+from django.test import TestCase
+from funpdbe_deposition.models import CLASSIFICATION
+from funpdbe_deposition.validation import classification_valid
+from funpdbe_deposition.validation import resource_valid
+from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.mock_data import MockData
+
+
+class TestValidationTables(TestCase):
+
+    def test_classification_valid(self):
+        for classification_tuple in CLASSIFICATION:
+            self.assertTrue(classification_valid(classification_tuple[0]))
+        self.assertFalse(classification_valid("invalid"))
+        self.assertFalse(classification_valid(None))
+
+    def test_unhashable_value(self):
+        self.assertFalse(resource_valid(["nod"]))
+
+    def test_serializer_checks_pdb_id(self):
+        data = MockData().data
+        data["pdb_id"] = "abcd"
+        serializer = EntrySerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("pdb_id", serializer.errors)
+
+    def test_serializer_lowers_pdb_id(self):
+        data = MockData().data
+        data["pdb_id"] = "2ABC"
+        serializer = EntrySerializer(data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["pdb_id"], "2abc")
+
+    def test_serializer_checks_choices(self):
+        data = MockData().data
+        data["sites"][0]["source_database"] = "invalid"
+        data["chains"][0]["residues"][0]["site_data"][0]["confidence_classification"] = "invalid"
+        serializer = EntrySerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("source_database", serializer.errors["sites"][0])
+        self.assertIn("confidence_classification",
+                      serializer.errors["chains"][0]["residues"][0]["site_data"][0])
@@ -2,7 +2,8 @@ from django.test import TestCase
 from funpdbe_deposition.views import get_existing_entry
 from funpdbe_deposition.views import resource_valid
 from funpdbe_deposition.views import pdb_id_valid
-from funpdbe_deposition.views import GENERIC_RESPONSES, RESOURCES
+from funpdbe_deposition.views import GENERIC_RESPONSES
+from funpdbe_deposition.models import RESOURCES
 
 
 class TestViewHelpers(TestCase):
@@ -4,6 +4,16 @@ from funpdbe_deposition import views
 urlpatterns = [
     url(r'^entries/$', views.EntryList.as_view()),
     url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/$', views.EntryListByResource.as_view()),
+    url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/batch/$', views.EntryBatchByResource.as_view()),
+    url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/async/$', views.EntryJobByResource.as_view()),
+    url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/upload/$', views.EntryUploadByResource.as_view()),
+    url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/release/(?P<version>[A-Za-z0-9\-\._]+)/$',
+        views.ResourceReleaseByResource.as_view()),
+    url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/scores/$', views.ScoreExportByResource.as_view()),
     url(r'^entries/resource/(?P<resource>[A-Za-z0-9\-]+)/(?P<pdb_id>[A-Za-z0-9]+)/$', views.EntryDetailByResource.as_view()),
-    url(r'^entries/pdb/(?P<pdb_id>[A-Za-z0-9]+)/$', views.EntryListByPdb.as_view())
+    url(r'^entries/pdb/(?P<pdb_id>[A-Za-z0-9]+)/$', views.EntryListByPdb.as_view()),
+    url(r'^entries/pdb/(?P<pdb_id>[A-Za-z0-9]+)/residues/$', views.ResidueListByPdb.as_view()),
+    url(r'^entries/pdb/(?P<pdb_id>[A-Za-z0-9]+)/aggregated/$', views.AggregatedByPdb.as_view()),
+    url(r'^changes/$', views.ChangeList.as_view()),
+    url(r'^jobs/(?P<pk>[0-9]+)/$', views.DepositionJobDetail.as_view(), name='deposition-job')
 ]
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Validation tables, built once at import
+
+Every check is a frozenset membership test or a match against
+a pre-compiled pattern, so the per-request cost is constant
+"""
+import re
+from funpdbe_deposition.models import RESOURCES
+from funpdbe_deposition.models import CLASSIFICATION
+
+PDB_PATTERN = re.compile(r"^[0-9][A-Za-z][A-Za-z0-9]{2}$")
+# Number of dangling site references listed in the errors of one entry
+MAX_REFERENCE_ERRORS = 10
+
+
+def choice_values(choices):
+    return frozenset(value for choice in choices for value in choice)
+
+
+RESOURCE_NAMES = choice_values(RESOURCES)
+CLASSIFICATION_NAMES = choice_values(CLASSIFICATION)
+
+
+def in_table(value, table):
+    try:
+        return value in table
+    except TypeError:
+        # Unhashable values, i.e. lists from JSON
+        return False
+
+
+def resource_valid(resource):
+    return in_table(resource, RESOURCE_NAMES)
+
+
+def classification_valid(classification):
+    """
+    For the confidence_classification query parameter; the deposited
+    site data are checked by the choices of SiteDataSerializer
+    """
+    return in_table(classification, CLASSIFICATION_NAMES)
+
+
+def pdb_id_valid(pdb_id):
+    if pdb_id and isinstance(pdb_id, str) and PDB_PATTERN.match(pdb_id):
+        return True
+    return False
+
+
+def dangling_site_refs(chains, site_ids, limit=MAX_REFERENCE_ERRORS):
+    """
+    Find the site data referring to a site missing from the sites of the
+    entry, looking every reference up in a set, in one pass over the chains
+    :param chains: List of validated chain dicts, with their residues
+    :param site_ids: Set of site ids of the entry
+    :param limit: Integer, number of errors to return at most
+    :return: List of error messages, empty if every reference is valid
+    """
+    errors = []
+    for chain in chains:
+        for residue in chain["residues"]:
+            for site_data in residue["site_data"]:
+                site_id_ref = site_data.get("site_id_ref")
+                if site_id_ref is not None and site_id_ref not in site_ids:
+                    errors.append("Chain %s, residue %s: site_id_ref %d does not match any site_id in sites" %
+                                  (chain["chain_label"], residue["pdb_res_label"], site_id_ref))
+                    if len(errors) == limit:
+                        return errors
+    return errors
@@ -1,61 +1,173 @@
-import re
+import io
+import json
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework import status
 from funpdbe_deposition.models import Entry
-from funpdbe_deposition.models import RESOURCES
+from funpdbe_deposition.models import DepositionJob
 from funpdbe_deposition.serializers import EntrySerializer
+from funpdbe_deposition.serializers import DepositionJobSerializer
+from funpdbe_deposition.jobs import submit
+from funpdbe_deposition.permissions import can_deposit
+from funpdbe_deposition.validation import resource_valid
+from funpdbe_deposition.validation import pdb_id_valid
+from funpdbe_deposition.bulk import delete_entries
+from funpdbe_deposition.deposition import BatchDeposition
+from funpdbe_deposition.deposition import INVALID_JSON
+from funpdbe_deposition.deposition import RESOURCE_NAME_MISMATCH
+from funpdbe_deposition.release import ResourceRelease
+from funpdbe_deposition import ingest
+from funpdbe_deposition import export
+from funpdbe_deposition.queries import residue_filters
+from funpdbe_deposition.queries import residue_rows
+from funpdbe_deposition.aggregate import aggregated
+from funpdbe_deposition.changes import changes_pruned
+from funpdbe_deposition.changes import changes_since
+from funpdbe_deposition.changes import stream_changes
+from funpdbe_deposition.parsers import NDJSONParser
+from funpdbe_deposition.rendering import documents
+from funpdbe_deposition.rendering import list_response
+from funpdbe_deposition.rendering import parsed
+from funpdbe_deposition.rendering import stored_accepted
+from funpdbe_deposition.conditional import ResultSet
+from funpdbe_deposition.conditional import conditional_response
+from funpdbe_deposition.compact import COMPACT_ETAG_PREFIX
+from funpdbe_deposition.compact import compact_chains
+from funpdbe_deposition.compact import compact_document
+from funpdbe_deposition.compact import compact_requested
+from funpdbe_deposition.rendering import store_rendered
+from funpdbe_deposition.pagination import KeysetPaginator
+from funpdbe_deposition.pagination import pagination_requested
+from funpdbe_deposition.pagination import stream_requested
+from funpdbe_deposition.pagination import stream_entries
 
-PDB_PATTERN = "^[0-9][A-Za-z][A-Za-z0-9]{2}$"
 GENERIC_RESPONSES = {
     "no entries": Response("No entries found", status=status.HTTP_404_NOT_FOUND),
     "invalid pattern": Response("Invalid PDB id pattern", status=status.HTTP_400_BAD_REQUEST),
     "invalid resource": Response("Invalid data resource", status=status.HTTP_400_BAD_REQUEST),
-    "invalid json": Response("Invalid JSON data - check your data structure", status=status.HTTP_400_BAD_REQUEST),
-    "resource name mismatch": Response("Resource name provided by user is different than in the JSON data", status=status.HTTP_400_BAD_REQUEST),
+    "invalid json": Response(INVALID_JSON, status=status.HTTP_400_BAD_REQUEST),
+    "resource name mismatch": Response(RESOURCE_NAME_MISMATCH, status=status.HTTP_400_BAD_REQUEST),
     "no permission": Response("User not allowed to perform this request", status=status.HTTP_403_FORBIDDEN),
-    "bad request": Response("PDB id or resource name invalid", status=status.HTTP_400_BAD_REQUEST)
+    "bad request": Response("PDB id or resource name invalid", status=status.HTTP_400_BAD_REQUEST),
+    "no job": Response("No job found", status=status.HTTP_404_NOT_FOUND),
+    "invalid since": Response("Invalid since, a sequence number is expected", status=status.HTTP_400_BAD_REQUEST),
+    "changes pruned": Response("Changes since this sequence number were pruned, copy the entries again",
+                               status=status.HTTP_410_GONE),
+    "invalid output": Response("Invalid output format", status=status.HTTP_400_BAD_REQUEST),
+    "no ijson": Response("ijson is not installed on the server", status=status.HTTP_501_NOT_IMPLEMENTED),
+    "no numpy": Response("NumPy is not installed on the server", status=status.HTTP_501_NOT_IMPLEMENTED)
 }
 
 
-def get_existing_entry(entry):
-    if not entry:
+def compact_list_response(items):
+    return list_response(compact_document(document) for document in items)
+
+
+def get_existing_entry(entries, request=None, dated=False):
+    """
+    The entries as one response, answering If-None-Match and
+    If-Modified-Since of the request with 304 (not modified)
+    Renderers other than JSON, i.e. the browsable API, get the documents
+    as data, without validators, as the ETags are those of the JSON
+    :param dated: Boolean, True for a single entry, which gets Last-Modified
+    """
+    if entries is None:
         return GENERIC_RESPONSES["no entries"]
-    else:
-        return serialize(entry)
+    result_set = ResultSet(entries, dated)
+    if not result_set.exists():
+        return GENERIC_RESPONSES["no entries"]
+    if not stored_accepted(request):
+        items = documents(result_set.queryset)
+        if compact_requested(request):
+            items = (compact_document(document) for document in items)
+        return Response(parsed(items))
+    if compact_requested(request):
+        return conditional_response(request, result_set, compact_list_response, COMPACT_ETAG_PREFIX)
+    return conditional_response(request, result_set, list_response)
 
 
-def serialize(entry):
-    serializer = EntrySerializer(entry, many=True)
-    return Response(serializer.data)
+def list_entries(request, entries):
+    """
+    List entries either as one response, one page at a time
+    (?page_size=N&cursor=...) or as a stream (?stream=true)
+    Streams are the only responses without ETag
+    """
+    if stream_requested(request) or pagination_requested(request):
+        if not entries.exists():
+            return GENERIC_RESPONSES["no entries"]
+        if stream_requested(request):
+            return stream_entries(entries, compact_document if compact_requested(request) else None)
+        return KeysetPaginator(request, entries).get_response()
+    return get_existing_entry(entries, request)
 
 
-def resource_valid(resource):
-    for RESOURCE in RESOURCES:
-        if resource in RESOURCE:
-            return True
-    return False
+def entry_serializer(request, *args, **kwargs):
+    """
+    EntrySerializer reading compact residues when ?format=compact
+    """
+    context = kwargs.pop("context", {})
+    context["compact"] = compact_requested(request)
+    return EntrySerializer(*args, context=context, **kwargs)
 
 
-def pdb_id_valid(pdb_id):
-    if pdb_id and re.match(PDB_PATTERN, pdb_id):
-        return True
-    return False
+def save_entry(request, serializer, status_code):
+    """
+    Validate and save an entry, then store its pre-rendered document,
+    which doubles as the response body
+    :param request: Request
+    :param serializer: EntrySerializer, bound to the request data
+    :param status_code: Integer, HTTP status code on success
+    :return: Response
+    """
+    if serializer.is_valid():
+        entry = serializer.save(owner=request.user)
+        document = store_rendered(Entry.objects.filter(pk=entry.pk))[entry.pk]
+        if compact_requested(request):
+            document = compact_document(document)
+        if stored_accepted(request):
+            response = HttpResponse(document, status=status_code, content_type="application/json")
+        else:
+            response = Response(parsed([document])[0], status=status_code)
+    else:
+        response = Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return response
 
 
-def user_groups(user):
-    user_groups = []
-    for group in user.groups.all():
-        user_groups.append(str(group))
-    return user_groups
+def merge_by(existing, updates, key):
+    """
+    Replace the items of a list which have the same key as an update,
+    and append the updates which are new
+    """
+    by_key = dict((item.get(key), item) for item in updates if isinstance(item, dict))
+    merged = [by_key.pop(item.get(key), item) for item in existing]
+    return merged + [item for item in updates if not isinstance(item, dict) or item.get(key) in by_key]
 
-def delete_entries(entries):
-    if entries:
-        for entry in entries:
-            entry.delete()
-            return True
-    else:
-        return False
+
+def merge_patch(document, patch):
+    """
+    Apply a PATCH request to the current document of an entry
+    Chains are matched by chain_label and sites by site_id, while
+    any other field in the patch replaces the current value
+    :param document: Dict, current entry document
+    :param patch: Dict, request data
+    :return: Tuple of the merged document and the changes
+    """
+    merged = dict(document)
+    changes = {"chains": set(), "sites": set(), "evidence_code_ontology": False}
+    for key, value in patch.items():
+        if key in ("chains", "sites") and isinstance(value, list):
+            item_key = "chain_label" if key == "chains" else "site_id"
+            merged[key] = merge_by(document.get(key) or [], value, item_key)
+            changes[key] = set(item.get(item_key) for item in value if isinstance(item, dict))
+        else:
+            merged[key] = value
+            if key == "evidence_code_ontology":
+                changes[key] = True
+    return merged, changes
 
 
 class EntryList(APIView):
@@ -68,11 +180,14 @@ class EntryList(APIView):
         This call can:
         * work OK (200)
         * fail with not found (404) when there are no entries at all
+        * fail with bad request (400) when the cursor or page size is invalid
+        Pagination: ?page_size=N, then follow the "next" and "prev" cursors
+        Streaming: ?stream=true
         :param request: Request
         :return: Response
         """
         entries = Entry.objects.all()
-        return get_existing_entry(entries)
+        return list_entries(request, entries)
 
 
 class EntryListByResource(APIView):
@@ -87,6 +202,9 @@ class EntryListByResource(APIView):
         * work OK (200)
         * fail with not found (404) when there are no entries for a resource
         * fail with bad request (400) when the resource name is invalid
+        * fail with bad request (400) when the cursor or page size is invalid
+        Pagination: ?page_size=N, then follow the "next" and "prev" cursors
+        Streaming: ?stream=true
         :param request: Request
         :param resource: String, resource name provided by the user
         :return: Response
@@ -95,7 +213,7 @@ class EntryListByResource(APIView):
         # Validate resource name
         if resource_valid(resource):
             entries = Entry.objects.filter(data_resource=resource)
-            response = get_existing_entry(entries)
+            response = list_entries(request, entries)
         else:
             response = GENERIC_RESPONSES["invalid resource"]
         return response
@@ -118,20 +236,15 @@ class EntryListByResource(APIView):
         if resource != request.data["data_resource"]:
             response = GENERIC_RESPONSES["resource name mismatch"]
         else:
-            if resource in user_groups(request.user):
+            if can_deposit(request.user, resource):
                 response = self.serialize_for_post(request)
             else:
                 response = GENERIC_RESPONSES["no permission"]
         return response
 
     def serialize_for_post(self, request):
-        serializer = EntrySerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(owner=request.user)
-            response = Response(serializer.data, status=status.HTTP_201_CREATED)
-        else:
-            response = Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return response
+        serializer = entry_serializer(request, data=request.data)
+        return save_entry(request, serializer, status.HTTP_201_CREATED)
 
     def post(self, request, resource):
         """
@@ -152,6 +265,266 @@ class EntryListByResource(APIView):
         return response
 
 
+class EntryBatchByResource(APIView):
+    """
+    This view (only POST) adds many entries under one resource at once
+    """
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request, resource):
+        """
+        This call can:
+        * create every entry (201)
+        * create some of the entries (207), the result of each item tells which
+        * fail with bad request (400) when none of the entries are valid
+        * fail with bad request (400) when the data is not a list of entries
+        * fail with forbidden (403) when user is anonymous or is not allowed to POST to a resource
+        * fail with bad request (400) when the resource name is invalid
+        The body is either a JSON array of entries, or newline delimited JSON
+        with one entry per line (Content-Type: application/x-ndjson)
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :return: Response
+        """
+        if not resource_valid(resource):
+            response = GENERIC_RESPONSES["invalid resource"]
+        elif not can_deposit(request.user, resource):
+            response = GENERIC_RESPONSES["no permission"]
+        elif not isinstance(request.data, list):
+            response = GENERIC_RESPONSES["invalid json"]
+        else:
+            results, status_code = BatchDeposition(request.user, resource).deposit(request.data)
+            response = Response(results, status=status_code)
+        return response
+
+
+class EntryUploadByResource(APIView):
+    """
+    This view (only POST) adds one large entry under one resource, reading
+    the body incrementally, so that memory does not grow with its size
+    """
+
+    def post(self, request, resource):
+        """
+        This call can:
+        * create entry (201), with a summary instead of the whole entry
+        * fail with bad request (400) when the JSON is invalid
+        * fail with bad request (400) when the resource name provided and resource name in JSON mismatch
+        * fail with forbidden (403) when user is anonymous or is not allowed to POST to a resource
+        * fail with bad request (400) when the resource name is invalid
+        * fail with not implemented (501) when ijson is not installed
+        The body is one JSON entry, with compact residues when ?format=compact
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :return: Response
+        """
+        if not resource_valid(resource):
+            response = GENERIC_RESPONSES["invalid resource"]
+        elif not can_deposit(request.user, resource):
+            response = GENERIC_RESPONSES["no permission"]
+        elif ingest.ijson is None:
+            response = GENERIC_RESPONSES["no ijson"]
+        else:
+            deposition = ingest.StreamingDeposition(request.user, resource, compact_requested(request))
+            # The body is read from the stream, request.data is never parsed
+            result, status_code = deposition.deposit(request.stream or io.BytesIO())
+            response = Response(result, status=status_code)
+        return response
+
+
+class EntryJobByResource(APIView):
+    """
+    This view (only POST) stores an upload of one or more entries under one
+    resource, which is then validated and saved in the background
+    """
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request, resource):
+        """
+        This call can:
+        * accept the upload (202), the response points to the job status
+        * fail with bad request (400) when the body is empty
+        * fail with forbidden (403) when user is anonymous or is not allowed to POST to a resource
+        * fail with bad request (400) when the resource name is invalid
+        The body is a JSON entry, a JSON array of entries, or newline delimited
+        JSON with one entry per line (Content-Type: application/x-ndjson)
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :return: Response
+        """
+        if not resource_valid(resource):
+            response = GENERIC_RESPONSES["invalid resource"]
+        elif not can_deposit(request.user, resource):
+            response = GENERIC_RESPONSES["no permission"]
+        elif not request.body:
+            response = GENERIC_RESPONSES["invalid json"]
+        else:
+            job = submit(request.user, resource, request.content_type, request.body)
+            url = request.build_absolute_uri(reverse("deposition-job", kwargs={"pk": job.pk}))
+            response = Response({"pk": job.pk, "status": job.status, "url": url},
+                                status=status.HTTP_202_ACCEPTED, headers={"Location": url})
+        return response
+
+
+class ResourceReleaseByResource(APIView):
+    """
+    These views either remove every entry of one release of a resource (DELETE),
+    or replace the release with a new set of entries in a single transaction (POST)
+    """
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def check_resource(self, request, resource):
+        if not resource_valid(resource):
+            return GENERIC_RESPONSES["invalid resource"]
+        if not can_deposit(request.user, resource):
+            return GENERIC_RESPONSES["no permission"]
+        return None
+
+    def delete(self, request, resource, version):
+        """
+        This call can:
+        * delete every entry of the release (200), reporting how many
+        * fail with not found (404) when the release has no entries
+        * fail with forbidden (403) when user is anonymous or is not allowed to edit a resource
+        * fail with bad request (400) when the resource name is invalid
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :param version: String, resource_version of the release
+        :return: Response
+        """
+        response = self.check_resource(request, resource)
+        if response is None:
+            deleted = ResourceRelease(request.user, resource, version).purge()
+            if deleted:
+                response = Response({"deleted": deleted}, status=status.HTTP_200_OK)
+            else:
+                response = GENERIC_RESPONSES["no entries"]
+        return response
+
+    def post(self, request, resource, version):
+        """
+        This call can:
+        * replace the release with the new entries (201), reporting how many entries were deleted
+        * fail with bad request (400) when any of the entries is invalid, nothing is changed then
+        * fail with bad request (400) when the data is not a non-empty list of entries
+        * fail with forbidden (403) when user is anonymous or is not allowed to edit a resource
+        * fail with bad request (400) when the resource name is invalid
+        The body is either a JSON array of entries, or newline delimited JSON
+        with one entry per line (Content-Type: application/x-ndjson)
+        The new entries may have a different resource_version than the replaced release
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :param version: String, resource_version of the release
+        :return: Response
+        """
+        response = self.check_resource(request, resource)
+        if response is None:
+            if not isinstance(request.data, list) or not request.data:
+                response = GENERIC_RESPONSES["invalid json"]
+            else:
+                release = ResourceRelease(request.user, resource, version)
+                deleted, results, status_code = release.replace(request.data)
+                response = Response({"deleted": deleted, "results": results}, status=status_code)
+        return response
+
+
+class ScoreExportByResource(APIView):
+    """
+    This view (only GET) exports the site data of every residue of a resource
+    as a flat table, one row per site data
+    """
+
+    def get(self, request, resource):
+        """
+        This call can:
+        * work OK (200), streaming CSV by default, or a NumPy archive with ?output=npz
+        * fail with bad request (400) when the resource name is invalid
+        * fail with bad request (400) when the output format is invalid
+        * fail with not implemented (501) when ?output=npz but NumPy is not installed
+        Columns: pdb_id, chain_label, pdb_res_label, aa_type, site_id_ref,
+        raw_score, confidence_score, confidence_classification
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :return: Response
+        """
+        output = request.query_params.get("output", "csv")
+        if not resource_valid(resource):
+            response = GENERIC_RESPONSES["invalid resource"]
+        elif output not in export.OUTPUT_FORMATS:
+            response = GENERIC_RESPONSES["invalid output"]
+        elif output == "npz" and export.numpy is None:
+            response = GENERIC_RESPONSES["no numpy"]
+        else:
+            rows = export.score_rows(resource)
+            if output == "csv":
+                response = StreamingHttpResponse(export.csv_chunks(rows), content_type=export.OUTPUT_FORMATS[output])
+            else:
+                response = HttpResponse(export.npz_bytes(rows), content_type=export.OUTPUT_FORMATS[output])
+            response["Content-Disposition"] = 'attachment; filename="%s-scores.%s"' % (resource, output)
+        return response
+
+
+class ChangeList(APIView):
+    """
+    This view (only GET) streams the log of created, updated and deleted
+    entries, so that mirrors can apply the changes since their last sync
+    """
+
+    def get(self, request):
+        """
+        This call can:
+        * work OK (200), with the events after ?since=<seq> in order, possibly none
+        * fail with bad request (400) when since is not a sequence number
+        * fail with bad request (400) when the resource name is invalid
+        * fail with gone (410) when events after since were pruned
+        Mirrors send the "seq" of the last event they applied as the next ?since=
+        Events are pruned after FUNPDBE_CHANGES_RETENTION_DAYS, see the prune_changes
+        command; mirrors which did not sync for longer copy the entries again
+        Filtering: ?data_resource=<resource>
+        :param request: Request
+        :return: Response
+        """
+        resource = request.query_params.get("data_resource")
+        try:
+            seq = int(request.query_params.get("since", 0))
+        except ValueError:
+            seq = -1
+        if seq < 0:
+            response = GENERIC_RESPONSES["invalid since"]
+        elif resource is not None and not resource_valid(resource):
+            response = GENERIC_RESPONSES["invalid resource"]
+        elif changes_pruned(seq):
+            response = GENERIC_RESPONSES["changes pruned"]
+        else:
+            response = stream_changes(changes_since(seq, resource))
+        return response
+
+
+class DepositionJobDetail(APIView):
+    """
+    This view (only GET) reports the progress and results of a deposition job
+    """
+
+    def get(self, request, pk):
+        """
+        This call can:
+        * work OK (200)
+        * fail with not found (404)
+        * fail with forbidden (403) when user is not the owner of the job
+        :param request: Request
+        :param pk: String, job identifier
+        :return: Response
+        """
+        job = DepositionJob.objects.filter(pk=pk).select_related("owner").first()
+        if job is None:
+            response = GENERIC_RESPONSES["no job"]
+        elif job.owner_id != request.user.pk and not request.user.is_staff:
+            response = GENERIC_RESPONSES["no permission"]
+        else:
+            response = Response(DepositionJobSerializer(job).data)
+        return response
+
+
 class EntryListByPdb(APIView):
     """
     This view (only GET) can list entries for a specific PDB id
@@ -170,7 +543,66 @@ class EntryListByPdb(APIView):
         # Validate PDB id
         if pdb_id_valid(pdb_id):
             entries = Entry.objects.filter(pdb_id=pdb_id.lower())
-            response = get_existing_entry(entries)
+            response = get_existing_entry(entries, request)
+        else:
+            response = GENERIC_RESPONSES["invalid pattern"]
+        return response
+
+
+class AggregatedByPdb(APIView):
+    """
+    This view (only GET) merges the entries of every resource for a specific
+    PDB id into one residue list per chain
+    """
+
+    def get(self, request, pdb_id):
+        """
+        This call can:
+        * work OK (200), the site data of each residue is grouped by resource
+        * fail with bad request (400) when the PDB id has an invalid reg.ex. pattern
+        * fail with not found (404)
+        :param request: Request
+        :param pdb_id: String, pattern: ^[0-9][A-Za-z][A-Za-z0-9]{2}$
+        :return: Response
+        """
+        if pdb_id_valid(pdb_id):
+            document = aggregated(pdb_id.lower())
+            if document is None:
+                response = GENERIC_RESPONSES["no entries"]
+            elif stored_accepted(request):
+                response = HttpResponse(document, content_type="application/json")
+            else:
+                response = Response(parsed([document])[0])
+        else:
+            response = GENERIC_RESPONSES["invalid pattern"]
+        return response
+
+
+class ResidueListByPdb(APIView):
+    """
+    This view (only GET) lists the residue level site data of a PDB id,
+    from any resource, which match the query parameters
+    """
+
+    def get(self, request, pdb_id):
+        """
+        This call can:
+        * work OK (200), with a list of the matching site data, possibly empty
+        * fail with bad request (400) when the PDB id has an invalid reg.ex. pattern
+        * fail with bad request (400) when a filter has an invalid value
+        Filters: min_raw_score, max_raw_score, min_confidence_score,
+        max_confidence_score, confidence_classification, chain_label, pdb_res_label, data_resource, site_label
+        :param request: Request
+        :param pdb_id: String, pattern: ^[0-9][A-Za-z][A-Za-z0-9]{2}$
+        :return: Response
+        """
+        if pdb_id_valid(pdb_id):
+            try:
+                filters = residue_filters(request.query_params)
+            except ValueError as error:
+                response = Response(str(error), status=status.HTTP_400_BAD_REQUEST)
+            else:
+                response = Response(residue_rows(pdb_id.lower(), filters))
         else:
             response = GENERIC_RESPONSES["invalid pattern"]
         return response
@@ -200,38 +632,73 @@ class EntryDetailByResource(APIView):
             if resource_valid(resource):
                 entries = Entry.objects.filter(data_resource=resource).filter(pdb_id=pdb_id.lower())
                 # If entry/entries exist, serialize them
-                response = get_existing_entry(entries)
+                response = get_existing_entry(entries, request, dated=True)
             else:
                 response = GENERIC_RESPONSES["invalid resource"]
         else:
             response = GENERIC_RESPONSES["invalid pattern"]
         return response
 
-    def validate(self, request, resource, pdb_id):
+    def validate(self, request, resource, pdb_id, action=None):
         validated = False
         if pdb_id_valid(pdb_id):
             if resource_valid(resource):
                 validated = True
 
         if validated:
-            response = self.authenticate(request.user, resource, pdb_id)
+            response = self.authenticate(request, resource, pdb_id, action or self.delete_entry)
         else:
             response = GENERIC_RESPONSES["bad request"]
 
         return response
 
-    def authenticate(self, user, resource, pdb_id):
-        if resource in user_groups(user):
+    def authenticate(self, request, resource, pdb_id, action):
+        if can_deposit(request.user, resource):
             entries = Entry.objects.filter(pdb_id=pdb_id.lower()).filter(data_resource=resource)
-            if delete_entries(entries):
-                response = Response("Deleted entry of %s with PDB id %s" % (user, pdb_id),
-                                    status=status.HTTP_301_MOVED_PERMANENTLY)
+            if entries.exists():
+                response = action(request, entries)
             else:
                 response = GENERIC_RESPONSES["no entries"]
         else:
             response = GENERIC_RESPONSES["no permission"]
         return response
 
+    def delete_entry(self, request, entries):
+        delete_entries(entries)
+        return Response("Deleted entry of %s with PDB id %s" % (request.user, self.kwargs["pdb_id"]),
+                        status=status.HTTP_301_MOVED_PERMANENTLY)
+
+    def check_payload(self, data, entry):
+        if not EntryListByResource().has_resource(data):
+            return GENERIC_RESPONSES["invalid json"]
+        if data["data_resource"] != entry.data_resource:
+            return GENERIC_RESPONSES["resource name mismatch"]
+        return None
+
+    def replace_entry(self, request, entries):
+        entry = entries.get()
+        response = self.check_payload(request.data, entry)
+        if response is None:
+            serializer = entry_serializer(request, entry, data=request.data)
+            response = save_entry(request, serializer, status.HTTP_201_CREATED)
+        return response
+
+    def patch_entry(self, request, entries):
+        entry = entries.get()
+        data = request.data
+        # The resource name is optional in a PATCH request
+        if isinstance(data, dict) and "data_resource" not in data:
+            data = dict(data, data_resource=entry.data_resource)
+        response = self.check_payload(data, entry)
+        if response is None:
+            document = json.loads(next(documents(entries)).decode("utf-8"))
+            if compact_requested(request):
+                document["chains"] = compact_chains(document.get("chains"))
+            merged, changes = merge_patch(document, data)
+            serializer = entry_serializer(request, entry, data=merged, context={"changes": changes})
+            response = save_entry(request, serializer, status.HTTP_200_OK)
+        return response
+
     def delete(self, request, resource, pdb_id):
         """
         This call can:
@@ -250,7 +717,7 @@ class EntryDetailByResource(APIView):
     def post(self, request, resource, pdb_id):
         """
         This call can:
-        * update an entry (although by first deleting, then creating) (201)
+        * update an entry, replacing it in a single transaction (201)
         * fail with bad request (400) when the PDB id has an invalid reg.ex. pattern
         * fail with bad request (400) when the resource name is invalid
         * fail with not found (404)
@@ -262,8 +729,22 @@ class EntryDetailByResource(APIView):
         :param pdb_id:
         :return:
         """
-        deleting = self.delete(request, resource, pdb_id)
-        if deleting.status_code == 301:
-            return EntryListByResource().post(request, resource)
-        else:
-            return deleting
+        return self.validate(request, resource, pdb_id, self.replace_entry)
+
+    def patch(self, request, resource, pdb_id):
+        """
+        This call can:
+        * update part of an entry (200): chains are replaced by chain_label,
+          sites by site_id, other fields by value, the rest is left untouched
+        * fail with bad request (400) when the PDB id has an invalid reg.ex. pattern
+        * fail with bad request (400) when the resource name is invalid
+        * fail with not found (404)
+        * fail with forbidden (403) when user is anonymous or has no permission to edit this entry
+        * fail with bad request (400) when the JSON is invalid
+        * fail with bad request (400) when the resource name provided and resource name in JSON mismatch
+        :param request: Request
+        :param resource: String, resource name provided by the user
+        :param pdb_id: String, pattern: ^[0-9][A-Za-z][A-Za-z0-9]{2}$
+        :return: Response
+        """
+        return self.validate(request, resource, pdb_id, self.patch_entry)